@@ -0,0 +1,92 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+import logging
+import duckdb
+
+from .run_database import RunDatabase, get_check_key
+
+
+def run_control(control: Any, index: int, nb_controls: int, request: Any, duckdb_conn: duckdb.DuckDBPyConnection) -> None:
+    logging.info(f"Running check {index + 1}/{nb_controls}: {type(control).__name__}")
+    control.run(request=request, duckdb_conn=duckdb_conn)
+
+
+def run_controls(
+        request: Any,
+        prerequisites: list[Any],
+        controls: list[Any],
+        duckdb_conn: duckdb.DuckDBPyConnection,
+        threads: int = 1,
+        run_database: Optional[RunDatabase] = None,
+        inputs_fingerprint: Optional[str] = None,
+        delta: Optional[Any] = None
+    ) -> None:
+    """
+    Run the content checks of an entity.
+
+    The prerequisites (e.g. the parsing, which loads the data checked by the others) run first, in order, on
+    `duckdb_conn`. The other checks only read the data and do not depend on each other: with more than one thread they
+    run at the same time, at most `threads` at once, each on its own cursor (DuckDB shares its own thread pool
+    between the cursors of a database, so the queries do not get more threads than configured).
+    All of them run even if one fails, and the failures are reported in the order of `controls`, the first one being
+    raised, whatever the order in which the checks complete.
+    Given a run database and the fingerprint of the inputs of the entity, the checks (not the prerequisites) that
+    passed on the same inputs with the same code in a previous run are skipped, and those that pass are recorded.
+    Given the delta of the entity (its rows changed since its validated snapshot, created once the prerequisites have
+    run), each check reads what the delta gives for it instead of the whole entity.
+    """
+    nb_controls = len(prerequisites) + len(controls)
+    for index, control in enumerate(prerequisites):
+        run_control(control, index, nb_controls, request, duckdb_conn)
+    if delta is not None:
+        delta.create(duckdb_conn)
+    control_requests = [delta.get_request(control) if delta is not None else request for control in controls]
+
+    check_keys: list[Optional[str]] = [
+        get_check_key(f"{request.view_name}/{index}/{type(control).__name__}", [inputs_fingerprint])
+        if run_database is not None and inputs_fingerprint is not None else None
+        for index, control in enumerate(controls)
+    ]
+    pending: list[int] = []
+    for index, (control, check_key) in enumerate(zip(controls, check_keys)):
+        if check_key is not None and run_database is not None and run_database.is_check_passed(check_key):
+            logging.info(f"Skipping check {len(prerequisites) + index + 1}/{nb_controls}: {type(control).__name__}, passed on the same inputs in a previous run (cache hit)")
+        else:
+            pending.append(index)
+
+    def record_passed(index: int) -> None:
+        check_key = check_keys[index]
+        if check_key is not None and run_database is not None:
+            run_database.set_check_passed(check_key, f"{request.view_name}: {type(controls[index]).__name__}")
+
+    errors: list[Optional[BaseException]] = []
+    if threads <= 1 or len(pending) <= 1:
+        for index in pending:
+            try:
+                run_control(controls[index], len(prerequisites) + index, nb_controls, control_requests[index], duckdb_conn)
+                errors.append(None)
+            except Exception as e:
+                errors.append(e)
+    else:
+        # Cursors are created in the calling thread, a DuckDB connection must not be shared between threads
+        cursors = [duckdb_conn.cursor() for _ in pending]
+        try:
+            with ThreadPoolExecutor(max_workers=min(threads, len(pending)), thread_name_prefix="geo-data-check") as executor:
+                futures = [
+                    executor.submit(run_control, controls[index], len(prerequisites) + index, nb_controls, control_requests[index], cursor)
+                    for index, cursor in zip(pending, cursors)
+                ]
+                for future in futures:
+                    errors.append(future.exception())
+        finally:
+            for cursor in cursors:
+                cursor.close()
+
+    for index, error in zip(pending, errors):
+        if error is None:
+            record_passed(index)
+    failures = [(controls[index], error) for index, error in zip(pending, errors) if error is not None]
+    for control, error in failures:
+        logging.error(f"Check {type(control).__name__} failed: {error}")
+    if len(failures) > 0:
+        raise failures[0][1]
@@ -7,7 +7,7 @@ import json
 
 from .suppliers.insee.config import InseeSupplierConfig, InseeExceptionsToIgnoreOrCorrect
 from .suppliers.laposte.config import LaPosteSupplierConfig, LaPosteExceptionsToIgnoreOrCorrect
-from .suppliers.wikidata import WikidataSupplierConfig
+from .suppliers.wikidata.config import WikidataSupplierConfig
 
 class AcquisitionConfig(BaseModel):
     insee: InseeSupplierConfig = InseeSupplierConfig()
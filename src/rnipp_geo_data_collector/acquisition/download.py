@@ -1,25 +1,37 @@
-import logging
 from pathlib import Path
+from typing import Optional
 import duckdb
+import logging
 
 from .config import AcquisitionConfig, ErrorHandlerConfig
+from .suppliers.insee.hierarchy import InseeHierarchyGraph
 from .suppliers.insee.requests import OutputPathsRequestCOG, RequestCOGArrondissementMunicipal, RequestCOGCommune, RequestCOGDepartement, RequestsCOGCollectivitesOutremer, RequestsCOGDistrict, RequestsCOGPays
+from .suppliers.insee.checks.hierarchy import CheckHierarchyInseeCog
+from .suppliers.insee.checks.all_entities import AllEntitiesInseeCog
+from .suppliers.insee.checks.delta import get_affected_children_view_name
 from .suppliers.insee.checks.events_consistency import CheckEventsConsistencyAfterDownloadInseeCog
 from .suppliers.insee.checks.insee_code_overlap import CheckGlobalInseeCodeOverlapAfterDownloadInseeCog
+from .suppliers.insee.checks.parent_links import ParentLinksInseeCog
 from .suppliers.insee.checks.parent_uri_exist import CheckParentURIsExistAfterDownloadInseeCog
 from .suppliers.insee.checks.parent_period_overlap import CheckParentPeriodOverlapAfterDownloadInseeCog
 from .suppliers.insee.checks.parent_period_no_gaps import CheckParentPeriodNoGapsAfterDownloadInseeCog
 from .suppliers.insee.checks.parent_period_include import CheckParentPeriodsContainChildPeriodAfterDownloadInseeCog
 from .suppliers.laposte.requests import RequestLaPosteHexasmal, OutputPathsRequestLaPosteHexasmal
+from .suppliers.wikidata.enrichment import EnrichmentWikidataCommunes, OutputPathsEnrichmentWikidata
+from .exceptions_table import load_exceptions_table
+from .run_database import RunDatabase
+from .stage import AcquisitionTask, CrossEntityCheck, CrossEntityTable, run_acquisition_stage
 
 
 def download_geo_data(
     acquisition_config: AcquisitionConfig,
     exceptions_handler_config: ErrorHandlerConfig,
     duckdb_conn : duckdb.DuckDBPyConnection,
-    output_dir: Path
-):
-    """Download data from supplied URLs."""
+    output_dir: Path,
+    run_database: Optional[RunDatabase] = None,
+    threads: int = 1
+) -> InseeHierarchyGraph:
+    """Download data from supplied URLs and return the hierarchy graph of the geographic entities."""
     output_dir.mkdir(parents=True, exist_ok=True)
     output_dir_insee = output_dir / "insee"
     output_dir_insee.mkdir(parents=True, exist_ok=True)
@@ -27,202 +39,77 @@ def download_geo_data(
     output_dir_insee_raw.mkdir(parents=True, exist_ok=True)
     output_dir_insee_cleaned = output_dir_insee / "cleaned"
     output_dir_insee_cleaned.mkdir(parents=True, exist_ok=True)
-    output_dir_insee_remove = output_dir_insee / "remove"
-    output_dir_insee_remove.mkdir(parents=True, exist_ok=True)
-    output_dir_insee_add_or_replace = output_dir_insee / "add_or_replace"
-    output_dir_insee_add_or_replace.mkdir(parents=True, exist_ok=True)
+
+    # Cleaned entities are written in the configured output format, the raw responses keep their CSV format
+    cleaned_suffix_insee = "." + acquisition_config.insee.output_format
 
     filenames_communes= "communes.csv"
     output_paths_communes = OutputPathsRequestCOG(
         raw_entities=output_dir_insee_raw /  filenames_communes,
-        add_or_replace_entities=output_dir_insee_add_or_replace / filenames_communes,
-        remove_entities=output_dir_insee_remove / filenames_communes,
-        cleaned_entities=output_dir_insee_cleaned / filenames_communes
+        cleaned_entities=(output_dir_insee_cleaned / filenames_communes).with_suffix(cleaned_suffix_insee)
     )
     request_insee_commune = RequestCOGCommune(
         output_paths = output_paths_communes,
         acquisition_config = acquisition_config.insee,
-        exceptions_handler_config = exceptions_handler_config.insee.communes
+        exceptions_handler_config = exceptions_handler_config.insee.communes,
+        run_database = run_database
     )
     filenames_arrondissement_municipal= "arrondissement_municipal.csv"
     output_paths_arrondissement_municipal = OutputPathsRequestCOG(
         raw_entities=output_dir_insee_raw /  filenames_arrondissement_municipal,
-        add_or_replace_entities=output_dir_insee_add_or_replace / filenames_arrondissement_municipal,
-        remove_entities=output_dir_insee_remove / filenames_arrondissement_municipal,
-        cleaned_entities=output_dir_insee_cleaned / filenames_arrondissement_municipal
+        cleaned_entities=(output_dir_insee_cleaned / filenames_arrondissement_municipal).with_suffix(cleaned_suffix_insee)
     )
     request_insee_arrondissement_municipal = RequestCOGArrondissementMunicipal(
         output_paths = output_paths_arrondissement_municipal,
         acquisition_config = acquisition_config.insee,
-        exceptions_handler_config = exceptions_handler_config.insee.arrondissements_municipaux
+        exceptions_handler_config = exceptions_handler_config.insee.arrondissements_municipaux,
+        run_database = run_database
     )
     filenames_departements="departements.csv"
     output_paths_departements = OutputPathsRequestCOG(
         raw_entities=output_dir_insee_raw /  filenames_departements,
-        add_or_replace_entities=output_dir_insee_add_or_replace / filenames_departements,
-        remove_entities=output_dir_insee_remove / filenames_departements,
-        cleaned_entities=output_dir_insee_cleaned / filenames_departements
+        cleaned_entities=(output_dir_insee_cleaned / filenames_departements).with_suffix(cleaned_suffix_insee)
     )
     request_insee_departements = RequestCOGDepartement(
         output_paths = output_paths_departements,
         acquisition_config = acquisition_config.insee,
-        exceptions_handler_config = exceptions_handler_config.insee.departements
+        exceptions_handler_config = exceptions_handler_config.insee.departements,
+        run_database = run_database
     )
     filenames_collectivites_outremer="collectivites_outremer.csv"
     output_paths_collectivites_outremer = OutputPathsRequestCOG(
         raw_entities=output_dir_insee_raw /  filenames_collectivites_outremer,
-        add_or_replace_entities=output_dir_insee_add_or_replace / filenames_collectivites_outremer,
-        remove_entities=output_dir_insee_remove / filenames_collectivites_outremer,
-        cleaned_entities=output_dir_insee_cleaned / filenames_collectivites_outremer
+        cleaned_entities=(output_dir_insee_cleaned / filenames_collectivites_outremer).with_suffix(cleaned_suffix_insee)
     )
     request_insee_collectivites_outremer = RequestsCOGCollectivitesOutremer(
         output_paths = output_paths_collectivites_outremer,
         acquisition_config = acquisition_config.insee,
-        exceptions_handler_config = exceptions_handler_config.insee.collectivites_outremer
+        exceptions_handler_config = exceptions_handler_config.insee.collectivites_outremer,
+        run_database = run_database
     )
     filenames_districts="districts.csv"
     output_paths_districts = OutputPathsRequestCOG(
         raw_entities=output_dir_insee_raw /  filenames_districts,
-        add_or_replace_entities=output_dir_insee_add_or_replace / filenames_districts,
-        remove_entities=output_dir_insee_remove / filenames_districts,
-        cleaned_entities=output_dir_insee_cleaned / filenames_districts
+        cleaned_entities=(output_dir_insee_cleaned / filenames_districts).with_suffix(cleaned_suffix_insee)
     )
     request_insee_districts = RequestsCOGDistrict(
         output_paths = output_paths_districts,
         acquisition_config = acquisition_config.insee,
-        exceptions_handler_config = exceptions_handler_config.insee.districts
+        exceptions_handler_config = exceptions_handler_config.insee.districts,
+        run_database = run_database
     )
     filenames_pays="pays.csv"
     output_paths_pays = OutputPathsRequestCOG(
         raw_entities=output_dir_insee_raw /  filenames_pays,
-        add_or_replace_entities=output_dir_insee_add_or_replace / filenames_pays,
-        remove_entities=output_dir_insee_remove / filenames_pays,
-        cleaned_entities=output_dir_insee_cleaned / filenames_pays
+        cleaned_entities=(output_dir_insee_cleaned / filenames_pays).with_suffix(cleaned_suffix_insee)
     )
     request_insee_pays = RequestsCOGPays(
         output_paths = output_paths_pays,
         acquisition_config = acquisition_config.insee,
-        exceptions_handler_config = exceptions_handler_config.insee.pays
+        exceptions_handler_config = exceptions_handler_config.insee.pays,
+        run_database = run_database
     )
 
-    logging.info(f"Downloading \"Communes\" data from COG")
-    try:
-        request_insee_commune.send()
-    except Exception as e:
-        logging.error(f"Error downloading \"Communes\" data: {e}")
-        raise RuntimeError(f"Failed to download \"Communes\" data: {e}") from e
-    try:
-        request_insee_commune.check_content(duckdb_conn = duckdb_conn)
-    except Exception as e:
-        logging.error(f"Error checking content of \"Communes\" data: {e}")
-        raise RuntimeError(f"Failed to check content of \"Communes\" data: {e}") from e
-
-
-    logging.info(f"Downloading \"Arrondissements Municipaux\" data from COG")
-    try:
-        request_insee_arrondissement_municipal.send()
-    except Exception as e:
-        logging.error(f"Error downloading \"Arrondissements Municipaux\" data: {e}")
-        raise RuntimeError(f"Failed to download \"Arrondissements Municipaux\" data: {e}") from e
-    try:
-        request_insee_arrondissement_municipal.check_content(duckdb_conn = duckdb_conn)
-    except Exception as e:
-        logging.error(f"Error checking content of \"Arrondissements Municipaux\" data: {e}")
-        raise RuntimeError(f"Failed to check content of \"Arrondissements Municipaux\" data: {e}") from e
-
-    logging.info(f"Downloading \"Departements\" data from COG")
-    try:
-        request_insee_departements.send()
-    except Exception as e:
-        logging.error(f"Error downloading \"Departements\" data: {e}")
-        raise RuntimeError(f"Failed to download \"Departements\" data: {e}") from e
-    try:
-        request_insee_departements.check_content(duckdb_conn = duckdb_conn)
-    except Exception as e:
-        logging.error(f"Error checking content of \"Departements\" data: {e}")
-        raise RuntimeError(f"Failed to check content of \"Departements\" data: {e}") from e
-    
-    logging.info(f"Downloading \"Collectivités d'Outre-mer\" data from COG")
-    try:
-        request_insee_collectivites_outremer.send()
-    except Exception as e:
-        logging.error(f"Error downloading \"Collectivités d'Outre-mer\" data: {e}")
-        raise RuntimeError(f"Failed to download \"Collectivités d'Outre-mer\" data: {e}") from e
-    try:
-        request_insee_collectivites_outremer.check_content(duckdb_conn = duckdb_conn)
-    except Exception as e:
-        logging.error(f"Error checking content of \"Collectivités d'Outre-mer\" data: {e}")
-        raise RuntimeError(f"Failed to check content of \"Collectivités d'Outre-mer\" data: {e}") from e
-    
-    logging.info(f"Downloading \"Districts\" data from COG")
-    try:
-        request_insee_districts.send()
-    except Exception as e:
-        logging.error(f"Error downloading \"Districts\" data: {e}")
-        raise RuntimeError(f"Failed to download \"Districts\" data: {e}") from e
-    try:
-        request_insee_districts.check_content(duckdb_conn = duckdb_conn)
-    except Exception as e:
-        logging.error(f"Error checking content of \"Districts\" data: {e}")
-        raise RuntimeError(f"Failed to check content of \"Districts\" data: {e}") from e
-    
-    logging.info(f"Downloading \"Pays\" data from COG")
-    try:
-        request_insee_pays.send()
-    except Exception as e:
-        logging.error(f"Error downloading \"Pays\" data: {e}")
-        raise RuntimeError(f"Failed to download \"Pays\" data: {e}") from e
-    try:
-        request_insee_pays.check_content(duckdb_conn = duckdb_conn)
-    except Exception as e:
-        logging.error(f"Error checking content of \"Pays\" data: {e}")
-        raise RuntimeError(f"Failed to check content of \"Pays\" data: {e}") from e
-
-    requests_insee_list = [
-        request_insee_commune,
-        request_insee_arrondissement_municipal,
-        request_insee_departements,
-        request_insee_collectivites_outremer,
-        request_insee_districts,
-        request_insee_pays
-    ]
-    
-    logging.info(f"Check, for the \"Communes\" data, the existence of URIs of the parent geographic entities (department or overseas collectivity).")    
-    CheckParentURIsExistAfterDownloadInseeCog(
-        parents_view_name=[request_insee_departements.view_name, request_insee_collectivites_outremer.view_name]
-    ).run(request=request_insee_commune, duckdb_conn=duckdb_conn)
-    logging.info(f"Check, for the \"Communes\" data, that the validity periods of the parent geographic entities of a municipality do not overlap.")
-    CheckParentPeriodOverlapAfterDownloadInseeCog(
-        parents_view_name=[request_insee_departements.view_name, request_insee_collectivites_outremer.view_name]
-    ).run(request=request_insee_commune, duckdb_conn=duckdb_conn)
-    logging.info(f"Check, for the \"Communes\" data, that the union of the validity periods of the parent geographic entities of a municipality forms a continuous interval (i.e., there are no “gaps”).")
-    CheckParentPeriodNoGapsAfterDownloadInseeCog(
-        parents_view_name=[request_insee_departements.view_name, request_insee_collectivites_outremer.view_name]
-    ).run(request=request_insee_commune, duckdb_conn=duckdb_conn)
-    logging.info(f"Verify that, for the \"Communes\" data, the municipality’s validity period is indeed included in the union of the validity periods of its parent geographic entities.")
-    CheckParentPeriodsContainChildPeriodAfterDownloadInseeCog(
-        parents_view_name=[request_insee_departements.view_name, request_insee_collectivites_outremer.view_name]
-    ).run(request=request_insee_commune, duckdb_conn=duckdb_conn)
-    logging.info(f"Check, for \"Arrondissements Municipaux\" data, the existence of the URIs of the parent geographic entities (municipalities).")
-    CheckParentURIsExistAfterDownloadInseeCog(
-        parents_view_name=[request_insee_commune.view_name]
-    ).run(request=request_insee_arrondissement_municipal, duckdb_conn=duckdb_conn)
-    logging.info(f"Check, for the \"Arrondissements Municipaux\" data, that the validity periods of the parent geographic entities of a municipality do not overlap.")
-    CheckParentPeriodOverlapAfterDownloadInseeCog(
-        parents_view_name=[request_insee_commune.view_name]
-    ).run(request=request_insee_arrondissement_municipal, duckdb_conn=duckdb_conn)
-    logging.info(f"Check, for the \"Arrondissements Municipaux\" data, that the union of the validity periods of the parent geographic entities of a municipality forms a continuous interval (i.e., there are no “gaps”).")
-    CheckParentPeriodNoGapsAfterDownloadInseeCog(
-        parents_view_name=[request_insee_commune.view_name]
-    ).run(request=request_insee_arrondissement_municipal, duckdb_conn=duckdb_conn)
-    logging.info(f"Verify that, for the \"Arrondissements Municipaux\" data, the municipality’s validity period is indeed included in the union of the validity periods of its parent geographic entities.")
-    CheckParentPeriodsContainChildPeriodAfterDownloadInseeCog(
-        parents_view_name=[request_insee_commune.view_name]
-    ).run(request=request_insee_arrondissement_municipal, duckdb_conn=duckdb_conn)
-    logging.info(f"Check that the URIs of all geographic events are associated with only a single, unique event date.")
-    CheckEventsConsistencyAfterDownloadInseeCog().run(requests=requests_insee_list, duckdb_conn=duckdb_conn)
-    logging.info(f"Verify that there are no overlapping periods for a given INSEE code (regardless of the type of geographical entity), i.e., that there are not two URIs associated with the same INSEE code whose validity periods intersect.")
-    CheckGlobalInseeCodeOverlapAfterDownloadInseeCog().run(requests=requests_insee_list, duckdb_conn=duckdb_conn)
 
     output_dir_laposte = output_dir / "laposte"
     output_dir_laposte.mkdir(parents=True, exist_ok=True)
@@ -230,30 +117,205 @@ def download_geo_data(
     output_dir_laposte_raw.mkdir(parents=True, exist_ok=True)
     output_dir_laposte_cleaned = output_dir_laposte / "cleaned"
     output_dir_laposte_cleaned.mkdir(parents=True, exist_ok=True)
-    output_dir_laposte_remove = output_dir_laposte / "remove"
-    output_dir_laposte_remove.mkdir(parents=True, exist_ok=True)
-    output_dir_laposte_add = output_dir_laposte / "add"
-    output_dir_laposte_add.mkdir(parents=True, exist_ok=True)
 
     filenames_laposte = "laposte_hexasmal.csv"
     request_laposte_hexaslmal = RequestLaPosteHexasmal(
             output_paths = OutputPathsRequestLaPosteHexasmal(
                 raw_entities=output_dir_laposte_raw /  filenames_laposte,
-                add_entities=output_dir_laposte_add / filenames_laposte,
-                remove_entities=output_dir_laposte_remove / filenames_laposte,
-                cleaned_entities=output_dir_laposte_cleaned / filenames_laposte
+                cleaned_entities=(output_dir_laposte_cleaned / filenames_laposte).with_suffix("." + acquisition_config.laposte.output_format)
             ),
             exceptions_handler_config = exceptions_handler_config.laposte,
-            acquisition_config = acquisition_config.laposte
+            acquisition_config = acquisition_config.laposte,
+            run_database = run_database
     )
-    logging.info(f"Downloading \"La Poste Hexasmal\" data")
-    try:
-        request_laposte_hexaslmal.send()
-    except Exception as e:
-        logging.error(f"Error downloading \"La Poste Hexasmal\" data: {e}")
-        raise RuntimeError(f"Failed to download \"La Poste Hexasmal\" data: {e}") from e
+
+    requests_insee_list = [
+        request_insee_commune,
+        request_insee_arrondissement_municipal,
+        request_insee_departements,
+        request_insee_collectivites_outremer,
+        request_insee_districts,
+        request_insee_pays
+    ]
+
+    acquisition_tasks = [
+        AcquisitionTask(name="Communes", request=request_insee_commune, supplier="COG"),
+        AcquisitionTask(name="Arrondissements Municipaux", request=request_insee_arrondissement_municipal, supplier="COG"),
+        AcquisitionTask(name="Departements", request=request_insee_departements, supplier="COG"),
+        AcquisitionTask(name="Collectivités d'Outre-mer", request=request_insee_collectivites_outremer, supplier="COG"),
+        AcquisitionTask(name="Districts", request=request_insee_districts, supplier="COG"),
+        AcquisitionTask(name="Pays", request=request_insee_pays, supplier="COG"),
+        AcquisitionTask(name="La Poste Hexasmal", request=request_laposte_hexaslmal)
+    ]
+
+    interval_check_engines = acquisition_config.insee.interval_check_engines
+    parents_communes = [request_insee_departements, request_insee_collectivites_outremer]
+    parents_view_name_communes = [request.view_name for request in parents_communes]
+    parents_arrondissements_municipaux = [request_insee_commune]
+    parents_view_name_arrondissements_municipaux = [request.view_name for request in parents_arrondissements_municipaux]
+    parent_links_communes = ParentLinksInseeCog(parents_view_name=parents_view_name_communes)
+    parent_links_arrondissements_municipaux = ParentLinksInseeCog(parents_view_name=parents_view_name_arrondissements_municipaux)
+    parent_links_table_communes = CrossEntityTable(
+        description="Link the \"Communes\" data to their parent geographic entities (department or overseas collectivity).",
+        inputs=[request_insee_commune, *parents_communes],
+        run=lambda cursor: parent_links_communes.create(
+            request=request_insee_commune,
+            duckdb_conn=cursor,
+            affected_children_view_name=get_affected_children_view_name(child=request_insee_commune, parents=parents_communes, duckdb_conn=cursor)
+        )
+    )
+    parent_links_table_arrondissements_municipaux = CrossEntityTable(
+        description="Link the \"Arrondissements Municipaux\" data to their parent geographic entities (municipalities).",
+        inputs=[request_insee_arrondissement_municipal, *parents_arrondissements_municipaux],
+        run=lambda cursor: parent_links_arrondissements_municipaux.create(
+            request=request_insee_arrondissement_municipal,
+            duckdb_conn=cursor,
+            affected_children_view_name=get_affected_children_view_name(child=request_insee_arrondissement_municipal, parents=parents_arrondissements_municipaux, duckdb_conn=cursor)
+        )
+    )
+    all_entities = AllEntitiesInseeCog(requests=requests_insee_list)
+    all_entities_table = CrossEntityTable(
+        description="Gather all the COG data into a single table, and their geographic events into another one.",
+        inputs=requests_insee_list,
+        run=lambda cursor: all_entities.create(duckdb_conn=cursor)
+    )
+    hierarchy = InseeHierarchyGraph(
+        entities=[request_insee_commune, request_insee_arrondissement_municipal, *parents_communes],
+        children=[request_insee_commune, request_insee_arrondissement_municipal],
+        top_level=parents_communes
+    )
+    hierarchy_table = CrossEntityTable(
+        description="Build the hierarchy graph of the \"Communes\", \"Arrondissements Municipaux\", \"Departements\" and \"Collectivités d'Outre-mer\" data.",
+        inputs=hierarchy.entities,
+        run=lambda cursor: hierarchy.build(duckdb_conn=cursor)
+    )
+    cross_entity_checks = [
+        CrossEntityCheck(
+            description="Check, for the \"Communes\" data, the existence of URIs of the parent geographic entities (department or overseas collectivity).",
+            inputs=[request_insee_commune, *parents_communes],
+            tables=[parent_links_table_communes],
+            run=lambda cursor: CheckParentURIsExistAfterDownloadInseeCog(
+                parent_links=parent_links_communes
+            ).run(request=request_insee_commune, duckdb_conn=cursor)
+        ),
+        CrossEntityCheck(
+            description="Check, for the \"Communes\" data, that the validity periods of the parent geographic entities of a municipality do not overlap.",
+            inputs=[request_insee_commune, *parents_communes],
+            tables=[parent_links_table_communes],
+            run=lambda cursor: CheckParentPeriodOverlapAfterDownloadInseeCog(
+                parent_links=parent_links_communes,
+                engine=interval_check_engines.parent_period_overlap
+            ).run(request=request_insee_commune, duckdb_conn=cursor)
+        ),
+        CrossEntityCheck(
+            description="Check, for the \"Communes\" data, that the union of the validity periods of the parent geographic entities of a municipality forms a continuous interval (i.e., there are no “gaps”).",
+            inputs=[request_insee_commune, *parents_communes],
+            tables=[parent_links_table_communes],
+            run=lambda cursor: CheckParentPeriodNoGapsAfterDownloadInseeCog(
+                parent_links=parent_links_communes,
+                engine=interval_check_engines.parent_period_no_gaps
+            ).run(request=request_insee_commune, duckdb_conn=cursor)
+        ),
+        CrossEntityCheck(
+            description="Verify that, for the \"Communes\" data, the municipality’s validity period is indeed included in the union of the validity periods of its parent geographic entities.",
+            inputs=[request_insee_commune, *parents_communes],
+            tables=[parent_links_table_communes],
+            run=lambda cursor: CheckParentPeriodsContainChildPeriodAfterDownloadInseeCog(
+                parent_links=parent_links_communes,
+                engine=interval_check_engines.parent_period_include
+            ).run(request=request_insee_commune, duckdb_conn=cursor)
+        ),
+        CrossEntityCheck(
+            description="Check, for \"Arrondissements Municipaux\" data, the existence of the URIs of the parent geographic entities (municipalities).",
+            inputs=[request_insee_arrondissement_municipal, *parents_arrondissements_municipaux],
+            tables=[parent_links_table_arrondissements_municipaux],
+            run=lambda cursor: CheckParentURIsExistAfterDownloadInseeCog(
+                parent_links=parent_links_arrondissements_municipaux
+            ).run(request=request_insee_arrondissement_municipal, duckdb_conn=cursor)
+        ),
+        CrossEntityCheck(
+            description="Check, for the \"Arrondissements Municipaux\" data, that the validity periods of the parent geographic entities of a municipality do not overlap.",
+            inputs=[request_insee_arrondissement_municipal, *parents_arrondissements_municipaux],
+            tables=[parent_links_table_arrondissements_municipaux],
+            run=lambda cursor: CheckParentPeriodOverlapAfterDownloadInseeCog(
+                parent_links=parent_links_arrondissements_municipaux,
+                engine=interval_check_engines.parent_period_overlap
+            ).run(request=request_insee_arrondissement_municipal, duckdb_conn=cursor)
+        ),
+        CrossEntityCheck(
+            description="Check, for the \"Arrondissements Municipaux\" data, that the union of the validity periods of the parent geographic entities of a municipality forms a continuous interval (i.e., there are no “gaps”).",
+            inputs=[request_insee_arrondissement_municipal, *parents_arrondissements_municipaux],
+            tables=[parent_links_table_arrondissements_municipaux],
+            run=lambda cursor: CheckParentPeriodNoGapsAfterDownloadInseeCog(
+                parent_links=parent_links_arrondissements_municipaux,
+                engine=interval_check_engines.parent_period_no_gaps
+            ).run(request=request_insee_arrondissement_municipal, duckdb_conn=cursor)
+        ),
+        CrossEntityCheck(
+            description="Verify that, for the \"Arrondissements Municipaux\" data, the municipality’s validity period is indeed included in the union of the validity periods of its parent geographic entities.",
+            inputs=[request_insee_arrondissement_municipal, *parents_arrondissements_municipaux],
+            tables=[parent_links_table_arrondissements_municipaux],
+            run=lambda cursor: CheckParentPeriodsContainChildPeriodAfterDownloadInseeCog(
+                parent_links=parent_links_arrondissements_municipaux,
+                engine=interval_check_engines.parent_period_include
+            ).run(request=request_insee_arrondissement_municipal, duckdb_conn=cursor)
+        ),
+        CrossEntityCheck(
+            description="Check that the hierarchy of the geographic entities has no link to an unknown parent, no cycle, no child with several parents at the same time and that every municipality and municipal district reaches a department or an overseas collectivity.",
+            inputs=hierarchy.entities,
+            tables=[hierarchy_table],
+            run=lambda cursor: CheckHierarchyInseeCog(hierarchy=hierarchy).run(requests=hierarchy.entities, duckdb_conn=cursor)
+        ),
+        CrossEntityCheck(
+            description="Check that the URIs of all geographic events are associated with only a single, unique event date.",
+            inputs=requests_insee_list,
+            tables=[all_entities_table],
+            run=lambda cursor: CheckEventsConsistencyAfterDownloadInseeCog(all_entities=all_entities).run(requests=requests_insee_list, duckdb_conn=cursor)
+        ),
+        CrossEntityCheck(
+            description="Verify that there are no overlapping periods for a given INSEE code (regardless of the type of geographical entity), i.e., that there are not two URIs associated with the same INSEE code whose validity periods intersect.",
+            inputs=requests_insee_list,
+            tables=[all_entities_table],
+            run=lambda cursor: CheckGlobalInseeCodeOverlapAfterDownloadInseeCog(
+                engine=interval_check_engines.insee_code_overlap,
+                all_entities=all_entities
+            ).run(requests=requests_insee_list, duckdb_conn=cursor)
+        )
+    ]
+
     try:
-        request_laposte_hexaslmal.check_content(duckdb_conn = duckdb_conn)
-    except Exception as e:
-        logging.error(f"Error checking content of \"La Poste Hexasmals\" data: {e}")
-        raise RuntimeError(f"Failed to check content of \"La Poste Hexasmal\" data: {e}") from e
+        load_exceptions_table(requests=[*requests_insee_list, request_laposte_hexaslmal], duckdb_conn=duckdb_conn)
+        run_acquisition_stage(
+            tasks=acquisition_tasks,
+            cross_entity_checks=cross_entity_checks,
+            duckdb_conn=duckdb_conn,
+            run_database=run_database,
+            threads=threads
+        )
+        # All the checks passed: the next run only checks the rows changed since these snapshots
+        for request in requests_insee_list:
+            if request.delta is not None:
+                request.delta.save_snapshot(duckdb_conn=duckdb_conn)
+
+        if acquisition_config.wikidata.enrich_communes:
+            output_dir_wikidata = output_dir / "wikidata"
+            logging.info("Enriching the communes with Wikidata")
+            # The enrichment is optional: a Wikidata outage does not fail the acquisition, the results of the batches
+            # that succeeded being kept in the cache for the next run
+            try:
+                EnrichmentWikidataCommunes(
+                    communes_view_name=request_insee_commune.view_name,
+                    output_paths=OutputPathsEnrichmentWikidata(
+                        batches_directory=output_dir_wikidata / "batches",
+                        raw_entities=output_dir_wikidata / "raw" / filenames_communes,
+                        enriched_entities=(output_dir_wikidata / "cleaned" / filenames_communes).with_suffix("." + acquisition_config.wikidata.output_format)
+                    ),
+                    acquisition_config=acquisition_config.wikidata
+                ).send(duckdb_conn=duckdb_conn)
+            except RuntimeError as e:
+                logging.error(f"Failed to enrich the communes with Wikidata, the communes are not enriched: {e}")
+    finally:
+        acquisition_config.insee.close_http_client()
+        acquisition_config.laposte.close_http_client()
+        acquisition_config.wikidata.close_http_client()
+    return hierarchy
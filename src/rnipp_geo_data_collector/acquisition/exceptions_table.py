@@ -0,0 +1,73 @@
+from pathlib import Path
+from typing import Any, Optional
+import logging
+import pandas
+import duckdb
+
+from .sql_templates import SQL_TEMPLATES
+
+
+EXCEPTIONS_TABLE_NAME = "geocollect_exceptions"
+
+# Union of the columns of the exceptions of all the entities, the others being NULL
+EXCEPTIONS_TABLE_COLUMNS = [
+    "entity",
+    "action",
+    "uri",
+    "insee_code",
+    "label",
+    "article_code",
+    "parent_uri",
+    "long_label",
+    "iso3166alpha2_code",
+    "iso3166alpha3_code",
+    "iso3166num_code",
+    "start_event_uri",
+    "end_event_uri",
+    "start_date",
+    "end_date",
+    "parent_uri_count",
+    "start_date_count",
+    "end_date_count",
+    "name",
+    "postal_code",
+    "delivery_label",
+    "associated_name"
+]
+
+
+def load_exceptions_table(
+        requests: list[Any],
+        duckdb_conn: duckdb.DuckDBPyConnection,
+        table_name: str = EXCEPTIONS_TABLE_NAME
+    ) -> int:
+    """
+    Load the exceptions to apply to all the entities into a single table, each row being tagged with the entity
+    (the view name of its request) and the action (`add_or_replace`, `remove`), then read by the update templates.
+    Each request gives its rows through `get_exceptions_rows`.
+    Return the number of rows loaded.
+    """
+    rows: list[dict[str, Optional[str]]] = []
+    for request in requests:
+        for exception_row in request.get_exceptions_rows():
+            row: dict[str, Optional[str]] = {column: None for column in EXCEPTIONS_TABLE_COLUMNS}
+            for column, value in exception_row.items():
+                if column not in row:
+                    raise RuntimeError(f"Unknown exception column {column} for {request.view_name}")
+                row[column] = None if value is None else str(value)
+            row["entity"] = request.view_name
+            rows.append(row)
+
+    template_path = Path(__file__).parent / "sql" / "exceptions_table.mustache.sql"
+    relation_name = f"{table_name}_rows"
+    rendered_str = SQL_TEMPLATES.render(template_path, {"table_name": table_name, "input_relation": relation_name})
+
+    try:
+        duckdb_conn.register(relation_name, pandas.DataFrame(rows, columns=EXCEPTIONS_TABLE_COLUMNS, dtype=object))
+        duckdb_conn.execute(rendered_str)
+    except Exception as e:
+        raise RuntimeError(f"Failed to execute SQL script {template_path}") from e
+    finally:
+        duckdb_conn.unregister(relation_name)
+    logging.info(f"Loaded {len(rows)} exception(s) into {table_name}")
+    return len(rows)
@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Optional
+import hashlib
+import logging
+import threading
+import uuid
+import duckdb
+
+from .sql_templates import SQL_TEMPLATES
+
+
+class RunDatabase:
+    """
+    Metadata of the runs kept in a persistent DuckDB database, next to the entity tables loaded by the runs:
+    one row per run, the result of every check and the fingerprint of the inputs of each loaded entity table,
+    so that a later run reuses the tables whose inputs are unchanged, and the validated snapshot of each entity, so
+    that a later run checks the rows changed since then (all of them every `full_validation_days` days).
+    The metadata may be written from the threads of the acquisition stage, the statements are serialized on the connection.
+    """
+    def __init__(
+            self,
+            duckdb_conn: duckdb.DuckDBPyConnection,
+            run_id: Optional[str] = None,
+            force_checks: bool = False,
+            full_validation_days: Optional[int] = None
+        ):
+        self.duckdb_conn = duckdb_conn
+        self.run_id = run_id if run_id is not None else uuid.uuid4().hex
+        self.force_checks = force_checks
+        self.full_validation_days = full_validation_days
+        self.sql_templates_directory = Path(__file__).parent / "sql"
+        self.lock = threading.Lock()
+
+    def execute(self, template_name: str, parameters: Optional[list[Any]] = None) -> list[tuple[Any, ...]]:
+        template_path = self.sql_templates_directory / f"run_database_{template_name}.mustache.sql"
+        rendered_str = SQL_TEMPLATES.render(template_path, {})
+
+        try:
+            with self.lock:
+                return self.duckdb_conn.execute(rendered_str, parameters).fetchall()
+        except Exception as e:
+            raise RuntimeError(f"Failed to execute SQL script {template_path}") from e
+
+    def init(self) -> None:
+        """Create the metadata tables if the database does not hold them yet"""
+        self.execute("init")
+
+    def start_run(self, working_directory: Path, acquisition_config: str) -> None:
+        self.execute("start_run", [self.run_id, str(working_directory.resolve()), acquisition_config])
+        logging.info(f"Run {self.run_id} recorded in the DuckDB database")
+
+    def finish_run(self, status: str, error: Optional[str] = None) -> None:
+        self.execute("finish_run", [status, error, self.run_id])
+
+    def record_check(self, name: str, kind: str, status: str, elapsed: float, message: Optional[str] = None) -> None:
+        self.execute("record_check", [self.run_id, name, kind, status, elapsed, message])
+
+    def get_fingerprint(self, table_name: str) -> Optional[str]:
+        """Return the fingerprint of the inputs of `table_name`, or None if the table was not loaded by a previous run"""
+        rows = self.execute("get_fingerprint", [table_name])
+        return rows[0][0] if len(rows) > 0 else None
+
+    def set_fingerprint(self, table_name: str, fingerprint: str) -> None:
+        self.execute("set_fingerprint", [table_name, fingerprint, self.run_id])
+
+    def is_check_passed(self, check_key: str) -> bool:
+        """Whether the check of key `check_key` passed in a previous run, always False when the checks are forced"""
+        if self.force_checks:
+            return False
+        return len(self.execute("get_check_passed", [check_key])) > 0
+
+    def set_check_passed(self, check_key: str, name: str) -> None:
+        self.execute("set_check_passed", [check_key, name, self.run_id])
+
+    def get_snapshot(self, table_name: str) -> Optional[tuple[str, datetime]]:
+        """Return the fingerprint of the code and the date of the last full validation of the snapshot `table_name`, or None if no run took it"""
+        rows = self.execute("get_snapshot", [table_name])
+        return (rows[0][0], rows[0][1]) if len(rows) > 0 else None
+
+    def is_snapshot_usable(self, table_name: str) -> bool:
+        """
+        Whether the checks may run on the rows changed since the snapshot `table_name`: taken with the same code and
+        fully validated less than `full_validation_days` days ago, the checks not being forced
+        """
+        if self.force_checks:
+            return False
+        snapshot = self.get_snapshot(table_name)
+        if snapshot is None:
+            return False
+        code_fingerprint, fully_validated_at = snapshot
+        if code_fingerprint != get_code_fingerprint():
+            return False
+        return self.full_validation_days is None or datetime.now() - fully_validated_at < timedelta(days=self.full_validation_days)
+
+    def set_snapshot(self, table_name: str, fully_validated: bool) -> None:
+        """Record the snapshot `table_name` taken by the run, keeping the date of its last full validation unless all of its rows were checked"""
+        snapshot = None if fully_validated else self.get_snapshot(table_name)
+        self.execute("set_snapshot", [table_name, get_code_fingerprint(), self.run_id, snapshot[1] if snapshot is not None else None])
+
+
+def get_inputs_fingerprint(paths: list[Path], settings: list[str]) -> str:
+    """Hash of the content of the input files (raw response, SQL templates) and of the settings they are loaded with"""
+    content_hash = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                content_hash.update(chunk)
+        content_hash.update(b"\0")
+    for setting in settings:
+        content_hash.update(setting.encode("utf-8"))
+        content_hash.update(b"\0")
+    return content_hash.hexdigest()
+
+
+@lru_cache(maxsize=1)
+def get_code_fingerprint() -> str:
+    """Hash of the version of the package and of its source files (code, SQL templates, SPARQL requests)"""
+    package_directory = Path(__file__).parent.parent
+    try:
+        version = metadata.version("rnipp-geo-data-collector")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    paths = sorted(path for pattern in ("*.py", "*.sql", "*.rq") for path in package_directory.rglob(pattern))
+    return get_inputs_fingerprint(paths=paths, settings=[version, *(str(path.relative_to(package_directory)) for path in paths)])
+
+
+def get_check_key(name: str, inputs_fingerprints: list[str]) -> str:
+    """Key of the result of a check: its name, the fingerprints of the inputs it reads and the fingerprint of the code"""
+    return get_inputs_fingerprint(paths=[], settings=[name, *inputs_fingerprints, get_code_fingerprint()])
@@ -0,0 +1,195 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Optional
+import logging
+import time
+import duckdb
+
+
+class Step:
+    """Unit of work of the acquisition graph, run on its own cursor once all the steps it depends on have succeeded"""
+    def __init__(
+            self,
+            name: str,
+            kind: str,
+            run: Callable[[duckdb.DuckDBPyConnection], Any],
+            depends_on: list[str] = []
+        ):
+        self.name = name
+        self.kind = kind
+        self.run = run
+        self.depends_on = list(depends_on)
+
+
+class StepTiming:
+    """Time at which a step was ready to run (its dependencies done), started and ended, in seconds from the start of the scheduler"""
+    def __init__(
+            self,
+            step: Step,
+            ready: float,
+            start: float,
+            end: float,
+            error: Optional[BaseException] = None
+        ):
+        self.step = step
+        self.ready = ready
+        self.start = start
+        self.end = end
+        self.error = error
+
+    @property
+    def elapsed(self) -> float:
+        return self.end - self.start
+
+
+class StepScheduler:
+    """
+    Run a graph of steps, each step being started as soon as the steps it depends on have succeeded.
+
+    The ready steps run at the same time, in one thread pool per kind of step sized by `max_workers` (one worker for
+    a kind not listed), and are submitted in the order in which they are declared. Each step gets a cursor on the
+    database, created in the calling thread as a DuckDB connection must not be shared between threads.
+    After a failure no new step is started: the running ones are awaited, then the failure of the first failed step,
+    in the order of declaration, is raised.
+    `on_finished` is called in the calling thread with the timing of each step once it ends.
+    """
+    # Delay between the time a step is ready and its start above which it is considered waiting for a worker, in seconds
+    pool_wait_tolerance = 0.01
+
+    def __init__(
+            self,
+            steps: list[Step],
+            max_workers: dict[str, int] = {},
+            on_finished: Optional[Callable[[StepTiming], None]] = None
+        ):
+        self.steps = steps
+        self.max_workers = max_workers
+        self.on_finished = on_finished
+        self.timings: dict[str, StepTiming] = {}
+        self.check_graph()
+
+    def check_graph(self) -> None:
+        """Check that the step names are unique, that the dependencies exist and that there is no cycle"""
+        names = [step.name for step in self.steps]
+        duplicated_names = sorted({name for name in names if names.count(name) > 1})
+        if len(duplicated_names) > 0:
+            raise RuntimeError(f"Duplicated step names: {duplicated_names}")
+        for step in self.steps:
+            unknown_names = [name for name in step.depends_on if name not in names]
+            if len(unknown_names) > 0:
+                raise RuntimeError(f"Step \"{step.name}\" depends on unknown steps: {unknown_names}")
+
+        nb_dependencies = {step.name: len(step.depends_on) for step in self.steps}
+        ready_names = [name for name, nb in nb_dependencies.items() if nb == 0]
+        nb_sorted = 0
+        while len(ready_names) > 0:
+            name = ready_names.pop()
+            nb_sorted += 1
+            for step in self.get_dependents(name):
+                nb_dependencies[step.name] -= 1
+                if nb_dependencies[step.name] == 0:
+                    ready_names.append(step.name)
+        if nb_sorted < len(self.steps):
+            raise RuntimeError(f"Cycle in the dependencies of the steps: {sorted(name for name, nb in nb_dependencies.items() if nb > 0)}")
+
+    def get_dependents(self, name: str) -> list[Step]:
+        return [step for step in self.steps if name in step.depends_on]
+
+    def run(self, duckdb_conn: duckdb.DuckDBPyConnection) -> list[StepTiming]:
+        """Run all the steps and return their timings, in the order in which they ended"""
+        origin = time.perf_counter()
+        kinds = list(dict.fromkeys(step.kind for step in self.steps))
+        executors = {
+            kind: ThreadPoolExecutor(max_workers=max(self.max_workers.get(kind, 1), 1), thread_name_prefix=f"geo-data-{kind}")
+            for kind in kinds
+        }
+        nb_dependencies = {step.name: len(step.depends_on) for step in self.steps}
+        pending_steps = list(self.steps)
+        running: dict[Future, tuple[Step, duckdb.DuckDBPyConnection, float]] = {}
+        failed_steps: list[Step] = []
+        ended_timings: list[StepTiming] = []
+
+        def run_step(step: Step, cursor: duckdb.DuckDBPyConnection) -> tuple[float, float]:
+            start = time.perf_counter() - origin
+            step.run(cursor)
+            return start, time.perf_counter() - origin
+
+        try:
+            while len(pending_steps) > 0 or len(running) > 0:
+                if len(failed_steps) == 0:
+                    for step in [step for step in pending_steps if nb_dependencies[step.name] == 0]:
+                        pending_steps.remove(step)
+                        cursor = duckdb_conn.cursor()
+                        future = executors[step.kind].submit(run_step, step, cursor)
+                        running[future] = (step, cursor, time.perf_counter() - origin)
+                if len(running) == 0:
+                    break
+
+                done, _ = wait(list(running.keys()), return_when=FIRST_COMPLETED)
+                for future in done:
+                    step, cursor, ready = running.pop(future)
+                    cursor.close()
+                    error = future.exception()
+                    if error is None:
+                        start, end = future.result()
+                    else:
+                        start, end = ready, time.perf_counter() - origin
+                        failed_steps.append(step)
+                    timing = StepTiming(step=step, ready=ready, start=start, end=end, error=error)
+                    self.timings[step.name] = timing
+                    ended_timings.append(timing)
+                    if self.on_finished is not None:
+                        self.on_finished(timing)
+                    if error is None:
+                        for dependent in self.get_dependents(step.name):
+                            nb_dependencies[dependent.name] -= 1
+        finally:
+            # Only left when the scheduling itself was interrupted
+            for future in running.keys():
+                future.cancel()
+            for executor in executors.values():
+                executor.shutdown(wait=True, cancel_futures=True)
+            for step, cursor, ready in running.values():
+                cursor.close()
+
+        if len(failed_steps) > 0:
+            first_failed_step = min(failed_steps, key=self.steps.index)
+            error = self.timings[first_failed_step.name].error
+            assert error is not None
+            raise error
+        return ended_timings
+
+    def get_critical_path(self) -> list[StepTiming]:
+        """
+        Chain of steps that determined the total duration: from the last step to end, back each time through the
+        dependency that ended last or, for a step that waited for a worker of its pool, through the step of its kind
+        that ended last before it started
+        """
+        if len(self.timings) == 0:
+            return []
+        timing = max(self.timings.values(), key=lambda timing: timing.end)
+        path = [timing]
+        while True:
+            if timing.start - timing.ready > self.pool_wait_tolerance:
+                previous_timings = [
+                    other for other in self.timings.values()
+                    if other.step.kind == timing.step.kind and other is not timing and other.end <= timing.start
+                ]
+            else:
+                previous_timings = [self.timings[name] for name in timing.step.depends_on if name in self.timings]
+            if len(previous_timings) == 0:
+                break
+            timing = max(previous_timings, key=lambda previous: previous.end)
+            path.append(timing)
+        return list(reversed(path))
+
+    def log_timings(self) -> None:
+        """Log the time taken by each step, in the order in which they started, and the critical path"""
+        for timing in sorted(self.timings.values(), key=lambda timing: timing.start):
+            status = "failed" if timing.error is not None else "done"
+            logging.info(f"{timing.step.name} ({timing.step.kind}) {status}: started at {timing.start:.2f}s, took {timing.elapsed:.2f}s")
+        critical_path = self.get_critical_path()
+        if len(critical_path) > 0:
+            logging.info(
+                f"Critical path ({critical_path[-1].end:.2f}s): "
+                + " -> ".join(f"{timing.step.name} ({timing.start:.2f}s-{timing.end:.2f}s)" for timing in critical_path)
+            )
@@ -0,0 +1,26 @@
+CREATE OR REPLACE TABLE {{table_name}} AS (
+    SELECT
+        CAST(entity AS VARCHAR) AS entity,
+        CAST(action AS VARCHAR) AS action,
+        CAST(uri AS VARCHAR) AS uri,
+        CAST(insee_code AS VARCHAR) AS insee_code,
+        CAST(label AS VARCHAR) AS label,
+        CAST(article_code AS VARCHAR) AS article_code,
+        CAST(parent_uri AS VARCHAR) AS parent_uri,
+        CAST(long_label AS VARCHAR) AS long_label,
+        CAST(iso3166alpha2_code AS VARCHAR) AS iso3166alpha2_code,
+        CAST(iso3166alpha3_code AS VARCHAR) AS iso3166alpha3_code,
+        CAST(iso3166num_code AS VARCHAR) AS iso3166num_code,
+        CAST(start_event_uri AS VARCHAR) AS start_event_uri,
+        CAST(end_event_uri AS VARCHAR) AS end_event_uri,
+        CAST(start_date AS DATE) AS start_date,
+        CAST(end_date AS DATE) AS end_date,
+        CAST(parent_uri_count AS INTEGER) AS parent_uri_count,
+        CAST(start_date_count AS INTEGER) AS start_date_count,
+        CAST(end_date_count AS INTEGER) AS end_date_count,
+        CAST(name AS VARCHAR) AS name,
+        CAST(postal_code AS VARCHAR) AS postal_code,
+        CAST(delivery_label AS VARCHAR) AS delivery_label,
+        CAST(associated_name AS VARCHAR) AS associated_name
+    FROM {{input_relation}}
+) ;
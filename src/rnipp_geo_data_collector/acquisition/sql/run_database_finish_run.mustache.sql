@@ -0,0 +1,3 @@
+UPDATE geocollect_runs
+SET finished_at = current_localtimestamp(), status = ?, error = ?
+WHERE run_id = ? ;
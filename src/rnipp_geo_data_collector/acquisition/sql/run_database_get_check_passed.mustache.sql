@@ -0,0 +1,3 @@
+SELECT run_id
+FROM geocollect_check_cache
+WHERE check_key = ? ;
@@ -0,0 +1,4 @@
+SELECT i.fingerprint, i.run_id
+FROM geocollect_entity_inputs AS i
+INNER JOIN information_schema.tables AS t ON t.table_name = i.table_name AND t.table_type = 'BASE TABLE'
+WHERE i.table_name = ? ;
@@ -0,0 +1,4 @@
+SELECT t_snapshot.code_fingerprint, t_snapshot.fully_validated_at
+FROM geocollect_snapshots as t_snapshot
+WHERE t_snapshot.table_name = ?
+AND EXISTS (SELECT 1 FROM duckdb_tables() as t_table WHERE t_table.table_name = t_snapshot.table_name) ;
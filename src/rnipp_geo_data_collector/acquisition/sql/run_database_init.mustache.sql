@@ -0,0 +1,37 @@
+CREATE TABLE IF NOT EXISTS geocollect_runs (
+    run_id VARCHAR PRIMARY KEY,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    status VARCHAR,
+    error VARCHAR,
+    working_directory VARCHAR,
+    acquisition_config VARCHAR
+) ;
+CREATE TABLE IF NOT EXISTS geocollect_check_results (
+    run_id VARCHAR,
+    name VARCHAR,
+    kind VARCHAR,
+    status VARCHAR,
+    elapsed DOUBLE,
+    message VARCHAR,
+    recorded_at TIMESTAMP
+) ;
+CREATE TABLE IF NOT EXISTS geocollect_entity_inputs (
+    table_name VARCHAR PRIMARY KEY,
+    fingerprint VARCHAR,
+    run_id VARCHAR,
+    loaded_at TIMESTAMP
+) ;
+CREATE TABLE IF NOT EXISTS geocollect_check_cache (
+    check_key VARCHAR PRIMARY KEY,
+    name VARCHAR,
+    run_id VARCHAR,
+    passed_at TIMESTAMP
+) ;
+CREATE TABLE IF NOT EXISTS geocollect_snapshots (
+    table_name VARCHAR PRIMARY KEY,
+    code_fingerprint VARCHAR,
+    run_id VARCHAR,
+    validated_at TIMESTAMP,
+    fully_validated_at TIMESTAMP
+) ;
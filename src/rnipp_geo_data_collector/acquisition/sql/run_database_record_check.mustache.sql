@@ -0,0 +1,2 @@
+INSERT INTO geocollect_check_results (run_id, name, kind, status, elapsed, message, recorded_at)
+VALUES (?, ?, ?, ?, ?, ?, current_localtimestamp()) ;
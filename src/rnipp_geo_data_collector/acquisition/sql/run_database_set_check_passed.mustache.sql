@@ -0,0 +1,2 @@
+INSERT OR REPLACE INTO geocollect_check_cache (check_key, name, run_id, passed_at)
+VALUES (?, ?, ?, current_localtimestamp()) ;
@@ -0,0 +1,2 @@
+INSERT OR REPLACE INTO geocollect_entity_inputs (table_name, fingerprint, run_id, loaded_at)
+VALUES (?, ?, ?, current_localtimestamp()) ;
@@ -0,0 +1,2 @@
+INSERT OR REPLACE INTO geocollect_snapshots (table_name, code_fingerprint, run_id, validated_at, fully_validated_at)
+VALUES (?, ?, ?, current_localtimestamp(), coalesce(?, current_localtimestamp())) ;
@@ -0,0 +1,2 @@
+INSERT INTO geocollect_runs (run_id, started_at, finished_at, status, error, working_directory, acquisition_config)
+VALUES (?, current_localtimestamp(), NULL, 'running', NULL, ?, ?) ;
@@ -0,0 +1,81 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+import json
+import threading
+import pystache
+from pystache.parsed import ParsedTemplate
+
+
+class SQLTemplateRegistry:
+    """
+    SQL templates loaded and parsed once, with the statements rendered from them cached by template and context (the
+    last `max_cached_statements` of them). The values of the checks (patterns...) are not rendered in the statements
+    but bound as parameters when they are executed. The statements may be rendered from the threads of the acquisition stage.
+    """
+    def __init__(
+            self,
+            directories: list[Path],
+            max_cached_statements: int = 1024
+        ):
+        self.directories = directories
+        self.max_cached_statements = max_cached_statements
+        self.renderer = pystache.Renderer(escape=lambda s: s)
+        self.templates: dict[Path, ParsedTemplate] = {}
+        self.statements: OrderedDict[tuple[Path, str], str] = OrderedDict()
+        self.lock = threading.Lock()
+        for directory in directories:
+            for template_path in sorted(directory.glob("*.sql")):
+                self.templates[template_path.resolve()] = self.load(template_path)
+
+    def load(self, template_path: Path) -> ParsedTemplate:
+        try:
+            with open(template_path, 'r', encoding='utf-8') as template_file:
+                return pystache.parse(template_file.read())
+        except Exception as e:
+            raise RuntimeError(f"Failed to load template file {template_path}") from e
+
+    def get(self, template_path: Path) -> ParsedTemplate:
+        """Parsed template of `template_path`, loaded on first use if it is not in the directories of the registry"""
+        key = Path(template_path)
+        with self.lock:
+            template = self.templates.get(key)
+        if template is None:
+            # Resolved once per path given by the callers, later lookups find it as given
+            resolved_path = key.resolve()
+            with self.lock:
+                template = self.templates.get(resolved_path)
+            if template is None:
+                template = self.load(resolved_path)
+            with self.lock:
+                self.templates[key] = template
+                self.templates[resolved_path] = template
+        return template
+
+    def render(self, template_path: Path, context: dict[str, Any]) -> str:
+        """Statement rendered from `template_path` with `context`, from the cache if it was already rendered"""
+        template = self.get(template_path)
+        try:
+            key = (Path(template_path), json.dumps(context, sort_keys=True, default=str))
+        except Exception as e:
+            raise RuntimeError(f"Failed to render template file {template_path}") from e
+        with self.lock:
+            if key in self.statements:
+                self.statements.move_to_end(key)
+                return self.statements[key]
+
+        try:
+            rendered_str = self.renderer.render(template, context)
+        except Exception as e:
+            raise RuntimeError(f"Failed to render template file {template_path}") from e
+
+        with self.lock:
+            self.statements[key] = rendered_str
+            if len(self.statements) > self.max_cached_statements:
+                self.statements.popitem(last=False)
+        return rendered_str
+
+
+SQL_TEMPLATES = SQLTemplateRegistry(
+    directories=[Path(__file__).parent / "sql", *sorted((Path(__file__).parent / "suppliers").glob("*/sql"))]
+)
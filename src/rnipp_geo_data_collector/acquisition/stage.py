@@ -0,0 +1,187 @@
+from typing import Any, Callable, Optional
+import logging
+import duckdb
+
+from .run_database import RunDatabase, get_check_key
+from .scheduler import Step, StepScheduler, StepTiming
+
+
+class AcquisitionTask:
+    """Download of one supplier entity followed by its own content checks"""
+    def __init__(
+            self,
+            name: str,
+            request: Any,
+            supplier: Optional[str] = None
+        ):
+        self.name = name
+        self.request = request
+        self.supplier = supplier
+
+    def download(self, duckdb_conn: Optional[duckdb.DuckDBPyConnection] = None) -> None:
+        if self.supplier is None:
+            logging.info(f"Downloading \"{self.name}\" data")
+        else:
+            logging.info(f"Downloading \"{self.name}\" data from {self.supplier}")
+        try:
+            self.request.send(duckdb_conn=duckdb_conn)
+        except Exception as e:
+            logging.error(f"Error downloading \"{self.name}\" data: {e}")
+            raise RuntimeError(f"Failed to download \"{self.name}\" data: {e}") from e
+
+    def check(self, duckdb_conn: duckdb.DuckDBPyConnection, threads: int = 1) -> None:
+        try:
+            self.request.check_content(duckdb_conn=duckdb_conn, threads=threads)
+        except Exception as e:
+            logging.error(f"Error checking content of \"{self.name}\" data: {e}")
+            raise RuntimeError(f"Failed to check content of \"{self.name}\" data: {e}") from e
+
+
+class CrossEntityTable:
+    """Table, or in-memory structure such as the hierarchy graph, derived from several entities, built once all of its inputs have been checked and read by cross-entity checks"""
+    def __init__(
+            self,
+            description: str,
+            inputs: list[Any],
+            run: Callable[[duckdb.DuckDBPyConnection], Any]
+        ):
+        if len(inputs) == 0:
+            raise RuntimeError("No inputs provided")
+        self.description = description
+        self.inputs = inputs
+        self.run = run
+
+    def build(self, duckdb_conn: duckdb.DuckDBPyConnection) -> None:
+        logging.info(self.description)
+        self.run(duckdb_conn)
+
+
+class CrossEntityCheck:
+    """Check involving several entities, runnable once all of its inputs have been checked and the tables it reads built"""
+    def __init__(
+            self,
+            description: str,
+            inputs: list[Any],
+            run: Callable[[duckdb.DuckDBPyConnection], Any],
+            tables: list[CrossEntityTable] = []
+        ):
+        if len(inputs) == 0:
+            raise RuntimeError("No inputs provided")
+        self.description = description
+        self.inputs = inputs
+        self.run = run
+        self.tables = list(tables)
+
+    def get_check_key(self) -> Optional[str]:
+        """Key of the result of the check, or None when the fingerprint of one of its inputs is unknown"""
+        inputs_fingerprints = [request.get_checks_fingerprint() for request in self.inputs]
+        if any(inputs_fingerprint is None for inputs_fingerprint in inputs_fingerprints):
+            return None
+        return get_check_key(self.description, inputs_fingerprints)
+
+    def check(self, duckdb_conn: duckdb.DuckDBPyConnection, run_database: Optional[RunDatabase] = None) -> None:
+        """Run the check, unless it passed on the same inputs with the same code in a previous run recorded in `run_database`"""
+        check_key = self.get_check_key() if run_database is not None else None
+        if check_key is not None and run_database is not None and run_database.is_check_passed(check_key):
+            logging.info(f"{self.description} Skipped, passed on the same inputs in a previous run (cache hit)")
+            return
+        logging.info(self.description)
+        self.run(duckdb_conn)
+        if check_key is not None and run_database is not None:
+            run_database.set_check_passed(check_key, self.description)
+
+
+def record_check(run_database: Optional[RunDatabase], name: str, kind: str, elapsed: float, error: Optional[BaseException] = None) -> None:
+    if run_database is None:
+        return
+    run_database.record_check(
+        name=name,
+        kind=kind,
+        status="passed" if error is None else "failed",
+        elapsed=elapsed,
+        message=None if error is None else str(error)
+    )
+
+
+def run_acquisition_stage(
+    tasks: list[AcquisitionTask],
+    cross_entity_checks: list[CrossEntityCheck],
+    duckdb_conn: duckdb.DuckDBPyConnection,
+    run_database: Optional[RunDatabase] = None,
+    threads: int = 1
+) -> list[StepTiming]:
+    """
+    Download all entities concurrently and check them as soon as they arrive.
+
+    The stage is a graph of steps: the download of each entity, its content checks, which depend on the download,
+    and the cross-entity checks, which depend on the content checks of their own inputs only and on the tables they
+    read (each built once, after the content checks of its inputs). A step starts as soon as its dependencies have
+    succeeded, on its own cursor on the database.
+    All downloads run at the same time, the requests sent to a supplier endpoint being limited by the
+    `max_concurrent_requests` setting of its configuration. The content checks of up to `threads` entities run at the
+    same time (and the checks of an entity that follow its parsing on up to `threads` cursors), as do the cross-entity
+    tables and checks.
+    The outcome of every check is recorded in `run_database` when one is given, and the checks that passed on the
+    same inputs in a previous run are skipped (unless the run database forces them). The time taken by each step and the
+    critical path are logged, and the timings are returned.
+    """
+    if len(tasks) == 0:
+        raise RuntimeError("No acquisition task provided")
+
+    steps: list[Step] = []
+    check_step_names: dict[int, str] = {}
+    recorded_names: dict[str, str] = {}
+    for task in tasks:
+        download_step_name = f"Download of \"{task.name}\""
+        check_step_name = f"Content checks of \"{task.name}\""
+        steps.append(Step(name=download_step_name, kind="download", run=task.download))
+        steps.append(Step(
+            name=check_step_name,
+            kind="entity",
+            run=lambda cursor, task=task: task.check(duckdb_conn=cursor, threads=threads),
+            depends_on=[download_step_name]
+        ))
+        check_step_names[id(task.request)] = check_step_name
+        recorded_names[check_step_name] = task.name
+
+    tables = list(dict.fromkeys(table for check in cross_entity_checks for table in check.tables))
+    for table in tables:
+        missing_inputs = [request for request in table.inputs if id(request) not in check_step_names]
+        if len(missing_inputs) > 0:
+            raise RuntimeError(f"The table \"{table.description}\" could not be built because its inputs are not downloaded: {[request.description for request in missing_inputs]}")
+        steps.append(Step(
+            name=table.description,
+            kind="cross_entity_table",
+            run=table.build,
+            depends_on=list(dict.fromkeys(check_step_names[id(request)] for request in table.inputs))
+        ))
+
+    for check in cross_entity_checks:
+        missing_inputs = [request for request in check.inputs if id(request) not in check_step_names]
+        if len(missing_inputs) > 0:
+            raise RuntimeError(f"The cross-entity check \"{check.description}\" could not be run because its inputs are not downloaded: {[request.description for request in missing_inputs]}")
+        steps.append(Step(
+            name=check.description,
+            kind="cross_entity",
+            run=lambda cursor, check=check: check.check(duckdb_conn=cursor, run_database=run_database),
+            depends_on=list(dict.fromkeys([
+                *(check_step_names[id(request)] for request in check.inputs),
+                *(table.description for table in check.tables)
+            ]))
+        ))
+        recorded_names[check.description] = check.description
+
+    def on_finished(timing: StepTiming) -> None:
+        if timing.step.kind in ("entity", "cross_entity"):
+            record_check(run_database, recorded_names[timing.step.name], timing.step.kind, timing.elapsed, timing.error)
+
+    scheduler = StepScheduler(
+        steps=steps,
+        max_workers={"download": len(tasks), "entity": threads, "cross_entity_table": threads, "cross_entity": threads},
+        on_finished=on_finished
+    )
+    try:
+        timings = scheduler.run(duckdb_conn=duckdb_conn)
+    finally:
+        scheduler.log_timings()
+    return timings
@@ -9,6 +9,11 @@ if TYPE_CHECKING:
 
 
 class DataValidationAndConsistencyInseeCog(ABC):
+    # Whether each row is checked on its own, the check then reading only the rows changed since the validated snapshot
+    row_local: bool = False
+    # Column on which the check compares the rows, the check then reading only the rows sharing a value of it with the changed rows
+    delta_key: Optional[str] = None
+
     def __init__(self):
         pass
 
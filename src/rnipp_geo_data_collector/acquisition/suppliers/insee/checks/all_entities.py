@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from pathlib import Path
+import logging
+from duckdb import DuckDBPyConnection
+from typing import TYPE_CHECKING, Any
+
+from ....sql_templates import SQL_TEMPLATES
+
+if TYPE_CHECKING:
+    from ..requests import RequestCOG
+
+class AllEntitiesInseeCog:
+    """
+    All the geographic entities of the COG requests in a single table, with the view of each entity as its type, and
+    their geographic events (the start and end events of each entity, with its date) in a second one. Built once all
+    the requests are checked, then read by the global checks instead of the views of the requests.
+    The rows changed since the validated snapshot of their request (all the rows of a request without delta) are
+    flagged, the global checks then reading only the rows sharing a key with them.
+    """
+    def __init__(
+            self,
+            requests: list[RequestCOG],
+            table_name: str = "insee_all_entities",
+            events_table_name: str = "insee_geographic_events"
+        ):
+        if len(requests) == 0:
+            raise RuntimeError("No requests provided")
+
+        self.requests = requests
+        self.table_name = table_name
+        self.events_table_name = events_table_name
+        self.with_deltas = False
+
+    def create(self, duckdb_conn: DuckDBPyConnection) -> None:
+        """Create the table of the entities and the table of their events"""
+        template_path = Path(__file__).parent.parent / "sql" / "all_entities_tables.mustache.sql"
+
+        try:
+            entities: list[dict[str, Any]] = [
+                {
+                    "entity": request.view_name,
+                    "view_name": request.view_name,
+                    "has_parent_uri": "parent_uri" in duckdb_conn.sql(f"SELECT * FROM {request.view_name} LIMIT 0").columns,
+                    "rows_view_name": request.delta.rows_view_name if request.delta is not None and request.delta.created else None,
+                    "last": index == len(self.requests) - 1
+                }
+                for index, request in enumerate(self.requests)
+            ]
+        except Exception as e:
+            raise RuntimeError("Failed to read the columns of the views of the COG requests") from e
+        context: dict[str, Any] = {
+            "table_name": self.table_name,
+            "events_table_name": self.events_table_name,
+            "entities": entities
+        }
+
+        rendered_str = SQL_TEMPLATES.render(template_path, context)
+
+        try:
+            duckdb_conn.execute(rendered_str)
+        except Exception as e:
+            raise RuntimeError(f"Failed to create the tables {self.table_name} and {self.events_table_name}") from e
+        self.with_deltas = any(entity["rows_view_name"] is not None for entity in entities)
+        logging.info(f"All the entities of the COG requests loaded into {self.table_name}, and their geographic events into {self.events_table_name}")
+
+    def get_relation(self, table_name: str, key: str) -> str:
+        """`table_name` (the entities or the events table) restricted to the rows sharing their `key` with the changed rows, when a request has a delta"""
+        if not self.with_deltas:
+            return table_name
+        return f"(SELECT * FROM {table_name} WHERE {key} IN (SELECT {key} FROM {table_name} WHERE changed))"
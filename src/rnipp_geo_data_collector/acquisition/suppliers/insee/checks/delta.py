@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from pathlib import Path
+import logging
+from duckdb import DuckDBPyConnection
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+from ....run_database import RunDatabase
+from ....sql_templates import SQL_TEMPLATES
+from .abstract import DataValidationAndConsistencyInseeCog
+
+if TYPE_CHECKING:
+    from ..requests import RequestCOG
+
+
+class ChangedRowsInseeCog:
+    """Stand-in for a request in its checks, naming the view of the rows of the request to check"""
+    def __init__(self, view_name: str, description: str, request_view_name: str):
+        self.view_name = view_name
+        self.description = description
+        self.request_view_name = request_view_name
+
+    def get_rows_context(self) -> dict[str, Optional[str]]:
+        """Context of the checks reporting row numbers: the rows are numbered over the request, then restricted to the rows to check"""
+        return {"view_name": self.request_view_name, "affected_view_name": self.view_name}
+
+
+class DeltaInseeCog:
+    """
+    Rows of a request that changed since the snapshot of its view taken by the last run that validated it, kept in the
+    run database: the added, modified and removed rows (the removed ones with their previous values). The checks of
+    the rows on their own then read the added and modified rows only, and the checks comparing rows on a column the
+    rows sharing a value of it with them. Without a usable snapshot (first run, new code, last full validation too old
+    or checks forced) all the rows are checked.
+    """
+    def __init__(
+            self,
+            request: RequestCOG,
+            run_database: RunDatabase
+        ):
+        self.request = request
+        self.run_database = run_database
+        self.snapshot_table_name = f"{request.view_name}_validated"
+        self.delta_table_name = f"{request.view_name}_delta"
+        self.rows_view_name = f"{request.view_name}_delta_rows"
+        self.created = False
+
+    def get_key_view_name(self, key: str) -> str:
+        return f"{self.request.view_name}_delta_{key}"
+
+    def create(self, duckdb_conn: DuckDBPyConnection) -> None:
+        """Create the table of the changed rows and the views read by the checks, if the snapshot of the request is usable"""
+        self.created = False
+        if not self.run_database.is_snapshot_usable(self.snapshot_table_name):
+            logging.info(f"All the rows of {self.request.description} are checked: no usable validated snapshot")
+            return
+
+        template_path = Path(__file__).parent.parent / "sql" / "delta_tables.mustache.sql"
+        keys = list(dict.fromkeys(control.delta_key for control in self.request.extra_controls if control.delta_key is not None))
+        context: dict[str, Any] = {
+            "view_name": self.request.view_name,
+            "snapshot_table_name": self.snapshot_table_name,
+            "delta_table_name": self.delta_table_name,
+            "rows_view_name": self.rows_view_name,
+            "keys": [{"key": key, "key_view_name": self.get_key_view_name(key)} for key in keys]
+        }
+        rendered_str = SQL_TEMPLATES.render(template_path, context)
+
+        try:
+            duckdb_conn.execute(rendered_str)
+            nb_rows = dict(duckdb_conn.sql(f"SELECT change, count(*) FROM {self.delta_table_name} GROUP BY change").fetchall())
+        except Exception as e:
+            raise RuntimeError(f"Failed to compute the rows of {self.request.description} changed since its validated snapshot") from e
+        self.created = True
+        logging.info(f"Checking the rows of {self.request.description} changed since its validated snapshot: {nb_rows.get('added', 0)} added, {nb_rows.get('modified', 0)} modified and {nb_rows.get('removed', 0)} removed")
+
+    def get_request(self, control: DataValidationAndConsistencyInseeCog) -> Union[RequestCOG, ChangedRowsInseeCog]:
+        """What `control` checks: the changed rows, the rows sharing its key with them, or the request itself"""
+        if not self.created:
+            return self.request
+        if control.row_local:
+            return ChangedRowsInseeCog(
+                view_name=self.rows_view_name,
+                description=f"{self.request.description} (rows changed since the validated snapshot)",
+                request_view_name=self.request.view_name
+            )
+        if control.delta_key is not None:
+            return ChangedRowsInseeCog(
+                view_name=self.get_key_view_name(control.delta_key),
+                description=f"{self.request.description} (rows sharing their {control.delta_key} with the rows changed since the validated snapshot)",
+                request_view_name=self.request.view_name
+            )
+        return self.request
+
+    def save_snapshot(self, duckdb_conn: DuckDBPyConnection) -> None:
+        """Replace the snapshot of the request by its validated rows"""
+        template_path = Path(__file__).parent.parent / "sql" / "delta_snapshot.mustache.sql"
+        context: dict[str, str] = {
+            "view_name": self.request.view_name,
+            "snapshot_table_name": self.snapshot_table_name
+        }
+        rendered_str = SQL_TEMPLATES.render(template_path, context)
+
+        try:
+            duckdb_conn.execute(rendered_str)
+        except Exception as e:
+            raise RuntimeError(f"Failed to save the validated snapshot of {self.request.description}") from e
+        self.run_database.set_snapshot(self.snapshot_table_name, fully_validated=not self.created)
+        logging.info(f"Validated snapshot of {self.request.description} saved into {self.snapshot_table_name}")
+
+
+def get_affected_children_view_name(child: RequestCOG, parents: list[RequestCOG], duckdb_conn: DuckDBPyConnection) -> str:
+    """
+    View of the rows of `child` that changed since its validated snapshot or link to a parent that changed (or was
+    removed) since the snapshot of its own request, or the view of `child` when one of the requests has no delta
+    """
+    deltas = [request.delta for request in [child, *parents]]
+    child_delta = deltas[0]
+    if child_delta is None or any(delta is None or not delta.created for delta in deltas):
+        return child.view_name
+
+    template_path = Path(__file__).parent.parent / "sql" / "delta_children_view.mustache.sql"
+    children_view_name = f"{child.view_name}_delta_children"
+    context: dict[str, Any] = {
+        "children_view_name": children_view_name,
+        "view_name": child.view_name,
+        "rows_view_name": child_delta.rows_view_name,
+        "parents": [
+            {"delta_table_name": delta.delta_table_name, "last": index == len(deltas) - 2}
+            for index, delta in enumerate(deltas[1:]) if delta is not None
+        ]
+    }
+    rendered_str = SQL_TEMPLATES.render(template_path, context)
+
+    try:
+        duckdb_conn.execute(rendered_str)
+    except Exception as e:
+        raise RuntimeError(f"Failed to select the rows of {child.description} affected by the changes since the validated snapshots") from e
+    return children_view_name
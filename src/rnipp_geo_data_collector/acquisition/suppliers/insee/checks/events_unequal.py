@@ -2,16 +2,18 @@ from __future__ import annotations
 
 from pathlib import Path
 import logging
-import pystache
 from duckdb import DuckDBPyConnection
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
+from ....sql_templates import SQL_TEMPLATES
 from .abstract import DataValidationAndConsistencyInseeCog
 
 if TYPE_CHECKING:
     from ..requests import RequestCOG
 
 class CheckEventsUnequalAfterDownloadInseeCog(DataValidationAndConsistencyInseeCog):
+    row_local = True
+
     def __init__(
             self
         ):
@@ -20,21 +22,9 @@ class CheckEventsUnequalAfterDownloadInseeCog(DataValidationAndConsistencyInseeC
     def run(self, request: RequestCOG, duckdb_conn: DuckDBPyConnection) -> bool:
         """Check if the content of the file is valid : start event uri is distinct from end event uri."""
         template_path = Path(__file__).parent.parent / "sql" / "events_unequal_check.mustashe.sql"
-        renderer = pystache.Renderer(escape=lambda s: s) 
-        context: dict[str, str] = {
-            "view_name": request.view_name
-        }
+        context: dict[str, Optional[str]] = request.get_rows_context()
 
-        try:
-            with open(template_path, 'r', encoding='utf-8') as template_file:
-                template_content = template_file.read()
-        except Exception as e:
-            raise RuntimeError(f"Failed to load template file {template_path}") from e
-        
-        try:
-            rendered_str = renderer.render(template_content, context)
-        except Exception as e:
-            raise RuntimeError(f"Failed to render template file {template_path}") from e
+        rendered_str = SQL_TEMPLATES.render(template_path, context)
                 
         try:
             data_bug = duckdb_conn.sql(rendered_str).fetchall()
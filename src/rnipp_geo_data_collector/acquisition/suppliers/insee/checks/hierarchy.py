@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import logging
+from duckdb import DuckDBPyConnection
+from typing import TYPE_CHECKING
+
+from .abstract import GlobalDataConsistencyInseeCog
+
+if TYPE_CHECKING:
+    from ..hierarchy import InseeHierarchyGraph
+    from ..requests import RequestCOG
+
+
+MAX_REPORTED_FAILURES = 20
+
+
+class CheckHierarchyInseeCog(GlobalDataConsistencyInseeCog):
+    def __init__(
+            self,
+            hierarchy: InseeHierarchyGraph
+        ):
+        super().__init__()
+        self.hierarchy = hierarchy
+
+    def run(self, requests: list[RequestCOG], duckdb_conn: DuckDBPyConnection) -> bool:
+        """Check the structure of the hierarchy graph: no dangling parent, no cycle, one parent at a time and a top-level entity above each child"""
+        descriptions = ", ".join(request.description for request in requests)
+        try:
+            failures = {
+                "link(s) to an unknown parent": [f"{uri} -> {parent_uri}" for uri, parent_uri in self.hierarchy.find_dangling_parents()],
+                "cycle(s)": [", ".join(uris) for uris in self.hierarchy.find_cycles()],
+                "child(ren) with several parents at the same time": [f"{uri} -> {parent_uri_a} and {parent_uri_b}" for uri, parent_uri_a, parent_uri_b in self.hierarchy.find_fan_in()],
+                "child(ren) reaching no top-level entity": self.hierarchy.find_unreachable()
+            }
+        except Exception as e:
+            raise RuntimeError(f"Unexpected error while checking the hierarchy of {descriptions}") from e
+
+        for failure, items in failures.items():
+            for item in items[:MAX_REPORTED_FAILURES]:
+                logging.error(f"Hierarchy of {descriptions}, {failure}: {item}")
+            if len(items) > MAX_REPORTED_FAILURES:
+                logging.error(f"... and {len(items) - MAX_REPORTED_FAILURES} other {failure}")
+        counts = [f"{len(items)} {failure}" for failure, items in failures.items() if len(items) > 0]
+        if len(counts) > 0:
+            raise RuntimeError(f"Bug found in the hierarchy of {descriptions} : {', '.join(counts)}")
+        logging.info(f"Successfully checked the hierarchy of {descriptions}")
+        return True
@@ -2,56 +2,68 @@ from __future__ import annotations
 
 from pathlib import Path
 import logging
-import pystache
 from duckdb import DuckDBPyConnection
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
+from ....sql_templates import SQL_TEMPLATES
 from .abstract import DataValidationAndConsistencyInseeCog, GlobalDataConsistencyInseeCog
+from .all_entities import AllEntitiesInseeCog
+from .intervals import IntervalEngine, find_insee_code_overlaps_with_numpy
 if TYPE_CHECKING:
     from ..requests import RequestCOG
 
 
-def check_insee_code_overlap(requests: list[RequestCOG], duckdb_conn: DuckDBPyConnection) -> bool:
+# Number of overlapping pairs of URIs written to the logs, all of them being counted in the error
+MAX_REPORTED_OVERLAPS = 100
+
+
+def find_insee_code_overlaps(view_name: str, duckdb_conn: DuckDBPyConnection, engine: IntervalEngine = "sql") -> list[tuple[str, str, str]]:
+    """
+    Pairs of URIs sharing an INSEE code over intersecting periods of validity: INSEE code and both URIs.
+    The periods are sorted by INSEE code and start date, and each period is compared with the latest end of the
+    periods before it: only those starting before that end are paired with the periods they overlap, all the pairs
+    being returned.
+    """
+    if engine == "numpy":
+        return find_insee_code_overlaps_with_numpy(view_name=view_name, duckdb_conn=duckdb_conn)
+
     template_path = Path(__file__).parent.parent / "sql" / "insee_code_overlap_check.mustashe.sql"
-    renderer = pystache.Renderer(escape=lambda s: s) 
-    context: dict[str, str] = {}
+    context: dict[str, str] = {"view_name": view_name}
+
+    rendered_str = SQL_TEMPLATES.render(template_path, context)
+
+    return duckdb_conn.sql(rendered_str).fetchall()
+
+
+def check_insee_code_overlap(requests: list[RequestCOG], duckdb_conn: DuckDBPyConnection, engine: IntervalEngine = "sql", view_name: Optional[str] = None) -> bool:
+    """Check that no two URIs share an INSEE code over intersecting periods of validity, the periods of the requests being gathered once unless `view_name` already holds them"""
     if len(requests) == 0:
         raise RuntimeError("No requests provided")
-    elif len(requests) == 1:
-        context["view_name"] = requests[0].view_name
-    else:
-        context["view_name"] = "(" + " UNION ALL ".join([f"SELECT uri, insee_code, start_date, end_date FROM {request.view_name}" for request in requests]) + ")"
+    elif view_name is None and len(requests) == 1:
+        view_name = requests[0].view_name
+    elif view_name is None:
+        view_name = "(" + " UNION ALL ".join([f"SELECT uri, insee_code, start_date, end_date FROM {request.view_name}" for request in requests]) + ")"
 
     try:
-        with open(template_path, 'r', encoding='utf-8') as template_file:
-            template_content = template_file.read()
-    except Exception as e:
-        raise RuntimeError(f"Failed to load template file {template_path}") from e
-    
-    try:
-        rendered_str = renderer.render(template_content, context)
-    except Exception as e:
-        raise RuntimeError(f"Failed to render template file {template_path}") from e
-    
-    try:
-        data_bug = duckdb_conn.sql(rendered_str).fetchall()
-        if len(data_bug) > 0:
-            insee_code_bug = data_bug[0][0]
-            uri_a_bug = data_bug[0][1]
-            uri_b_bug = data_bug[0][2]
-            if len(requests) == 0:
-                raise RuntimeError("No requests provided") 
-            elif len(requests) == 1:
-                request = requests[0]
-                raise RuntimeError(f"Failed to load {request.description} after downloading. The file may be corrupted or not in the expected format. The INSEE code {insee_code_bug} is duplicated for the URI {uri_a_bug} and {uri_b_bug} with a non-empty intersection of dates")
-            else:
-                raise RuntimeError(f"Bug found in Insee code {insee_code_bug} with URIs {uri_a_bug} and {uri_b_bug} : periods of validity overlap detected.")
+        data_bug = find_insee_code_overlaps(view_name=view_name, duckdb_conn=duckdb_conn, engine=engine)
     except Exception as e:
         raise RuntimeError(f"Unexpected error while checking INSEE code overlap") from e
 
-    if len(requests) == 0:
-        raise RuntimeError("No requests provided")
-    elif len(requests) == 1:
+    if len(data_bug) > 0:
+        for insee_code_bug, uri_a_bug, uri_b_bug in data_bug[:MAX_REPORTED_OVERLAPS]:
+            logging.error(f"Periods of validity of the URIs {uri_a_bug} and {uri_b_bug} overlap for the INSEE code {insee_code_bug}")
+        if len(data_bug) > MAX_REPORTED_OVERLAPS:
+            logging.error(f"... and {len(data_bug) - MAX_REPORTED_OVERLAPS} other overlapping pair(s) of URIs")
+        insee_code_bug = data_bug[0][0]
+        uri_a_bug = data_bug[0][1]
+        uri_b_bug = data_bug[0][2]
+        if len(requests) == 1:
+            request = requests[0]
+            raise RuntimeError(f"Failed to load {request.description} after downloading. The file may be corrupted or not in the expected format. The INSEE code {insee_code_bug} is duplicated for the URI {uri_a_bug} and {uri_b_bug} with a non-empty intersection of dates ({len(data_bug)} overlapping pair(s) of URIs)")
+        else:
+            raise RuntimeError(f"Bug found in Insee code {insee_code_bug} with URIs {uri_a_bug} and {uri_b_bug} : periods of validity overlap detected ({len(data_bug)} overlapping pair(s) of URIs).")
+
+    if len(requests) == 1:
         request = requests[0]
         logging.info(f"Successfully checked INSEE code overlap of {request.description} after downloading")
     else:
@@ -59,21 +71,34 @@ def check_insee_code_overlap(requests: list[RequestCOG], duckdb_conn: DuckDBPyCo
     return True
 
 class CheckInseeCodeOverlapAfterDownloadInseeCog(DataValidationAndConsistencyInseeCog):
+    delta_key = "insee_code"
+
     def __init__(
-            self
+            self,
+            engine: IntervalEngine = "sql"
         ):
         super().__init__()
+        self.engine = engine
 
     def run(self, request: RequestCOG, duckdb_conn: DuckDBPyConnection) -> bool:
         """Check if the content of the file is valid for the Insee code overlap"""
-        return check_insee_code_overlap(requests=[request], duckdb_conn=duckdb_conn)
+        return check_insee_code_overlap(requests=[request], duckdb_conn=duckdb_conn, engine=self.engine)
 
 class CheckGlobalInseeCodeOverlapAfterDownloadInseeCog(GlobalDataConsistencyInseeCog):
     def __init__(
-            self
+            self,
+            engine: IntervalEngine = "sql",
+            all_entities: Optional[AllEntitiesInseeCog] = None
         ):
         super().__init__()
+        self.engine = engine
+        self.all_entities = all_entities
 
     def run(self, requests: list[RequestCOG], duckdb_conn: DuckDBPyConnection) -> bool:
         """Check if the content of the file is valid for the Insee code overlap"""
-        return check_insee_code_overlap(requests=requests, duckdb_conn=duckdb_conn)
+        return check_insee_code_overlap(
+            requests=requests,
+            duckdb_conn=duckdb_conn,
+            engine=self.engine,
+            view_name=self.all_entities.get_relation(self.all_entities.table_name, "insee_code") if self.all_entities is not None else None
+        )
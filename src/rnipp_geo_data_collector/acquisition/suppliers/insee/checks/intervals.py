@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Literal, Optional
+import numpy as np
+from duckdb import DuckDBPyConnection
+
+from ....sql_templates import SQL_TEMPLATES
+
+
+# Engine of a check on periods of validity: "sql" runs it in DuckDB, "numpy" pulls the periods as arrays of day
+# numbers (days since 1970-01-01) and integer keys, and runs it with vectorized NumPy operations
+IntervalEngine = Literal["sql", "numpy"]
+
+EPOCH = date(1970, 1, 1)
+
+
+def fetch_arrays(template_name: str, context: dict[str, Any], duckdb_conn: DuckDBPyConnection) -> dict[str, np.ndarray]:
+    """Run an extraction template and return its columns as NumPy arrays"""
+    template_path = Path(__file__).parent.parent / "sql" / template_name
+
+    rendered_str = SQL_TEMPLATES.render(template_path, context)
+
+    try:
+        columns = duckdb_conn.sql(rendered_str).fetchnumpy()
+    except Exception as e:
+        raise RuntimeError(f"Failed to fetch the arrays of template file {template_path}") from e
+    # The extraction templates replace the missing values, the masks are empty
+    return {colname: np.ma.getdata(column) for colname, column in columns.items()}
+
+
+def to_date(day: int, valid: bool = True) -> Optional[date]:
+    return EPOCH + timedelta(days=int(day)) if valid else None
+
+
+def to_codes(values: np.ndarray) -> np.ndarray:
+    """Dense integer codes of the values, from 0"""
+    codes = np.empty(len(values), dtype=np.int64)
+    if len(values) == 0:
+        return codes
+    order = np.argsort(values)
+    sorted_values = values[order]
+    codes[order] = np.concatenate(([0], np.cumsum(sorted_values[1:] != sorted_values[:-1])))
+    return codes
+
+
+def find_overlap_candidates(codes: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Pairs of rows with the same code (a non-negative integer) whose periods [start, end[ intersect, as the indices of
+    the row first in the order of (code, start, end) and of the other one.
+    The rows are sorted once, on a single key packing the code and both days, and each row is compared with the latest
+    end of the rows of its code before it: only the rows starting before that end are compared with the rows before them.
+    """
+    no_pairs = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+    if len(codes) == 0:
+        return no_pairs
+    codes = codes.astype(np.int64)
+    first_day = min(int(starts.min()), int(ends.min()))
+    span = max(int(starts.max()), int(ends.max())) - first_day + 1
+    starts = starts.astype(np.int64) - first_day
+    ends = ends.astype(np.int64) - first_day
+    if (int(codes.max()) + 1) * span * span < 2 ** 62:
+        order = np.argsort((codes * span + starts) * span + ends)
+    else:
+        order = np.lexsort((ends, starts, codes))
+
+    # Each code is shifted past the days of the previous one, so that the running max of the ends restarts at each code
+    sorted_codes = codes[order]
+    sorted_starts = starts[order] + sorted_codes * span
+    sorted_ends = ends[order] + sorted_codes * span
+    max_previous_ends = np.empty(len(order), dtype=np.int64)
+    max_previous_ends[0] = -1
+    max_previous_ends[1:] = np.maximum.accumulate(sorted_ends)[:-1]
+    flagged = np.flatnonzero(max_previous_ends > sorted_starts)
+    if len(flagged) == 0:
+        return no_pairs
+
+    first_rows: list[np.ndarray] = []
+    second_rows: list[np.ndarray] = []
+    code_firsts = np.searchsorted(sorted_codes, sorted_codes[flagged], side='left')
+    for second, code_first in zip(flagged, code_firsts):
+        candidates = np.arange(code_first, second)
+        firsts = candidates[(sorted_ends[candidates] > sorted_starts[second]) & (sorted_starts[candidates] < sorted_ends[second])]
+        first_rows.append(firsts)
+        second_rows.append(np.full(len(firsts), second))
+    return order[np.concatenate(first_rows)], order[np.concatenate(second_rows)]
+
+
+def find_insee_code_overlaps_with_numpy(view_name: str, duckdb_conn: DuckDBPyConnection) -> list[tuple[str, str, str]]:
+    """Same pairs as the SQL check of the INSEE code overlap, in the same order: INSEE code and both URIs"""
+    periods = fetch_arrays("insee_code_periods_arrays.mustache.sql", {"view_name": view_name, "with_labels": False}, duckdb_conn)
+    firsts, seconds = find_overlap_candidates(to_codes(periods["insee_code_hash"]), periods["start_day"], periods["end_day"])
+    if len(firsts) == 0:
+        return []
+
+    # The candidates are checked on the labels, as the hashes of two INSEE codes may collide and a URI may be duplicated
+    labels = fetch_arrays("insee_code_periods_arrays.mustache.sql", {"view_name": view_name, "with_labels": True}, duckdb_conn)
+    label_of = {
+        (insee_code_hash, uri_hash, start_day, end_day): (insee_code, uri)
+        for insee_code_hash, uri_hash, start_day, end_day, insee_code, uri in zip(*(labels[colname].tolist() for colname in ["insee_code_hash", "uri_hash", "start_day", "end_day", "insee_code", "uri"]))
+    }
+
+    def get_sweep_key(index: int) -> tuple[str, int, int, str]:
+        start_day = int(periods["start_day"][index])
+        end_day = int(periods["end_day"][index])
+        insee_code, uri = label_of[(int(periods["insee_code_hash"][index]), int(periods["uri_hash"][index]), start_day, end_day)]
+        return insee_code, start_day, end_day, uri
+
+    pairs: list[tuple[tuple[str, int, int, str], tuple[str, int, int, str]]] = []
+    for first, second in zip(firsts, seconds):
+        key_a = get_sweep_key(first)
+        key_b = get_sweep_key(second)
+        if key_a[0] != key_b[0] or key_a[3] == key_b[3]:
+            continue
+        # Pairs ordered as the SQL sweep: by INSEE code, start, end and URI
+        pairs.append((key_a, key_b) if key_a <= key_b else (key_b, key_a))
+    pairs.sort()
+    return [(key_b[0], key_a[3], key_b[3]) for key_a, key_b in pairs]
+
+
+def fetch_parent_links(links_table_name: str, duckdb_conn: DuckDBPyConnection) -> dict[str, np.ndarray]:
+    # The URIs of the children, and those of their parents, are unique and not empty once they are checked: the row
+    # number of a child identifies it, and the row number of a parent in the union of the parents identifies the parent
+    return fetch_arrays("parent_links_arrays.mustache.sql", {"links_table_name": links_table_name, "with_labels": False}, duckdb_conn)
+
+
+def fetch_parent_links_labels(links_table_name: str, duckdb_conn: DuckDBPyConnection) -> dict[int, tuple[str, str]]:
+    """URI of the child and of the parent of each link"""
+    labels = fetch_arrays("parent_links_arrays.mustache.sql", {"links_table_name": links_table_name, "with_labels": True}, duckdb_conn)
+    return {link_id: (uri, parent_uri) for link_id, uri, parent_uri in zip(labels["link_id"].tolist(), labels["uri"].tolist(), labels["parent_uri"].tolist())}
+
+
+def find_parent_period_overlaps_with_numpy(links_table_name: str, duckdb_conn: DuckDBPyConnection) -> list[tuple[int, str, str, str]]:
+    """Same rows as the SQL check of the parent period overlap: row number, child URI and both parent URIs, each pair in both orders"""
+    links = fetch_parent_links(links_table_name, duckdb_conn)
+    rows = np.flatnonzero(links["parent_exist"] & links["has_parent_start"])
+    if len(rows) == 0:
+        return []
+    row_nums = links["row_num"][rows]
+    firsts, seconds = find_overlap_candidates(row_nums - row_nums.min(), links["parent_start_day"][rows], links["parent_end_day"][rows])
+    firsts = rows[firsts]
+    seconds = rows[seconds]
+    different_parents = links["parent_row_num"][firsts] != links["parent_row_num"][seconds]
+    firsts = firsts[different_parents]
+    seconds = seconds[different_parents]
+    if len(firsts) == 0:
+        return []
+
+    labels = fetch_parent_links_labels(links_table_name, duckdb_conn)
+    data_bug: list[tuple[int, str, str, str]] = []
+    for first, second in zip(firsts, seconds):
+        uri, parent_uri_a = labels[int(links["link_id"][first])]
+        _, parent_uri_b = labels[int(links["link_id"][second])]
+        data_bug.append((int(links["row_num"][first]), uri, parent_uri_a, parent_uri_b))
+        data_bug.append((int(links["row_num"][first]), uri, parent_uri_b, parent_uri_a))
+    return data_bug
+
+
+def find_parent_period_gaps_with_numpy(links_table_name: str, duckdb_conn: DuckDBPyConnection) -> list[tuple[int, str, str]]:
+    """
+    Same rows as the SQL check of the gaps between parent periods: row number, child URI and URI of a parent whose
+    period ends before the last end of the parents of the child without another parent starting on that day
+    """
+    links = fetch_parent_links(links_table_name, duckdb_conn)
+    row_nums = links["row_num"]
+    if len(row_nums) == 0:
+        return []
+    starts = links["parent_start_day"].astype(np.int64)
+    ends = links["parent_end_day"].astype(np.int64)
+    parents = links["parent_row_num"]
+    has_start = links["has_parent_start"]
+    has_end = links["parent_exist"]
+
+    # Latest end of the parents of each child
+    max_ends = np.full(int(row_nums.max()) + 1, np.iinfo(np.int64).min)
+    np.maximum.at(max_ends, row_nums[has_end], ends[has_end])
+
+    # Parents starting on the end of another one, searched by (child, day) among the starts sorted with their parent
+    first_day = min(int(starts.min()), int(ends.min()))
+    span = max(int(starts.max()), int(ends.max())) - first_day + 1
+    after_rows = np.flatnonzero(has_start)
+    after_keys = row_nums[after_rows] * span + (starts[after_rows] - first_day)
+    nb_parents = int(parents.max()) + 1
+    if (int(row_nums.max()) + 1) * span * nb_parents < 2 ** 62:
+        after_order = np.argsort(after_keys * nb_parents + parents[after_rows])
+    else:
+        after_order = np.lexsort((parents[after_rows], after_keys))
+    after_keys = after_keys[after_order]
+    after_parents = parents[after_rows][after_order]
+
+    # Searched in sorted order, which is much faster than in the order of the links
+    before_rows = np.flatnonzero(has_start & has_end & (starts != ends))
+    before_keys = row_nums[before_rows] * span + (ends[before_rows] - first_day)
+    before_order = np.argsort(before_keys)
+    before_rows = before_rows[before_order]
+    before_keys = before_keys[before_order]
+    lefts = np.searchsorted(after_keys, before_keys, side='left')
+    rights = np.searchsorted(after_keys, before_keys, side='right')
+    before_parents = parents[before_rows]
+    # Sorted by parent within a (child, day), another parent starts on that day if the first or the last one differs
+    present_after = (rights > lefts) & (
+        (after_parents[np.minimum(lefts, len(after_parents) - 1)] != before_parents)
+        | (after_parents[np.maximum(rights - 1, 0)] != before_parents)
+    )
+    gaps = before_rows[~present_after & (ends[before_rows] < max_ends[row_nums[before_rows]])]
+    if len(gaps) == 0:
+        return []
+
+    labels = fetch_parent_links_labels(links_table_name, duckdb_conn)
+    return [(int(row_nums[row]), *labels[int(links["link_id"][row])]) for row in gaps]
+
+
+def find_parent_periods_not_containing_child_with_numpy(links_table_name: str, duckdb_conn: DuckDBPyConnection) -> list[tuple[Any, ...]]:
+    """
+    Same rows as the SQL check of the inclusion of the child period in the parent periods: row number, child URI,
+    child period and union of the parent periods (without end if a parent is current or missing)
+    """
+    links = fetch_parent_links(links_table_name, duckdb_conn)
+    row_nums = links["row_num"]
+    if len(row_nums) == 0:
+        return []
+    today = int(links["today_day"][0])
+    nb_children = int(row_nums.max()) + 1
+
+    # Aggregates by row number of the child, the period of the child being the same on all its links
+    link_of_child = np.full(nb_children, -1)
+    link_of_child[row_nums] = np.arange(len(row_nums))
+    has_start = links["has_parent_start"]
+    min_starts = np.full(nb_children, np.iinfo(np.int64).max)
+    np.minimum.at(min_starts, row_nums[has_start], links["parent_start_day"][has_start].astype(np.int64))
+    has_min_start = np.zeros(nb_children, dtype=bool)
+    has_min_start[row_nums[has_start]] = True
+    has_end = links["parent_exist"]
+    max_ends = np.full(nb_children, np.iinfo(np.int64).min)
+    np.maximum.at(max_ends, row_nums[has_end], links["parent_end_day"][has_end].astype(np.int64))
+    is_open = np.zeros(nb_children, dtype=bool)
+    is_open[row_nums[links["parent_is_open"]]] = True
+
+    children = np.flatnonzero(link_of_child >= 0)
+    child_links = link_of_child[children]
+    child_starts = links["start_day"][child_links].astype(np.int64)
+    child_ends = np.where(links["has_end"][child_links], links["end_day"][child_links], today)
+    bad = (
+        (links["has_start"][child_links] & has_min_start[children] & (child_starts < min_starts[children]))
+        | (child_ends > np.where(is_open[children], today, max_ends[children]))
+    )
+    if not bad.any():
+        return []
+
+    labels = fetch_parent_links_labels(links_table_name, duckdb_conn)
+    data_bug: list[tuple[Any, ...]] = []
+    for child, link in zip(children[bad], child_links[bad]):
+        data_bug.append((
+            int(child),
+            labels[int(links["link_id"][link])][0],
+            to_date(links["start_day"][link], links["has_start"][link]),
+            to_date(links["end_day"][link], links["has_end"][link]),
+            to_date(min_starts[child], has_min_start[child]),
+            to_date(max_ends[child], not is_open[child])
+        ))
+    return data_bug
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from pathlib import Path
+import logging
+from duckdb import DuckDBPyConnection
+from typing import TYPE_CHECKING, Optional, Union
+
+from ....sql_templates import SQL_TEMPLATES
+
+if TYPE_CHECKING:
+    from ..requests import RequestCOG
+
+class ParentLinksInseeCog:
+    """
+    Links of the geographic entities of a child request to their parents, one row per child and parent URI, with the
+    period of validity of the parent (its open end set to tomorrow). Built once the child and its parents are
+    checked, then read by all the parent checks of the child.
+    """
+    def __init__(
+            self,
+            parents_view_name: list[str]
+        ):
+        if len(parents_view_name) == 0:
+            raise RuntimeError("No parents view name provided")
+
+        self.parents_view_name = parents_view_name
+
+    def get_table_name(self, request: RequestCOG) -> str:
+        return f"{request.view_name}_parent_links"
+
+    def create(self, request: RequestCOG, duckdb_conn: DuckDBPyConnection, affected_children_view_name: Optional[str] = None) -> None:
+        """
+        Create the table of the links of `request` to its parents, or of the rows of `affected_children_view_name`
+        only, numbered as in the whole request so that the reported rows do not depend on the changed rows
+        """
+        template_path = Path(__file__).parent.parent / "sql" / "parent_links_table.mustache.sql"
+
+        sql_import_parent = " UNION ALL ".join([f"SELECT uri as parent_uri, start_date, end_date FROM {view_name}" for view_name in self.parents_view_name])
+
+        context: dict[str, Union[str, bool]] = {
+            "table_name": self.get_table_name(request),
+            "view_name_child": request.view_name,
+            "affected_children_view_name": affected_children_view_name if affected_children_view_name not in [None, request.view_name] else False,
+            "sql_import_parent": sql_import_parent
+        }
+
+        rendered_str = SQL_TEMPLATES.render(template_path, context)
+
+        try:
+            duckdb_conn.execute(rendered_str)
+        except Exception as e:
+            raise RuntimeError(f"Failed to create the links to the parents of {request.description}") from e
+        logging.info(f"Links to the parents of {request.description} loaded into {self.get_table_name(request)}")
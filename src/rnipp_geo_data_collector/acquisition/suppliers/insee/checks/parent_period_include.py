@@ -2,50 +2,59 @@ from __future__ import annotations
 
 from pathlib import Path
 import logging
-import pystache
 from duckdb import DuckDBPyConnection
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Optional, Union
 
+from ....sql_templates import SQL_TEMPLATES
 from .abstract import DataValidationAndConsistencyInseeCog
+from .intervals import IntervalEngine, find_parent_periods_not_containing_child_with_numpy
+from .parent_links import ParentLinksInseeCog
 
 if TYPE_CHECKING:
     from ..requests import RequestCOG
 
+
+def find_parent_periods_not_containing_child(
+        links_table_name: str,
+        duckdb_conn: DuckDBPyConnection,
+        engine: IntervalEngine = "sql",
+        limit: Optional[int] = None
+    ) -> list[tuple[Any, ...]]:
+    """Children whose period of validity is not included in those of their parents: row number, URI, period of the child and union of the periods of the parents"""
+    if engine == "numpy":
+        data_bug = find_parent_periods_not_containing_child_with_numpy(links_table_name=links_table_name, duckdb_conn=duckdb_conn)
+        return data_bug if limit is None else data_bug[:limit]
+
+    template_path = Path(__file__).parent.parent / "sql" / "parent_period_is_include_check.mustashe.sql"
+
+    context: dict[str, Union[str, Optional[int]]] = {
+        "links_table_name": links_table_name,
+        "limit": limit
+    }
+    rendered_str = SQL_TEMPLATES.render(template_path, context)
+
+    return duckdb_conn.sql(rendered_str).fetchall()
+
+
 class CheckParentPeriodsContainChildPeriodAfterDownloadInseeCog(DataValidationAndConsistencyInseeCog):
     def __init__(
             self,
-            parents_view_name: list[str]
+            parent_links: ParentLinksInseeCog,
+            engine: IntervalEngine = "sql"
         ):
         super().__init__()
-        if len(parents_view_name) == 0:
-            raise RuntimeError("No parents view name provided")
+        self.parent_links = parent_links
+        self.engine = engine
 
-        self.parents_view_name = parents_view_name
-        
     def run(self, request: RequestCOG, duckdb_conn: DuckDBPyConnection) -> bool:
         """Check if period of validity is include in parents periods of validity"""
-
-        template_path = Path(__file__).parent.parent / "sql" / "parent_period_is_include_check.mustashe.sql"
-        renderer = pystache.Renderer(escape=lambda s: s)
-
-        sql_import_parent = " UNION ALL ".join([f"SELECT uri as parent_uri, start_date, end_date FROM {view_name}" for view_name in self.parents_view_name])
-        
-        context: dict[str, str] = {
-            "view_name_child": request.view_name,
-            "sql_import_parent": sql_import_parent
-        }
-        try:
-            with open(template_path, 'r', encoding='utf-8') as template_file:
-                template_content = template_file.read()
-        except Exception as e:
-            raise RuntimeError(f"Failed to load template file {template_path}") from e
         try:
-            rendered_str = renderer.render(template_content, context)
-        except Exception as e:
-            raise RuntimeError(f"Failed to render template file {template_path}") from e
-                
-        try:
-            data_bug = duckdb_conn.sql(rendered_str).fetchall()
+            data_bug = find_parent_periods_not_containing_child(
+                links_table_name=self.parent_links.get_table_name(request),
+                duckdb_conn=duckdb_conn,
+                engine=self.engine,
+                limit=1
+            )
             if len(data_bug) > 0:
                 row_number_bug = data_bug[0][0]
                 uri_bug = data_bug[0][1]
@@ -58,4 +67,3 @@ class CheckParentPeriodsContainChildPeriodAfterDownloadInseeCog(DataValidationAn
             raise RuntimeError(f"Unexpected error while checking all period of validity of children are included in their parents for {request.description}") from e
         logging.info(f"Successfully checked all period of validity of children are included in their parents for {request.description}")
         return True
-
@@ -2,11 +2,12 @@ from __future__ import annotations
 
 from pathlib import Path
 import logging
-import pystache
 from duckdb import DuckDBPyConnection
 from typing import TYPE_CHECKING
 
+from ....sql_templates import SQL_TEMPLATES
 from .abstract import DataValidationAndConsistencyInseeCog
+from .parent_links import ParentLinksInseeCog
 
 if TYPE_CHECKING:
     from ..requests import RequestCOG
@@ -14,36 +15,20 @@ if TYPE_CHECKING:
 class CheckParentURIsExistAfterDownloadInseeCog(DataValidationAndConsistencyInseeCog):
     def __init__(
             self,
-            parents_view_name: list[str]
+            parent_links: ParentLinksInseeCog
         ):
         super().__init__()
-        if len(parents_view_name) == 0:
-            raise RuntimeError("No parents view name provided")
-
-        self.parents_view_name = parents_view_name
+        self.parent_links = parent_links
         
     def run(self, request: RequestCOG, duckdb_conn: DuckDBPyConnection) -> bool:
         """Check if parent uris are present in other files"""
         template_path = Path(__file__).parent.parent / "sql" / "parent_uri_exist_check.mustashe.sql"
-        renderer = pystache.Renderer(escape=lambda s: s)
-
-        sql_import_parent = " UNION ALL ".join([f"SELECT uri as parent_uri FROM {view_name}" for view_name in self.parents_view_name])
 
         context: dict[str, str] = {
-            "view_name_child": request.view_name,
-            "sql_import_parent": sql_import_parent
+            "links_table_name": self.parent_links.get_table_name(request)
         }
 
-        try:
-            with open(template_path, 'r', encoding='utf-8') as template_file:
-                template_content = template_file.read()
-        except Exception as e:
-            raise RuntimeError(f"Failed to load template file {template_path}") from e
-        
-        try:
-            rendered_str = renderer.render(template_content, context)
-        except Exception as e:
-            raise RuntimeError(f"Failed to render template file {template_path}") from e
+        rendered_str = SQL_TEMPLATES.render(template_path, context)
                 
         try:
             data_bug = duckdb_conn.sql(rendered_str).fetchall()
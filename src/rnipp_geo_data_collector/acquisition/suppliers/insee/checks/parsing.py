@@ -2,10 +2,11 @@ from __future__ import annotations
 
 from pathlib import Path
 import logging
-import pystache
 from duckdb import DuckDBPyConnection
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Union
 
+from .....utils.duckdb import get_output_format_context
+from ....sql_templates import SQL_TEMPLATES
 from .abstract import DataValidationAndConsistencyInseeCog
 
 if TYPE_CHECKING:
@@ -23,21 +24,12 @@ class CheckParsingAfterDownloadInseeCog(DataValidationAndConsistencyInseeCog):
         if request.output_paths.cleaned_entities.exists():
             request.output_paths.cleaned_entities.unlink()
         
-        renderer_copy = pystache.Renderer(escape=lambda s: s)
-        context_copy: dict[str, str] = {
+        context_copy: dict[str, Union[str, bool]] = {
             "input_path": str(request.output_paths.raw_entities.resolve()),
-            "output_path": str(request.output_paths.cleaned_entities.resolve())
+            "output_path": str(request.output_paths.cleaned_entities.resolve()),
+            **get_output_format_context(request.acquisition_config.output_format)
         }
-        try:
-            with open(request.sql_templates.copy, 'r', encoding='utf-8') as template_file_copy:
-                template_content_copy = template_file_copy.read()
-        except Exception as e:
-            raise RuntimeError(f"Failed to load template file {request.sql_templates.copy}") from e
-        
-        try:
-            rendered_str_copy = renderer_copy.render(template_content_copy, context_copy)
-        except Exception as e:
-            raise RuntimeError(f"Failed to render template file {request.sql_templates.copy}") from e
+        rendered_str_copy = SQL_TEMPLATES.render(request.sql_templates.copy, context_copy)
 
         try:
             duckdb_conn.execute(rendered_str_copy)
@@ -45,32 +37,52 @@ class CheckParsingAfterDownloadInseeCog(DataValidationAndConsistencyInseeCog):
             raise RuntimeError(f"Failed to copy {request.description} after downloading. The file may be corrupted or not in the expected format.") from e
 
     def create_view(self, request: RequestCOG, duckdb_conn: DuckDBPyConnection):       
-        renderer_import = pystache.Renderer(escape=lambda s: s)
-        context_import: dict[str, str] = {
+        context_import: dict[str, Union[str, bool]] = {
             "view_name": request.view_name,
-            "path": str(request.output_paths.cleaned_entities.resolve())
+            "path": str(request.output_paths.cleaned_entities.resolve()),
+            **get_output_format_context(request.acquisition_config.output_format)
         }
-        try:
-            with open(request.sql_templates.create_view, 'r', encoding='utf-8') as template_file_import:
-                template_content_import = template_file_import.read()
-        except Exception as e:
-            raise RuntimeError(f"Failed to load template file {request.sql_templates.create_view}") from e
-        
-        try:
-            rendered_str_import = renderer_import.render(template_content_import, context_import)
-        except Exception as e:
-            raise RuntimeError(f"Failed to render template file {request.sql_templates.create_view}") from e
+        rendered_str_import = SQL_TEMPLATES.render(request.sql_templates.create_view, context_import)
 
         try:
             duckdb_conn.execute(rendered_str_import)
         except Exception as e:
             raise RuntimeError(f"Failed to load {request.description} after downloading. The file may be corrupted or not in the expected format.") from e
 
+    def create_view_from_table(self, request: RequestCOG, table_name: str, duckdb_conn: DuckDBPyConnection):
+        template_path = Path(__file__).parent.parent / "sql" / "table_view.mustache.sql"
+        context_view: dict[str, str] = {
+            "view_name": request.view_name,
+            "table_name": table_name
+        }
+        rendered_str_view = SQL_TEMPLATES.render(template_path, context_view)
+
+        try:
+            duckdb_conn.execute(rendered_str_view)
+        except Exception as e:
+            raise RuntimeError(f"Failed to load {request.description} after downloading from table {table_name}") from e
    
     def run(self, request: RequestCOG, duckdb_conn: DuckDBPyConnection) -> bool:
         """Check if the content of the file is valid after downloading"""
+        if request.ingested:
+            # The response was already parsed and typed into the raw table while downloading
+            self.create_view_from_table(request=request, table_name=request.raw_table_name, duckdb_conn=duckdb_conn)
+            request.apply_updates(duckdb_conn=duckdb_conn)
+            self.create_view_from_table(request=request, table_name=request.cleaned_table_name, duckdb_conn=duckdb_conn)
+            return True
+        fingerprint = request.get_inputs_fingerprint()
+        if fingerprint is not None and request.run_database is not None and request.run_database.get_fingerprint(request.cleaned_table_name) == fingerprint:
+            logging.info(f"{request.description} unchanged since the table {request.cleaned_table_name} was loaded, reusing it")
+            request.export_cleaned_entities(duckdb_conn=duckdb_conn)
+            self.create_view_from_table(request=request, table_name=request.cleaned_table_name, duckdb_conn=duckdb_conn)
+            return True
         self.copy(request=request, duckdb_conn=duckdb_conn)
         self.create_view(request=request, duckdb_conn=duckdb_conn)
         request.apply_updates(duckdb_conn=duckdb_conn)
-        self.create_view(request=request, duckdb_conn=duckdb_conn)
+        if request.is_materialized():
+            self.create_view_from_table(request=request, table_name=request.cleaned_table_name, duckdb_conn=duckdb_conn)
+        else:
+            self.create_view(request=request, duckdb_conn=duckdb_conn)
+        if fingerprint is not None and request.run_database is not None:
+            request.run_database.set_fingerprint(request.cleaned_table_name, fingerprint)
         return True
@@ -1,8 +1,11 @@
-from typing import Union, List
+from typing import Literal, Union, List, Optional
 from pydantic import BaseModel, RootModel, model_validator
 from collections import Counter
 
+from ....utils.http_client import HttpSupplierConfig
+from ....utils.response_cache import ResponseCache
 from .checks.apply_update import InseeCommuneAddOrReplace, InseeArrondissementMunicipalAddOrReplace, InseeDepartementAddOrReplace, InseeCollectiviteOutremerAddOrReplace, InseeDistrictAddOrReplace, InseePaysAddOrReplace, InseeGeoRemove
+from .checks.intervals import IntervalEngine
 
 def check_unique_uri(uris: List[str]):
     counter = Counter(uris)
@@ -83,9 +86,57 @@ class InseeExceptionsToIgnoreOrCorrect(BaseModel):
     districts: DistrictsInseeExceptionsToIgnoreOrCorrect = DistrictsInseeExceptionsToIgnoreOrCorrect()
     pays: PaysInseeExceptionsToIgnoreOrCorrect = PaysInseeExceptionsToIgnoreOrCorrect()
 
-class InseeSupplierConfig(BaseModel):
+class IntervalCheckEnginesConfig(BaseModel):
+    """Engine of each check on the periods of validity: "sql" runs it in DuckDB, "numpy" runs it with NumPy on the periods pulled as day numbers"""
+    insee_code_overlap: IntervalEngine = "sql"
+    parent_period_overlap: IntervalEngine = "sql"
+    parent_period_no_gaps: IntervalEngine = "sql"
+    parent_period_include: IntervalEngine = "sql"
+
+
+class InseeSupplierConfig(HttpSupplierConfig):
     endpoint_url: str = "http://rdf.insee.fr/sparql"
     backoff_factor: float = 0.5
     max_retries: int = 5
+    # SPARQL queries are sent with POST but only read data
+    retry_post: bool = True
     connect_timeout: float = 3
     read_timeout: float = 15
+    max_concurrent_requests: int = 2
+    communes_shards: int = 1
+    shard_max_attempts: int = 3
+    cache_directory: Optional[str] = None
+    cache_max_age: Optional[float] = None
+    cache_max_size: Optional[int] = 1024 * 1024 * 1024
+    ingest_mode: Literal["files", "duckdb"] = "files"
+    response_format: Literal["csv", "json"] = "csv"
+    ingest_chunk_rows: int = 50000
+    write_cleaned_files: bool = False
+    # "table" loads each cleaned entity once into a DuckDB table read by all the checks,
+    # "view" reads the cleaned CSV file again for each check, for low-memory runs
+    storage_mode: Literal["table", "view"] = "table"
+    # Format of the cleaned entities and of the intermediate files, the raw responses are kept as received
+    output_format: Literal["csv", "parquet"] = "parquet"
+    interval_check_engines: IntervalCheckEnginesConfig = IntervalCheckEnginesConfig()
+
+    @model_validator(mode="after")
+    def json_only_with_duckdb_ingest(self):
+        if self.response_format == "json" and self.ingest_mode != "duckdb":
+            raise ValueError("The JSON response format is only supported with the 'duckdb' ingest mode")
+        return self
+
+    @model_validator(mode="after")
+    def view_storage_only_with_files_ingest(self):
+        if self.storage_mode == "view" and self.ingest_mode != "files":
+            raise ValueError("The 'view' storage mode is only supported with the 'files' ingest mode")
+        return self
+
+    def get_response_cache(self) -> Optional[ResponseCache]:
+        """Return the cache of SPARQL responses, or None if no cache directory is configured"""
+        if self.cache_directory is None:
+            return None
+        return ResponseCache(
+            directory=self.cache_directory,
+            max_age=self.cache_max_age,
+            max_size=self.cache_max_size
+        )
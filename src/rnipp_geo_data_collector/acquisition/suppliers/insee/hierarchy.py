@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import TYPE_CHECKING, Optional
+import logging
+import threading
+import igraph
+import numpy as np
+from duckdb import DuckDBPyConnection
+
+from .checks.intervals import EPOCH, fetch_arrays, find_overlap_candidates
+
+if TYPE_CHECKING:
+    from .requests import RequestCOG
+
+
+class InseeHierarchyGraph:
+    """
+    Hierarchy of the geographic entities of the COG, built once from their checked views: one vertex per URI with its
+    period of validity (in days since 1970-01-01, an open period never ending) and one edge from each child to each of
+    its parents. The links to parent URIs that are not among the entities are kept aside as dangling links.
+    """
+    def __init__(
+            self,
+            entities: list[RequestCOG],
+            children: list[RequestCOG],
+            top_level: list[RequestCOG]
+        ):
+        if len(entities) == 0:
+            raise RuntimeError("No entities provided")
+        unknown_requests = [request.description for request in [*children, *top_level] if request not in entities]
+        if len(unknown_requests) > 0:
+            raise RuntimeError(f"The children and the top-level entities must be among the entities of the hierarchy: {unknown_requests}")
+
+        self.entities = entities
+        self.children = children
+        self.top_level = top_level
+        self.graph: Optional[igraph.Graph] = None
+        self.uris = np.empty(0, dtype=object)
+        self.entity_indices = np.empty(0, dtype=np.int32)
+        self.start_days = np.empty(0, dtype=np.int32)
+        self.end_days = np.empty(0, dtype=np.int32)
+        self.vertex_ids: dict[str, int] = {}
+        self.edge_children = np.empty(0, dtype=np.int64)
+        self.edge_parents = np.empty(0, dtype=np.int64)
+        self.dangling_links: list[tuple[str, str]] = []
+        self.graphs_at: dict[int, igraph.Graph] = {}
+        self.lock = threading.Lock()
+
+    def build(self, duckdb_conn: DuckDBPyConnection) -> None:
+        """Build the graph from the views of the entities"""
+        vertices = fetch_arrays("hierarchy_vertices.mustache.sql", {
+            "entities": [
+                {"view_name": request.view_name, "entity_index": index, "last": index == len(self.entities) - 1}
+                for index, request in enumerate(self.entities)
+            ]
+        }, duckdb_conn)
+        edges = fetch_arrays("hierarchy_edges.mustache.sql", {
+            "children": [
+                {"view_name": request.view_name, "last": index == len(self.children) - 1}
+                for index, request in enumerate(self.children)
+            ]
+        }, duckdb_conn)
+
+        self.uris = vertices["uri"]
+        self.entity_indices = vertices["entity_index"]
+        self.start_days = vertices["start_day"]
+        self.end_days = vertices["end_day"]
+        self.vertex_ids = {uri: vertex_id for vertex_id, uri in enumerate(self.uris.tolist())}
+        if len(self.vertex_ids) < len(self.uris):
+            raise RuntimeError("Failed to build the hierarchy graph: some URIs are duplicated among the entities")
+
+        edge_children: list[int] = []
+        edge_parents: list[int] = []
+        self.dangling_links = []
+        for child_uri, parent_uri in zip(edges["uri"].tolist(), edges["parent_uri"].tolist()):
+            parent_id = self.vertex_ids.get(parent_uri)
+            if parent_id is None:
+                self.dangling_links.append((child_uri, parent_uri))
+                continue
+            edge_children.append(self.vertex_ids[child_uri])
+            edge_parents.append(parent_id)
+        self.edge_children = np.array(edge_children, dtype=np.int64)
+        self.edge_parents = np.array(edge_parents, dtype=np.int64)
+        self.graph = igraph.Graph(n=len(self.uris), edges=list(zip(edge_children, edge_parents)), directed=True)
+        self.graphs_at = {}
+        logging.info(f"Hierarchy graph built with {self.graph.vcount()} vertices, {self.graph.ecount()} edges and {len(self.dangling_links)} dangling link(s)")
+
+    def get_graph(self) -> igraph.Graph:
+        if self.graph is None:
+            raise RuntimeError("The hierarchy graph is not built")
+        return self.graph
+
+    def get_vertex_id(self, uri: str) -> int:
+        self.get_graph()
+        if uri not in self.vertex_ids:
+            raise RuntimeError(f"Unknown URI in the hierarchy graph: {uri}")
+        return self.vertex_ids[uri]
+
+    def get_vertices_of(self, requests: list[RequestCOG]) -> np.ndarray:
+        entity_indices = [self.entities.index(request) for request in requests]
+        return np.flatnonzero(np.isin(self.entity_indices, entity_indices))
+
+    def find_dangling_parents(self) -> list[tuple[str, str]]:
+        """Links to a parent URI that is not among the entities: URI of the child and of the parent"""
+        self.get_graph()
+        return list(self.dangling_links)
+
+    def find_cycles(self) -> list[list[str]]:
+        """URIs of each group of entities that are their own ancestors"""
+        graph = self.get_graph()
+        components = graph.connected_components(mode="strong")
+        cycles = [[self.uris[vertex_id] for vertex_id in component] for component in components if len(component) > 1]
+        loops = self.edge_children[self.edge_children == self.edge_parents]
+        cycles.extend([[self.uris[vertex_id]] for vertex_id in np.unique(loops)])
+        return cycles
+
+    def find_fan_in(self) -> list[tuple[str, str, str]]:
+        """Children with two parents valid on the same day: URI of the child and of both parents"""
+        self.get_graph()
+        firsts, seconds = find_overlap_candidates(
+            self.edge_children, self.start_days[self.edge_parents], self.end_days[self.edge_parents]
+        )
+        different_parents = self.edge_parents[firsts] != self.edge_parents[seconds]
+        return [
+            (self.uris[self.edge_children[first]], self.uris[self.edge_parents[first]], self.uris[self.edge_parents[second]])
+            for first, second in zip(firsts[different_parents], seconds[different_parents])
+        ]
+
+    def find_unreachable(self) -> list[str]:
+        """URIs of the children from which no top-level entity can be reached"""
+        graph = self.get_graph()
+        reached = np.zeros(graph.vcount(), dtype=bool)
+        top_level_ids = self.get_vertices_of(self.top_level).tolist()
+        if len(top_level_ids) > 0:
+            for descendants in graph.neighborhood(vertices=top_level_ids, order=graph.vcount(), mode="in"):
+                reached[descendants] = True
+        children_ids = self.get_vertices_of(self.children)
+        return self.uris[children_ids[~reached[children_ids]]].tolist()
+
+    def get_graph_at(self, day: date) -> igraph.Graph:
+        """Graph of the links valid on a day, both the child and the parent being valid that day"""
+        graph = self.get_graph()
+        day_number = (day - EPOCH).days
+        with self.lock:
+            if day_number not in self.graphs_at:
+                valid = (self.start_days <= day_number) & (day_number < self.end_days)
+                edge_ids = np.flatnonzero(valid[self.edge_children] & valid[self.edge_parents])
+                self.graphs_at[day_number] = graph.subgraph_edges(edge_ids.tolist(), delete_vertices=False)
+            return self.graphs_at[day_number]
+
+    def get_ancestors(self, uri: str, day: Optional[date] = None) -> list[str]:
+        """URIs of the parents of an entity, of their parents and so on, on a given day or at any time"""
+        graph = self.get_graph() if day is None else self.get_graph_at(day)
+        vertex_id = self.get_vertex_id(uri)
+        return [self.uris[ancestor_id] for ancestor_id in graph.subcomponent(vertex_id, mode="out") if ancestor_id != vertex_id]
+
+    def get_descendants(self, uri: str, day: Optional[date] = None) -> list[str]:
+        """URIs of the children of an entity, of their children and so on, on a given day or at any time"""
+        graph = self.get_graph() if day is None else self.get_graph_at(day)
+        vertex_id = self.get_vertex_id(uri)
+        return [self.uris[descendant_id] for descendant_id in graph.subcomponent(vertex_id, mode="in") if descendant_id != vertex_id]
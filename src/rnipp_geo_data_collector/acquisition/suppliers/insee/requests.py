@@ -1,16 +1,23 @@
 from pathlib import Path
-from typing import Union, Optional
+from typing import IO, Any, Iterator, Union, Optional
 from abc import ABC
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from urllib.parse import quote_plus
 import requests
-from urllib3.util.retry import Retry
-from requests.adapters import HTTPAdapter
 from duckdb import DuckDBPyConnection
 import logging
 import pystache
-import csv
+import shutil
+import time
 
 
+from ....utils.duckdb import get_output_format_context, ingest_csv_stream, ingest_sparql_json_stream
+from ....utils.response_cache import ResponseCache
+from ...sql_templates import SQL_TEMPLATES
+from ...check_executor import run_controls
+from ...exceptions_table import EXCEPTIONS_TABLE_NAME
+from ...run_database import RunDatabase, get_check_key, get_inputs_fingerprint
 from .config import InseeSupplierConfig, InseeExceptionsToIgnoreOrCorrectModel, CommunesInseeExceptionsToIgnoreOrCorrect, ArrondissementsMunicipauxInseeExceptionsToIgnoreOrCorrect, DepartementsInseeExceptionsToIgnoreOrCorrect, CollectivitesDOutreMerInseeExceptionsToIgnoreOrCorrect, DistrictsInseeExceptionsToIgnoreOrCorrect, PaysInseeExceptionsToIgnoreOrCorrect
 from .checks.abstract import DataValidationAndConsistencyInseeCog
 from .checks.date_consistency import CheckDateConsistencyAfterDownloadInseeCog
@@ -18,11 +25,12 @@ from .checks.insee_code_overlap import CheckInseeCodeOverlapAfterDownloadInseeCo
 from .checks.parsing import CheckParsingAfterDownloadInseeCog
 from .checks.start_date import CheckStartDateAfterDownloadInseeCog
 from .checks.end_date import CheckEndDateAfterDownloadInseeCog
-from .checks.pattern import CheckPatternAfterDownloadInseeCog
+from .checks.pattern import CheckPatternsAfterDownloadInseeCog
 from .checks.uri_unicity import CheckURIUnicityAfterDownloadInseeCog
 from .checks.end_event_consistency import CheckEndEventConsistencyAfterDownloadInseeCog
 from .checks.events_unequal import CheckEventsUnequalAfterDownloadInseeCog
 from .checks.apply_update import InseeGeoRemove, InseeGeoAddOrReplace
+from .checks.delta import DeltaInseeCog
 
 
 class TemplatesSQLRequestCOG:
@@ -31,6 +39,7 @@ class TemplatesSQLRequestCOG:
             copy: Union[str, Path],
             create_view: Union[str, Path],
             update: Union[str, Path],
+            ingest: Union[str, Path]
         ):
         if isinstance(copy, str):
             self.copy = Path(copy)
@@ -44,33 +53,51 @@ class TemplatesSQLRequestCOG:
             self.update = Path(update)
         else:
             self.update = update
+        if isinstance(ingest, str):
+            self.ingest = Path(ingest)
+        else:
+            self.ingest = ingest
 
 class OutputPathsRequestCOG:
     def __init__(
             self,
             raw_entities: Union[str, Path],
-            add_or_replace_entities: Union[str, Path],
-            remove_entities: Union[str, Path],
             cleaned_entities: Union[str, Path]
         ):
         if isinstance(raw_entities, str):
             self.raw_entities = Path(raw_entities)
         else:
             self.raw_entities = raw_entities
-        if isinstance(add_or_replace_entities, str):
-            self.add_or_replace_entities = Path(add_or_replace_entities)
-        else:
-            self.add_or_replace_entities = add_or_replace_entities
-        if isinstance(remove_entities, str):
-            self.remove_entities = Path(remove_entities)
-        else:
-            self.remove_entities = remove_entities
         if isinstance(cleaned_entities, str):
             self.cleaned_entities = Path(cleaned_entities)
         else:
             self.cleaned_entities = cleaned_entities
 
 
+def get_insee_code_prefix_shards(nb_shards: int) -> list[dict[str, str]]:
+    """
+    Split a request into `nb_shards` shards on the first two characters of the INSEE code (i.e. the department).
+    The last shard also takes the codes matching no known prefix, so that the union of the shards is the whole request.
+    """
+    if nb_shards <= 1:
+        return []
+    prefixes = [f"{number:02d}" for number in range(0, 100)] + ["2A", "2B"]
+    prefixes.sort()
+    shard_size = -(-len(prefixes) // nb_shards)
+    all_prefixes_str = ", ".join([f'"{prefix}"' for prefix in prefixes])
+    shards: list[dict[str, str]] = []
+    for start in range(0, len(prefixes), shard_size):
+        prefixes_str = ", ".join([f'"{prefix}"' for prefix in prefixes[start:start+shard_size]])
+        condition = "SUBSTR(STR({variable}), 1, 2) IN (" + prefixes_str + ")"
+        if start + shard_size >= len(prefixes):
+            condition = "(" + condition + " || SUBSTR(STR({variable}), 1, 2) NOT IN (" + all_prefixes_str + "))"
+        shards.append({
+            "shard_filter": "FILTER(" + condition.format(variable="?insee_code") + ")",
+            "shard_pattern": "?uri igeo:codeINSEE ?shard_insee_code . FILTER(" + condition.format(variable="?shard_insee_code") + ")"
+        })
+    return shards
+
+
 class RequestCOG(ABC):
     """Abstract base class for querying the Official geographic code alias COG (Code officiel géographique)"""
     headers = {"Content-type": "application/x-www-form-urlencoded"}
@@ -85,8 +112,9 @@ class RequestCOG(ABC):
             sql_templates: TemplatesSQLRequestCOG,
             acquisition_config: InseeSupplierConfig = InseeSupplierConfig(),
             colnames: list[str] = [],
-            extra_controls: list[DataValidationAndConsistencyInseeCog] = []
-            
+            extra_controls: list[DataValidationAndConsistencyInseeCog] = [],
+            shards: list[dict[str, str]] = [],
+            run_database: Optional[RunDatabase] = None
         ):
         self.output_paths = output_paths
         self.request = request
@@ -97,8 +125,51 @@ class RequestCOG(ABC):
         self.acquisition_config = acquisition_config
         self.colnames = colnames
         self.extra_controls = extra_controls
+        self.shards = shards
+        self.run_database = run_database
+        self.raw_table_name = f"{view_name}_raw"
+        self.cleaned_table_name = f"{view_name}_cleaned"
+        self.ingested = False
+        self.checks_fingerprint: Optional[str] = None
+        self.delta = DeltaInseeCog(request=self, run_database=run_database) if run_database is not None else None
+
+    def is_materialized(self) -> bool:
+        """Whether the cleaned entities are loaded into `cleaned_table_name` rather than read from the cleaned file"""
+        return self.ingested or self.acquisition_config.storage_mode == "table"
+
+    def get_rows_context(self) -> dict[str, Optional[str]]:
+        """Context of the checks reporting row numbers: all the rows of the request are checked"""
+        return {"view_name": self.view_name, "affected_view_name": None}
+
+    def get_inputs_fingerprint(self) -> Optional[str]:
+        """
+        Fingerprint of what the cleaned table is loaded from, or None when the table cannot be reused by a later run:
+        no persistent database, no cleaned table (view storage) or no raw file (response ingested straight into DuckDB).
+        """
+        if not self.is_materialized():
+            return None
+        checks_fingerprint = self.get_checks_fingerprint()
+        if checks_fingerprint is None:
+            return None
+        # The cleaned table also depends on the code loading and cleaning it, the exceptions table template included
+        return get_check_key(self.cleaned_table_name, [checks_fingerprint])
+
+    def get_checks_fingerprint(self) -> Optional[str]:
+        """
+        Fingerprint of the data read by the checks of the entity (raw response, SQL templates, exceptions), computed once
+        per download, or None when their results cannot be reused by a later run: no persistent database or no raw
+        file (response ingested straight into DuckDB).
+        """
+        if self.run_database is None or self.ingested or not self.output_paths.raw_entities.exists():
+            return None
+        if self.checks_fingerprint is None:
+            self.checks_fingerprint = get_inputs_fingerprint(
+                paths=[self.output_paths.raw_entities, self.sql_templates.copy, self.sql_templates.create_view, self.sql_templates.update],
+                settings=[self.exceptions_handler_config.model_dump_json()]
+            )
+        return self.checks_fingerprint
 
-    def send(self) -> None:
+    def read_request(self) -> str:
         request_str : Optional[str] = None
 
         if isinstance(self.request, Path) or isinstance(self.request, str):
@@ -117,37 +188,110 @@ class RequestCOG(ABC):
                     raise RuntimeError(f"Failed to read file {self.request}") from e
             else:
                 request_str = self.request
+        return request_str
 
+    def render_request(self, request_str: str, shard: Optional[dict[str, str]] = None) -> str:
+        """Render the shard placeholders of the SPARQL request (removed when the request is not sharded)"""
+        renderer = pystache.Renderer(escape=lambda s: s)
+        context: dict[str, str] = {"shard_filter": "", "shard_pattern": ""}
+        if shard is not None:
+            context.update(shard)
         try:
-            retry_strategy = Retry(
-                total=self.acquisition_config.max_retries,
-                backoff_factor=self.acquisition_config.backoff_factor,
-                status_forcelist=[408, 429, 500, 502, 503, 504],
-                redirect=0
-            )
-            adapter = HTTPAdapter(max_retries=retry_strategy)
-            session = requests.Session()
-            session.mount("https://", adapter)
-            session.mount("http://", adapter)
-            with session.post(
+            return renderer.render(request_str, context)
+        except Exception as e:
+            raise RuntimeError(f"Failed to render request {self.request}") from e
+
+    def send(self, duckdb_conn: Optional[DuckDBPyConnection] = None) -> None:
+        """
+        Download the data of the request.
+        In the "duckdb" ingest mode, the response is loaded straight into the raw table through `duckdb_conn`
+        (a cursor owned by the calling thread) instead of being written to the raw file.
+        """
+        request_str = self.read_request()
+        self.ingested = False
+        self.checks_fingerprint = None
+        ingest = self.acquisition_config.ingest_mode == "duckdb" and duckdb_conn is not None
+        if len(self.shards) == 0:
+            if ingest:
+                staging_table_name = self.get_staging_table_name(0)
+                self.download_into_table(request_str=self.render_request(request_str), table_name=staging_table_name, duckdb_conn=duckdb_conn)
+                self.create_raw_table(staging_table_names=[staging_table_name], duckdb_conn=duckdb_conn)
+            else:
+                self.download(request_str=self.render_request(request_str), output_path=self.output_paths.raw_entities)
+        else:
+            self.send_shards(request_str=request_str, duckdb_conn=duckdb_conn if ingest else None)
+        self.ingested = ingest
+
+    def get_staging_table_name(self, index: int) -> str:
+        return f"{self.view_name}_staging{index}"
+
+    def send_shards(self, request_str: str, duckdb_conn: Optional[DuckDBPyConnection] = None) -> None:
+        """Download the shards of the request in parallel, then concatenate them into the raw file (or the raw table)"""
+        nb_shards = len(self.shards)
+        shard_paths = [self.output_paths.raw_entities.with_suffix(f".shard{index}{self.output_paths.raw_entities.suffix}") for index in range(nb_shards)]
+        staging_table_names = [self.get_staging_table_name(index) for index in range(nb_shards)]
+        # One cursor per shard, created in the calling thread as a DuckDB connection must not be shared between threads
+        shard_cursors = [duckdb_conn.cursor() for _ in range(nb_shards)] if duckdb_conn is not None else []
+
+        def download_shard(index: int) -> None:
+            shard_request_str = self.render_request(request_str, shard=self.shards[index])
+            max_attempts = max(self.acquisition_config.shard_max_attempts, 1)
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    if duckdb_conn is not None:
+                        self.download_into_table(request_str=shard_request_str, table_name=staging_table_names[index], duckdb_conn=shard_cursors[index])
+                    else:
+                        self.download(request_str=shard_request_str, output_path=shard_paths[index])
+                    logging.info(f"Downloaded shard {index+1}/{nb_shards} of {self.description}")
+                    return
+                except Exception as e:
+                    if attempt == max_attempts:
+                        raise RuntimeError(f"Failed to download shard {index+1}/{nb_shards} of {self.description} after {max_attempts} attempts") from e
+                    logging.warning(f"Attempt {attempt}/{max_attempts} failed for shard {index+1}/{nb_shards} of {self.description}, retrying: {e}")
+
+        try:
+            with ThreadPoolExecutor(max_workers=nb_shards, thread_name_prefix="geo-data-shard") as executor:
+                for future in [executor.submit(download_shard, index) for index in range(nb_shards)]:
+                    future.result()
+
+            if duckdb_conn is not None:
+                self.create_raw_table(staging_table_names=staging_table_names, duckdb_conn=duckdb_conn)
+                return
+
+            if not self.output_paths.raw_entities.parent.exists():
+                self.output_paths.raw_entities.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.output_paths.raw_entities, "wb") as foutput:
+                for index, shard_path in enumerate(shard_paths):
+                    with open(shard_path, "rb") as fshard:
+                        header = fshard.readline()
+                        if index == 0:
+                            foutput.write(header)
+                        shutil.copyfileobj(fshard, foutput)
+        finally:
+            for shard_path in shard_paths:
+                shard_path.unlink(missing_ok=True)
+            for shard_cursor in shard_cursors:
+                shard_cursor.close()
+
+    @contextmanager
+    def post(self, request_str: str) -> Iterator[requests.Response]:
+        """Send the SPARQL request to the COG endpoint and yield the streamed response"""
+        if self.acquisition_config.response_format == "json":
+            data = "format=application/sparql-results%2Bjson&query=" + quote_plus(request_str)
+        else:
+            data = "format=text/csv&query=" + quote_plus(request_str)
+        try:
+            http_client = self.acquisition_config.get_http_client()
+            with self.acquisition_config.get_request_slots(), http_client.session.post(
                 url=self.acquisition_config.endpoint_url,
-                data="format=text/csv&query="+quote_plus(request_str),
+                data=data,
                 headers=RequestCOG.headers,
-                timeout=(self.acquisition_config.read_timeout, self.acquisition_config.connect_timeout)
+                timeout=(self.acquisition_config.read_timeout, self.acquisition_config.connect_timeout),
+                stream=True
             ) as response:
                 if response.status_code != 200:
                     raise requests.exceptions.HTTPError(f"HTTP error while querying {self.description} from COG: {response.status_code} - {response.text}")
-                
-                if not self.output_paths.raw_entities.parent.exists():
-                    self.output_paths.raw_entities.parent.mkdir(parents=True, exist_ok=True)
-                if self.output_paths.raw_entities.exists():
-                   self.output_paths.raw_entities.unlink()
-
-                with open(self.output_paths.raw_entities, "wb") as foutput:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            foutput.write(chunk)
-
+                yield response
 
         except requests.exceptions.Timeout as e:
             raise TimeoutError(f"Timeout occurred while querying {self.description}") from e
@@ -159,83 +303,148 @@ class RequestCOG(ABC):
             raise RuntimeError(f"Request error while querying {self.description}") from e
         except Exception as e:
             raise RuntimeError(f"Unexpected error while querying {self.description}") from e
-        
-    def apply_updates(self, duckdb_conn: DuckDBPyConnection):
-        """Apply updates before checks"""
-        uri_add_or_update_list = [exception for exception in self.exceptions_handler_config.root if isinstance(exception, InseeGeoAddOrReplace)]
-        
-        if not self.output_paths.add_or_replace_entities.parent.exists():
-            self.output_paths.add_or_replace_entities.parent.mkdir(parents=True, exist_ok=True)
-        if self.output_paths.add_or_replace_entities.exists():
-            self.output_paths.add_or_replace_entities.unlink()
-        
-        with open(self.output_paths.add_or_replace_entities, mode="w", newline="", encoding="utf-8") as f_add_or_replace:
-            fieldnames_add_or_replace = self.colnames
-            writer_add_or_replace = csv.DictWriter(f_add_or_replace, fieldnames=fieldnames_add_or_replace)
-            writer_add_or_replace.writeheader()
-            for exception in uri_add_or_update_list:
-                writer_add_or_replace.writerow(exception.to_dict_csv_export())
-       
-        uri_removal_list = [exception for exception in self.exceptions_handler_config.root if isinstance(exception, InseeGeoRemove)]
-
-        if not self.output_paths.remove_entities.parent.exists():
-            self.output_paths.remove_entities.parent.mkdir(parents=True, exist_ok=True)
-        if self.output_paths.remove_entities.exists():
-            self.output_paths.remove_entities.unlink()
-
-        with open(self.output_paths.remove_entities, mode="w", newline="", encoding="utf-8") as f_remove:
-            fieldnames_remove = ['uri']
-            writer_remove = csv.DictWriter(f_remove, fieldnames=fieldnames_remove)
-            writer_remove.writeheader()
-            for exception in uri_removal_list:
-                writer_remove.writerow({'uri': exception.uri})
-        
-        output_path_tmp =  self.output_paths.cleaned_entities.with_suffix(".tmp")
-        if not self.output_paths.cleaned_entities.parent.exists():
-            self.output_paths.cleaned_entities.parent.mkdir(parents=True, exist_ok=True)
-        if output_path_tmp.exists():
-            output_path_tmp.unlink()
 
-        context_apply_updates: dict[str, str] = {
-            "view_name": self.view_name,
-            "path_add_or_replace": str(self.output_paths.add_or_replace_entities.resolve()),
-            "path_remove": str(self.output_paths.remove_entities.resolve()),
-            "output_path": str(output_path_tmp.resolve())
+    def download(self, request_str: str, output_path: Path) -> None:
+        """Send the SPARQL request to the COG endpoint and write the CSV response to `output_path`"""
+        response_cache = self.acquisition_config.get_response_cache()
+        cache_key = ResponseCache.make_key(self.acquisition_config.endpoint_url, self.acquisition_config.response_format, request_str)
+        if response_cache is not None and response_cache.get(key=cache_key, output_path=output_path):
+            logging.info(f"Reusing cached response for {self.description}")
+            return
+
+        with self.post(request_str=request_str) as response:
+            if not output_path.parent.exists():
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+            if output_path.exists():
+               output_path.unlink()
+
+            self.acquisition_config.get_http_client().stream_to_file(response=response, output_path=output_path, description=self.description)
+
+            if response_cache is not None:
+                response_cache.put(key=cache_key, input_path=output_path)
+
+    def download_into_table(self, request_str: str, table_name: str, duckdb_conn: DuckDBPyConnection) -> None:
+        """Send the SPARQL request to the COG endpoint and load the response into a table of VARCHAR columns"""
+        if self.acquisition_config.cache_directory is not None:
+            # The cache holds files: the response goes through a file to be cached (or is taken from the cache)
+            output_path = self.output_paths.raw_entities.with_suffix(f".{table_name}{self.output_paths.raw_entities.suffix}")
+            try:
+                self.download(request_str=request_str, output_path=output_path)
+                with open(output_path, "rb") as finput:
+                    self.ingest_stream(stream=finput, table_name=table_name, duckdb_conn=duckdb_conn)
+            finally:
+                output_path.unlink(missing_ok=True)
+            return
+
+        with self.post(request_str=request_str) as response:
+            start = time.perf_counter()
+            response.raw.decode_content = True
+            nb_rows = self.ingest_stream(stream=response.raw, table_name=table_name, duckdb_conn=duckdb_conn)
+            logging.info(f"Loaded {nb_rows} row(s) of {self.description} into DuckDB: {response.raw.tell()} byte(s) on the wire in {time.perf_counter() - start:.2f}s")
+
+    def ingest_stream(self, stream: IO[Any], table_name: str, duckdb_conn: DuckDBPyConnection) -> int:
+        if self.acquisition_config.response_format == "json":
+            return ingest_sparql_json_stream(duckdb_conn=duckdb_conn, stream=stream, table_name=table_name, chunk_rows=self.acquisition_config.ingest_chunk_rows)
+        return ingest_csv_stream(duckdb_conn=duckdb_conn, stream=stream, table_name=table_name, chunk_rows=self.acquisition_config.ingest_chunk_rows)
+
+    def create_raw_table(self, staging_table_names: list[str], duckdb_conn: DuckDBPyConnection) -> None:
+        """Type the columns of the staging tables into the raw table, then drop the staging tables"""
+        if len(staging_table_names) == 1:
+            input_relation = staging_table_names[0]
+        else:
+            input_relation = "(" + " UNION ALL BY NAME ".join([f"SELECT * FROM {table_name}" for table_name in staging_table_names]) + ")"
+        context_ingest: dict[str, str] = {
+            "table_name": self.raw_table_name,
+            "input_relation": input_relation
         }
 
-        renderer_apply_updates = pystache.Renderer(escape=lambda s: s)
+        rendered_ingest_str = SQL_TEMPLATES.render(self.sql_templates.ingest, context_ingest)
+
         try:
-            with open(self.sql_templates.update, 'r', encoding='utf-8') as template_apply_updates_path:
-                template_apply_updates_content = template_apply_updates_path.read()
+            duckdb_conn.execute(rendered_ingest_str)
         except Exception as e:
-            raise RuntimeError(f"Failed to load template file {self.sql_templates.update}") from e
-        
+            raise RuntimeError(f"Failed to load {self.description} after downloading. The response may be corrupted or not in the expected format.") from e
+        finally:
+            for table_name in staging_table_names:
+                duckdb_conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+
+    def export_cleaned_entities(self, duckdb_conn: DuckDBPyConnection) -> None:
+        """Write the cleaned table to the cleaned entities file"""
+        if not self.output_paths.cleaned_entities.parent.exists():
+            self.output_paths.cleaned_entities.parent.mkdir(parents=True, exist_ok=True)
+        template_export_path = Path(__file__).parent / "sql" / "table_export.mustache.sql"
+        context_export: dict[str, Union[str, bool]] = {
+            "table_name": self.cleaned_table_name,
+            "output_path": str(self.output_paths.cleaned_entities.resolve()),
+            **get_output_format_context(self.acquisition_config.output_format)
+        }
+
+        rendered_export_str = SQL_TEMPLATES.render(template_export_path, context_export)
+
         try:
-            renderer_apply_updates_str = renderer_apply_updates.render(template_apply_updates_content, context_apply_updates)
+            duckdb_conn.execute(rendered_export_str)
         except Exception as e:
-            raise RuntimeError(f"Failed to render template file {self.sql_templates.update}") from e
+            raise RuntimeError(f"Failed to export {self.description} to {self.output_paths.cleaned_entities}") from e
+
+    def get_exceptions_rows(self) -> list[dict[str, Any]]:
+        """Rows of the exceptions table: the entities to add or replace and the URIs to remove"""
+        rows: list[dict[str, Any]] = []
+        for exception in self.exceptions_handler_config.root:
+            if isinstance(exception, InseeGeoAddOrReplace):
+                rows.append({"action": "add_or_replace", **exception.to_dict_csv_export()})
+            elif isinstance(exception, InseeGeoRemove):
+                rows.append({"action": "remove", "uri": exception.uri})
+        return rows
+
+    def apply_updates(self, duckdb_conn: DuckDBPyConnection):
+        """Apply updates before checks"""
+        output_path_tmp =  self.output_paths.cleaned_entities.with_suffix(".tmp")
+        context_apply_updates: dict[str, Union[str, bool]] = {
+            "view_name": self.view_name,
+            "entity": self.view_name,
+            "exceptions_table_name": EXCEPTIONS_TABLE_NAME,
+            **get_output_format_context(self.acquisition_config.output_format)
+        }
+        if self.is_materialized():
+            context_apply_updates["output_table"] = self.cleaned_table_name
+        else:
+            if not self.output_paths.cleaned_entities.parent.exists():
+                self.output_paths.cleaned_entities.parent.mkdir(parents=True, exist_ok=True)
+            if output_path_tmp.exists():
+                output_path_tmp.unlink()
+            context_apply_updates["output_path"] = str(output_path_tmp.resolve())
+
+        renderer_apply_updates_str = SQL_TEMPLATES.render(self.sql_templates.update, context_apply_updates)
         
         try:
             duckdb_conn.execute(renderer_apply_updates_str)
-            if self.output_paths.cleaned_entities.exists():
-                self.output_paths.cleaned_entities.unlink()
-            output_path_tmp.replace(self.output_paths.cleaned_entities)
+            if not self.is_materialized():
+                if self.output_paths.cleaned_entities.exists():
+                    self.output_paths.cleaned_entities.unlink()
+                output_path_tmp.replace(self.output_paths.cleaned_entities)
         except Exception as e:
             raise RuntimeError(f"Failed to execute SQL script {self.sql_templates.update}") from e 
-               
+
+        if self.is_materialized() and not self.ingested:
+            # The cleaned file stays an output of the files ingest mode, it is written from the table
+            self.export_cleaned_entities(duckdb_conn=duckdb_conn)
         
-    def check_content(self, duckdb_conn : DuckDBPyConnection) -> None:
-        """Check if the content of the file is valid"""
+    def check_content(self, duckdb_conn : DuckDBPyConnection, threads: int = 1) -> None:
+        """Check if the content of the file is valid, the checks following the parsing running on up to `threads` threads"""
         logging.info(f"Checking content of {self.description} after downloading")
-        controls: list[DataValidationAndConsistencyInseeCog] = [CheckParsingAfterDownloadInseeCog()]
-        controls.extend(self.extra_controls)
-        nb_controls = len(controls)
-        if nb_controls == 0:
-            logging.info(f"No control to run for {self.description} after downloading")
-        for current_step, control in enumerate(controls):
-            logging.info(f"Running check {current_step+1}/{nb_controls}: {type(control).__name__}")
-            control.run(request=self, duckdb_conn=duckdb_conn)
+        run_controls(
+            request=self,
+            prerequisites=[CheckParsingAfterDownloadInseeCog()],
+            controls=self.extra_controls,
+            duckdb_conn=duckdb_conn,
+            threads=threads,
+            run_database=self.run_database,
+            inputs_fingerprint=self.get_checks_fingerprint(),
+            delta=self.delta
+        )
         logging.info(f"All checks passed for {self.description} after downloading")
+        if self.ingested and self.acquisition_config.write_cleaned_files:
+            self.export_cleaned_entities(duckdb_conn=duckdb_conn)
 
 class RequestCOGCommune(RequestCOG):
     """Class to query all communes from the COG"""
@@ -243,7 +452,8 @@ class RequestCOGCommune(RequestCOG):
             self,
             output_paths: OutputPathsRequestCOG,
             acquisition_config: InseeSupplierConfig = InseeSupplierConfig(),
-            exceptions_handler_config: CommunesInseeExceptionsToIgnoreOrCorrect = CommunesInseeExceptionsToIgnoreOrCorrect()
+            exceptions_handler_config: CommunesInseeExceptionsToIgnoreOrCorrect = CommunesInseeExceptionsToIgnoreOrCorrect(),
+            run_database: Optional[RunDatabase] = None
         ):
         super().__init__(
             output_paths=output_paths,
@@ -252,10 +462,12 @@ class RequestCOGCommune(RequestCOG):
             view_name="insee_communes",
             exceptions_handler_config=exceptions_handler_config,
             acquisition_config=acquisition_config,
+            run_database=run_database,
             sql_templates= TemplatesSQLRequestCOG(
                 copy=Path(__file__).parent / "sql" / "communes_copy.mustache.sql",
                 create_view=Path(__file__).parent / "sql" / "communes_import.mustache.sql",
-                update=Path(__file__).parent / "sql" / "communes_correct.mustache.sql"
+                update=Path(__file__).parent / "sql" / "communes_correct.mustache.sql",
+                ingest=Path(__file__).parent / "sql" / "communes_ingest.mustache.sql"
             ),
             colnames=[
                 'uri',
@@ -272,20 +484,23 @@ class RequestCOGCommune(RequestCOG):
                 'end_date_count'
             ],
             extra_controls = [
-                CheckPatternAfterDownloadInseeCog(colname="uri", pattern=r"^http://id.insee.fr/geo/commune/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$"),
+                CheckPatternsAfterDownloadInseeCog(patterns={
+                    "uri": r"^http://id.insee.fr/geo/commune/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$",
+                    "insee_code": r"^(0[1-9]|[1-8][0-9]|9[0-8]|2[AB])[0-9]{3}$",
+                    "article_code": r"^[0-8X]$",
+                    "parent_uri": r"^(http://id.insee.fr/geo/(departement|collectiviteDOutreMer)/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12})([|]http://id.insee.fr/geo/(departement|collectiviteDOutreMer)/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12})*$",
+                    "start_event_uri": r"^http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$",
+                    "end_event_uri": r"^(http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12})?$"
+                }),
                 CheckURIUnicityAfterDownloadInseeCog(),
-                CheckPatternAfterDownloadInseeCog(colname="insee_code", pattern=r"^(0[1-9]|[1-8][0-9]|9[0-8]|2[AB])[0-9]{3}$"),
-                CheckPatternAfterDownloadInseeCog(colname="article_code", pattern=r"^[0-8X]$"),
-                CheckPatternAfterDownloadInseeCog(colname="parent_uri", pattern=r"^(http://id.insee.fr/geo/(departement|collectiviteDOutreMer)/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12})([|]http://id.insee.fr/geo/(departement|collectiviteDOutreMer)/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12})*$"),
-                CheckPatternAfterDownloadInseeCog(colname="start_event_uri", pattern=r"^http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$"),
-                CheckPatternAfterDownloadInseeCog(colname="end_event_uri", pattern=r"^(http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12})?$"),
                 CheckEventsUnequalAfterDownloadInseeCog(),
                 CheckStartDateAfterDownloadInseeCog(),
                 CheckEndDateAfterDownloadInseeCog(),
                 CheckEndEventConsistencyAfterDownloadInseeCog(),
                 CheckDateConsistencyAfterDownloadInseeCog(),
-                CheckInseeCodeOverlapAfterDownloadInseeCog()
-            ]
+                CheckInseeCodeOverlapAfterDownloadInseeCog(engine=acquisition_config.interval_check_engines.insee_code_overlap)
+            ],
+            shards=get_insee_code_prefix_shards(acquisition_config.communes_shards)
         )
        
 
@@ -295,7 +510,8 @@ class RequestCOGArrondissementMunicipal(RequestCOG):
             self,
             output_paths: OutputPathsRequestCOG,
             acquisition_config: InseeSupplierConfig = InseeSupplierConfig(),
-            exceptions_handler_config: ArrondissementsMunicipauxInseeExceptionsToIgnoreOrCorrect = ArrondissementsMunicipauxInseeExceptionsToIgnoreOrCorrect()
+            exceptions_handler_config: ArrondissementsMunicipauxInseeExceptionsToIgnoreOrCorrect = ArrondissementsMunicipauxInseeExceptionsToIgnoreOrCorrect(),
+            run_database: Optional[RunDatabase] = None
         ):
         super().__init__(
             output_paths=output_paths,
@@ -304,10 +520,12 @@ class RequestCOGArrondissementMunicipal(RequestCOG):
             view_name="insee_arrondissements_municipaux",
             exceptions_handler_config=exceptions_handler_config,
             acquisition_config=acquisition_config,
+            run_database=run_database,
             sql_templates= TemplatesSQLRequestCOG(
                 copy=Path(__file__).parent / "sql" / "arrondissements_municipaux_copy.mustache.sql",
                 create_view=Path(__file__).parent / "sql" / "arrondissements_municipaux_import.mustache.sql",
-                update=Path(__file__).parent / "sql" / "arrondissements_municipaux_correct.mustache.sql"
+                update=Path(__file__).parent / "sql" / "arrondissements_municipaux_correct.mustache.sql",
+                ingest=Path(__file__).parent / "sql" / "arrondissements_municipaux_ingest.mustache.sql"
             ),
             colnames=[
                 'uri',
@@ -324,19 +542,21 @@ class RequestCOGArrondissementMunicipal(RequestCOG):
                 'end_date_count'
             ],
             extra_controls = [
-                CheckPatternAfterDownloadInseeCog(colname="uri", pattern=r"^http://id.insee.fr/geo/arrondissementMunicipal/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$"),
+                CheckPatternsAfterDownloadInseeCog(patterns={
+                    "uri": r"^http://id.insee.fr/geo/arrondissementMunicipal/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$",
+                    "insee_code": r"^(13|69|75)[0-9]{3}$",
+                    "article_code": r"^[0-8X]$",
+                    "parent_uri": r"^(http://id.insee.fr/geo/commune/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12})([|]http://id.insee.fr/geo/commune/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12})*$",
+                    "start_event_uri": r"^http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$",
+                    "end_event_uri": r"^(http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12})?$"
+                }),
                 CheckURIUnicityAfterDownloadInseeCog(),
-                CheckPatternAfterDownloadInseeCog(colname="insee_code", pattern=r"^(13|69|75)[0-9]{3}$"),
-                CheckPatternAfterDownloadInseeCog(colname="article_code", pattern=r"^[0-8X]$"),
-                CheckPatternAfterDownloadInseeCog(colname="parent_uri", pattern=r"^(http://id.insee.fr/geo/commune/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12})([|]http://id.insee.fr/geo/commune/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12})*$"),
-                CheckPatternAfterDownloadInseeCog(colname="start_event_uri", pattern=r"^http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$"),
-                CheckPatternAfterDownloadInseeCog(colname="end_event_uri", pattern=r"^(http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12})?$"),
                 CheckEventsUnequalAfterDownloadInseeCog(),
                 CheckStartDateAfterDownloadInseeCog(),
                 CheckEndDateAfterDownloadInseeCog(),
                 CheckEndEventConsistencyAfterDownloadInseeCog(),
                 CheckDateConsistencyAfterDownloadInseeCog(),
-                CheckInseeCodeOverlapAfterDownloadInseeCog()
+                CheckInseeCodeOverlapAfterDownloadInseeCog(engine=acquisition_config.interval_check_engines.insee_code_overlap)
             ]
         )
 
@@ -346,7 +566,8 @@ class RequestCOGDepartement(RequestCOG):
             self,
             output_paths: OutputPathsRequestCOG,
             acquisition_config: InseeSupplierConfig = InseeSupplierConfig(),
-            exceptions_handler_config: DepartementsInseeExceptionsToIgnoreOrCorrect = DepartementsInseeExceptionsToIgnoreOrCorrect()
+            exceptions_handler_config: DepartementsInseeExceptionsToIgnoreOrCorrect = DepartementsInseeExceptionsToIgnoreOrCorrect(),
+            run_database: Optional[RunDatabase] = None
         ):
         super().__init__(
             output_paths=output_paths,
@@ -355,10 +576,12 @@ class RequestCOGDepartement(RequestCOG):
             view_name="insee_departements",
             exceptions_handler_config=exceptions_handler_config,
             acquisition_config=acquisition_config,
+            run_database=run_database,
             sql_templates= TemplatesSQLRequestCOG(
                 copy=Path(__file__).parent / "sql" / "departements_copy.mustache.sql",
                 create_view=Path(__file__).parent / "sql" / "departements_import.mustache.sql",
-                update=Path(__file__).parent / "sql" / "departements_correct.mustache.sql"
+                update=Path(__file__).parent / "sql" / "departements_correct.mustache.sql",
+                ingest=Path(__file__).parent / "sql" / "departements_ingest.mustache.sql"
             ),
             colnames=[
                 'uri',
@@ -373,18 +596,20 @@ class RequestCOGDepartement(RequestCOG):
                 'end_date_count'
             ],
             extra_controls = [
-                CheckPatternAfterDownloadInseeCog(colname="uri", pattern=r"^http://id.insee.fr/geo/departement/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$"),
+                CheckPatternsAfterDownloadInseeCog(patterns={
+                    "uri": r"^http://id.insee.fr/geo/departement/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$",
+                    "insee_code": r"^(0[1-9]|[1-8][0-9]|9[0-5]|2[AB]|97[1-9])$",
+                    "article_code": r"^[0-8X]$",
+                    "start_event_uri": r"^http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$",
+                    "end_event_uri": r"^(http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12})?$"
+                }),
                 CheckURIUnicityAfterDownloadInseeCog(),
-                CheckPatternAfterDownloadInseeCog(colname="insee_code", pattern=r"^(0[1-9]|[1-8][0-9]|9[0-5]|2[AB]|97[1-9])$"),
-                CheckPatternAfterDownloadInseeCog(colname="article_code", pattern=r"^[0-8X]$"),
-                CheckPatternAfterDownloadInseeCog(colname="start_event_uri", pattern=r"^http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$"),
-                CheckPatternAfterDownloadInseeCog(colname="end_event_uri", pattern=r"^(http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12})?$"),
                 CheckEventsUnequalAfterDownloadInseeCog(),
                 CheckStartDateAfterDownloadInseeCog(),
                 CheckEndDateAfterDownloadInseeCog(),
                 CheckEndEventConsistencyAfterDownloadInseeCog(),
                 CheckDateConsistencyAfterDownloadInseeCog(),
-                CheckInseeCodeOverlapAfterDownloadInseeCog()
+                CheckInseeCodeOverlapAfterDownloadInseeCog(engine=acquisition_config.interval_check_engines.insee_code_overlap)
             ]
         )
 
@@ -396,7 +621,8 @@ class RequestsCOGDistrict(RequestCOG):
             self,
             output_paths: OutputPathsRequestCOG,
             acquisition_config: InseeSupplierConfig = InseeSupplierConfig(),
-            exceptions_handler_config: DistrictsInseeExceptionsToIgnoreOrCorrect = DistrictsInseeExceptionsToIgnoreOrCorrect()
+            exceptions_handler_config: DistrictsInseeExceptionsToIgnoreOrCorrect = DistrictsInseeExceptionsToIgnoreOrCorrect(),
+            run_database: Optional[RunDatabase] = None
         ):
         super().__init__(
             output_paths=output_paths,
@@ -405,10 +631,12 @@ class RequestsCOGDistrict(RequestCOG):
             view_name="insee_districts",
             exceptions_handler_config=exceptions_handler_config,
             acquisition_config=acquisition_config,
+            run_database=run_database,
             sql_templates= TemplatesSQLRequestCOG(
                 copy=Path(__file__).parent / "sql" / "districts_copy.mustache.sql",
                 create_view=Path(__file__).parent / "sql" / "districts_import.mustache.sql",
-                update=Path(__file__).parent / "sql" / "districts_correct.mustache.sql"
+                update=Path(__file__).parent / "sql" / "districts_correct.mustache.sql",
+                ingest=Path(__file__).parent / "sql" / "districts_ingest.mustache.sql"
             ),
             colnames=[
                 'uri',
@@ -423,18 +651,20 @@ class RequestsCOGDistrict(RequestCOG):
                 'end_date_count'
             ],
             extra_controls = [
-                CheckPatternAfterDownloadInseeCog(colname="uri", pattern=r"^http://id.insee.fr/geo/district/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$"),
+                CheckPatternsAfterDownloadInseeCog(patterns={
+                    "uri": r"^http://id.insee.fr/geo/district/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$",
+                    "insee_code": r"^98[0-9]{3}$",
+                    "article_code": r"^[0-8X]$",
+                    "start_event_uri": r"^http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$",
+                    "end_event_uri": r"^(http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12})?$"
+                }),
                 CheckURIUnicityAfterDownloadInseeCog(),
-                CheckPatternAfterDownloadInseeCog(colname="insee_code", pattern=r"^98[0-9]{3}$"),
-                CheckPatternAfterDownloadInseeCog(colname="article_code", pattern=r"^[0-8X]$"),
-                CheckPatternAfterDownloadInseeCog(colname="start_event_uri", pattern=r"^http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$"),
-                CheckPatternAfterDownloadInseeCog(colname="end_event_uri", pattern=r"^(http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12})?$"),
                 CheckEventsUnequalAfterDownloadInseeCog(),
                 CheckStartDateAfterDownloadInseeCog(),
                 CheckEndDateAfterDownloadInseeCog(),
                 CheckEndEventConsistencyAfterDownloadInseeCog(),
                 CheckDateConsistencyAfterDownloadInseeCog(),
-                CheckInseeCodeOverlapAfterDownloadInseeCog()
+                CheckInseeCodeOverlapAfterDownloadInseeCog(engine=acquisition_config.interval_check_engines.insee_code_overlap)
             ]
         )
 
@@ -446,7 +676,8 @@ class RequestsCOGCollectivitesOutremer(RequestCOG):
             self,
             output_paths: OutputPathsRequestCOG,
             acquisition_config: InseeSupplierConfig = InseeSupplierConfig(),
-            exceptions_handler_config: CollectivitesDOutreMerInseeExceptionsToIgnoreOrCorrect = CollectivitesDOutreMerInseeExceptionsToIgnoreOrCorrect()
+            exceptions_handler_config: CollectivitesDOutreMerInseeExceptionsToIgnoreOrCorrect = CollectivitesDOutreMerInseeExceptionsToIgnoreOrCorrect(),
+            run_database: Optional[RunDatabase] = None
         ):
         super().__init__(
             output_paths=output_paths,
@@ -455,10 +686,12 @@ class RequestsCOGCollectivitesOutremer(RequestCOG):
             view_name="insee_collectivites_outremer",
             exceptions_handler_config=exceptions_handler_config,
             acquisition_config=acquisition_config,
+            run_database=run_database,
             sql_templates= TemplatesSQLRequestCOG(
                 copy=Path(__file__).parent / "sql" / "collectivites_outremer_copy.mustache.sql",
                 create_view=Path(__file__).parent / "sql" / "collectivites_outremer_import.mustache.sql",
-                update=Path(__file__).parent / "sql" / "collectivites_outremer_correct.mustache.sql"
+                update=Path(__file__).parent / "sql" / "collectivites_outremer_correct.mustache.sql",
+                ingest=Path(__file__).parent / "sql" / "collectivites_outremer_ingest.mustache.sql"
             ),
             colnames=[
                 'uri',
@@ -473,18 +706,20 @@ class RequestsCOGCollectivitesOutremer(RequestCOG):
                 'end_date_count'
             ],
             extra_controls = [
-                CheckPatternAfterDownloadInseeCog(colname="uri", pattern=r"^http://id.insee.fr/geo/collectiviteDOutreMer/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$"),
+                CheckPatternsAfterDownloadInseeCog(patterns={
+                    "uri": r"^http://id.insee.fr/geo/collectiviteDOutreMer/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$",
+                    "insee_code": r"^(95|96|975|976|977|978|981|984|985|986|987|988|989|98[0-9]{3})$",
+                    "article_code": r"^[0-8X]$",
+                    "start_event_uri": r"^http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$",
+                    "end_event_uri": r"^(http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12})?$"
+                }),
                 CheckURIUnicityAfterDownloadInseeCog(),
-                CheckPatternAfterDownloadInseeCog(colname="insee_code", pattern=r"^(95|96|975|976|977|978|981|984|985|986|987|988|989|98[0-9]{3})$"),
-                CheckPatternAfterDownloadInseeCog(colname="article_code", pattern=r"^[0-8X]$"),
-                CheckPatternAfterDownloadInseeCog(colname="start_event_uri", pattern=r"^http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$"),
-                CheckPatternAfterDownloadInseeCog(colname="end_event_uri", pattern=r"^(http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12})?$"),
                 CheckEventsUnequalAfterDownloadInseeCog(),
                 CheckStartDateAfterDownloadInseeCog(),
                 CheckEndDateAfterDownloadInseeCog(),
                 CheckEndEventConsistencyAfterDownloadInseeCog(),
                 CheckDateConsistencyAfterDownloadInseeCog(),
-                CheckInseeCodeOverlapAfterDownloadInseeCog()                
+                CheckInseeCodeOverlapAfterDownloadInseeCog(engine=acquisition_config.interval_check_engines.insee_code_overlap)                
             ]
         )
 
@@ -494,7 +729,8 @@ class RequestsCOGPays(RequestCOG):
             self,
             output_paths: OutputPathsRequestCOG,
             acquisition_config: InseeSupplierConfig = InseeSupplierConfig(),
-            exceptions_handler_config: PaysInseeExceptionsToIgnoreOrCorrect = PaysInseeExceptionsToIgnoreOrCorrect()
+            exceptions_handler_config: PaysInseeExceptionsToIgnoreOrCorrect = PaysInseeExceptionsToIgnoreOrCorrect(),
+            run_database: Optional[RunDatabase] = None
         ):
         super().__init__(
             output_paths=output_paths,
@@ -503,10 +739,12 @@ class RequestsCOGPays(RequestCOG):
             view_name="insee_pays",
             exceptions_handler_config=exceptions_handler_config,
             acquisition_config=acquisition_config,
+            run_database=run_database,
             sql_templates= TemplatesSQLRequestCOG(
                 copy=Path(__file__).parent / "sql" / "pays_copy.mustache.sql",
                 create_view=Path(__file__).parent / "sql" / "pays_import.mustache.sql",
-                update=Path(__file__).parent / "sql" / "pays_correct.mustache.sql"
+                update=Path(__file__).parent / "sql" / "pays_correct.mustache.sql",
+                ingest=Path(__file__).parent / "sql" / "pays_ingest.mustache.sql"
             ),
             colnames=[
                 'uri',
@@ -525,20 +763,22 @@ class RequestsCOGPays(RequestCOG):
                 'end_date_count'
             ],
             extra_controls = [
-                CheckPatternAfterDownloadInseeCog(colname="uri", pattern=r"^http://id.insee.fr/geo/pays/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$"),
+                CheckPatternsAfterDownloadInseeCog(patterns={
+                    "uri": r"^http://id.insee.fr/geo/pays/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$",
+                    "insee_code": r"^99[0-9]{3}$",
+                    "article_code": r"^[0-8X]$",
+                    "iso3166alpha2_code": r"^([A-Z]{2})?$",
+                    "iso3166alpha3_code": r"^([A-Z]{3})?$",
+                    "iso3166num_code": r"^([0-9]{3})?$",
+                    "start_event_uri": r"^http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$",
+                    "end_event_uri": r"^(http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12})?$"
+                }),
                 CheckURIUnicityAfterDownloadInseeCog(),
-                CheckPatternAfterDownloadInseeCog(colname="insee_code", pattern=r"^99[0-9]{3}$"),
-                CheckPatternAfterDownloadInseeCog(colname="article_code", pattern=r"^[0-8X]$"),
-                CheckPatternAfterDownloadInseeCog(colname="iso3166alpha2_code", pattern=r"^([A-Z]{2})?$"),
-                CheckPatternAfterDownloadInseeCog(colname="iso3166alpha3_code", pattern=r"^([A-Z]{3})?$"),
-                CheckPatternAfterDownloadInseeCog(colname="iso3166num_code", pattern=r"^([0-9]{3})?$"),
-                CheckPatternAfterDownloadInseeCog(colname="start_event_uri", pattern=r"^http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$"),
-                CheckPatternAfterDownloadInseeCog(colname="end_event_uri", pattern=r"^(http://id.insee.fr/geo/evenementGeographique/[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12})?$"),
                 CheckEventsUnequalAfterDownloadInseeCog(),
                 CheckStartDateAfterDownloadInseeCog(),
                 CheckEndDateAfterDownloadInseeCog(),
                 CheckEndEventConsistencyAfterDownloadInseeCog(),
                 CheckDateConsistencyAfterDownloadInseeCog(),
-                CheckInseeCodeOverlapAfterDownloadInseeCog()
+                CheckInseeCodeOverlapAfterDownloadInseeCog(engine=acquisition_config.interval_check_engines.insee_code_overlap)
             ]
         )
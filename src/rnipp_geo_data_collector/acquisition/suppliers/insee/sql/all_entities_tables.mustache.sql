@@ -0,0 +1,25 @@
+CREATE OR REPLACE TABLE {{table_name}} AS
+{{#entities}}
+SELECT
+    '{{entity}}' as entity,
+    uri,
+    insee_code,
+    label,
+    article_code,
+    {{#has_parent_uri}}parent_uri{{/has_parent_uri}}{{^has_parent_uri}}NULL::VARCHAR as parent_uri{{/has_parent_uri}},
+    start_event_uri,
+    end_event_uri,
+    start_date,
+    end_date,
+    {{#rows_view_name}}uri IN (SELECT uri FROM {{rows_view_name}}){{/rows_view_name}}{{^rows_view_name}}true{{/rows_view_name}} as changed
+FROM {{view_name}}
+{{^last}}UNION ALL{{/last}}
+{{/entities}} ;
+
+CREATE OR REPLACE TABLE {{events_table_name}} AS
+SELECT start_event_uri as event_uri, start_date as event_date, entity, uri, 'start' as role, changed
+FROM {{table_name}}
+UNION ALL
+SELECT end_event_uri as event_uri, end_date as event_date, entity, uri, 'end' as role, changed
+FROM {{table_name}}
+WHERE coalesce(end_event_uri, '') <> '' ;
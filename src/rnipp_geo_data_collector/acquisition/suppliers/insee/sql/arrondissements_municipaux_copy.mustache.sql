@@ -31,4 +31,4 @@ COPY (
             'end_date_count': 'INTEGER'
         }
     )
-) TO '{{output_path}}' (FORMAT CSV, HEADER TRUE) ;
+) TO '{{output_path}}' ({{copy_options}}) ;
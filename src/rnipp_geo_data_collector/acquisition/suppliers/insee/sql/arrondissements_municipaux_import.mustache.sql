@@ -12,7 +12,7 @@ CREATE OR REPLACE VIEW {{view_name}} AS (
         parent_uri_count,
         start_date_count,
         end_date_count
-    FROM read_csv(
+    FROM {{#parquet}}read_parquet('{{path}}'){{/parquet}}{{#csv}}read_csv(
         '{{path}}',
         delim = ',',
         header = true,
@@ -30,5 +30,5 @@ CREATE OR REPLACE VIEW {{view_name}} AS (
             'start_date_count': 'INTEGER',
             'end_date_count': 'INTEGER'
         }
-    )
+    ){{/csv}}
 ) ;
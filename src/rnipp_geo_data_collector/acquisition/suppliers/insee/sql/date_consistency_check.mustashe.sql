@@ -1,12 +1,17 @@
 SELECT row_num, uri, start_date, end_date
 FROM (
     SELECT
-        row_number() OVER () as row_num,
+        row_num,
         uri,
         start_date,
         end_date
-    FROM {{view_name}}
-
+    FROM (
+        SELECT row_number() OVER () as row_num, *
+        FROM {{view_name}}
+    ) as t_numbered
+    {{#affected_view_name}}
+    WHERE coalesce(uri, '') IN (SELECT coalesce(uri, '') FROM {{affected_view_name}})
+    {{/affected_view_name}}
 )
 WHERE end_date is not null and start_date > coalesce(end_date, today())
 LIMIT 1 ;
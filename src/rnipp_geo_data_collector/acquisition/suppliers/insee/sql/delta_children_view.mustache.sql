@@ -0,0 +1,17 @@
+CREATE OR REPLACE VIEW {{children_view_name}} AS
+SELECT *
+FROM {{view_name}}
+WHERE uri IN (SELECT uri FROM {{rows_view_name}})
+OR uri IN (
+    SELECT uri
+    FROM (
+        SELECT uri, regexp_split_to_table(parent_uri, '[|]') as parent_uri
+        FROM {{view_name}}
+    ) as t_child
+    WHERE parent_uri IN (
+        {{#parents}}
+        SELECT uri FROM {{delta_table_name}}
+        {{^last}}UNION ALL{{/last}}
+        {{/parents}}
+    )
+) ;
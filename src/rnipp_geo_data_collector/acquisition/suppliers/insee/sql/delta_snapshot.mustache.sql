@@ -0,0 +1,3 @@
+CREATE OR REPLACE TABLE {{snapshot_table_name}} AS
+SELECT *
+FROM {{view_name}} ;
@@ -0,0 +1,32 @@
+CREATE OR REPLACE TABLE {{delta_table_name}} AS
+WITH
+    current_rows AS (
+        SELECT * FROM {{view_name}}
+        EXCEPT ALL
+        SELECT * FROM {{snapshot_table_name}}
+    ),
+    previous_rows AS (
+        SELECT * FROM {{snapshot_table_name}}
+        EXCEPT ALL
+        SELECT * FROM {{view_name}}
+    )
+SELECT
+    CASE WHEN EXISTS (SELECT 1 FROM previous_rows WHERE previous_rows.uri = current_rows.uri) THEN 'modified' ELSE 'added' END as change,
+    *
+FROM current_rows
+UNION ALL
+SELECT 'removed' as change, *
+FROM previous_rows
+WHERE NOT EXISTS (SELECT 1 FROM current_rows WHERE current_rows.uri = previous_rows.uri) ;
+
+CREATE OR REPLACE VIEW {{rows_view_name}} AS
+SELECT * EXCLUDE (change)
+FROM {{delta_table_name}}
+WHERE change <> 'removed' ;
+
+{{#keys}}
+CREATE OR REPLACE VIEW {{key_view_name}} AS
+SELECT *
+FROM {{view_name}}
+WHERE {{key}} IN (SELECT {{key}} FROM {{rows_view_name}}) ;
+{{/keys}}
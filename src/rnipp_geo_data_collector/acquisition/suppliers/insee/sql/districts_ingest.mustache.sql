@@ -0,0 +1,14 @@
+CREATE OR REPLACE TABLE {{table_name}} AS (
+    SELECT
+        CAST(NULLIF(uri, '') AS VARCHAR) AS uri,
+        CAST(NULLIF(insee_code, '') AS VARCHAR) AS insee_code,
+        CAST(NULLIF(label, '') AS VARCHAR) AS label,
+        CAST(NULLIF(article_code, '') AS VARCHAR) AS article_code,
+        CAST(NULLIF(start_event_uri, '') AS VARCHAR) AS start_event_uri,
+        CAST(NULLIF(end_event_uri, '') AS VARCHAR) AS end_event_uri,
+        CAST(NULLIF(start_date, '') AS DATE) AS start_date,
+        CAST(NULLIF(end_date, '') AS DATE) AS end_date,
+        CAST(NULLIF(start_date_count, '') AS INTEGER) AS start_date_count,
+        CAST(NULLIF(end_date_count, '') AS INTEGER) AS end_date_count
+    FROM {{input_relation}}
+) ;
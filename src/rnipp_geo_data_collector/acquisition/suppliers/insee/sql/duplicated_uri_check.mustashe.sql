@@ -2,9 +2,12 @@ SELECT uri, duplicate_rows
 FROM (
     SELECT uri, string_agg(CAST(row_num AS VARCHAR), ', ') as duplicate_rows
     FROM (
-        SELECT row_number() OVER () as row_num, uri
+        SELECT row_number() OVER () as row_num, *
         FROM {{view_name}}
-    ) as t1
+    ) as t_numbered
+    {{#affected_view_name}}
+    WHERE coalesce(uri, '') IN (SELECT coalesce(uri, '') FROM {{affected_view_name}})
+    {{/affected_view_name}}
     GROUP BY uri
     HAVING count(*) > 1
 )
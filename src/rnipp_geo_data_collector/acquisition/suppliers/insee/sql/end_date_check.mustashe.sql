@@ -1,7 +1,7 @@
 SELECT row_num, uri, end_date, end_date_count, date_category
 FROM (
     SELECT
-        row_number() OVER () as row_num,
+        row_num,
         uri,
         end_date,
         end_date_count,
@@ -12,7 +12,13 @@ FROM (
             WHEN end_date_count > 1 THEN 'MULTIPLE'
             ELSE CAST(NULL AS VARCHAR)
         END AS date_category
-    FROM {{view_name}}
+    FROM (
+        SELECT row_number() OVER () as row_num, *
+        FROM {{view_name}}
+    ) as t_numbered
+    {{#affected_view_name}}
+    WHERE coalesce(uri, '') IN (SELECT coalesce(uri, '') FROM {{affected_view_name}})
+    {{/affected_view_name}}
 )
 WHERE date_category IS NOT NULL
 LIMIT 1 ;
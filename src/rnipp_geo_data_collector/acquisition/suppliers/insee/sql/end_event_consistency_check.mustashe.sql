@@ -1,11 +1,17 @@
 SELECT row_num, uri, end_event_uri, end_date
 FROM (
     SELECT
-        row_number() OVER () as row_num,
+        row_num,
         uri,
         end_event_uri,
         end_date
-    FROM {{view_name}}
+    FROM (
+        SELECT row_number() OVER () as row_num, *
+        FROM {{view_name}}
+    ) as t_numbered
+    {{#affected_view_name}}
+    WHERE coalesce(uri, '') IN (SELECT coalesce(uri, '') FROM {{affected_view_name}})
+    {{/affected_view_name}}
 )
 WHERE (end_event_uri is null and end_date is not null) OR (end_event_uri is not null and end_date is null)
 LIMIT 1 ;
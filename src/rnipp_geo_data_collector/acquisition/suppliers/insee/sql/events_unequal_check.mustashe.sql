@@ -1,11 +1,17 @@
 SELECT row_num, uri, coalesce(start_event_uri, '') as start_event_uri, coalesce(end_event_uri, '') as end_event_uri
 FROM (
     SELECT
-        row_number() OVER () as row_num,
+        row_num,
         uri,
         start_event_uri,
         end_event_uri
-    FROM {{view_name}}
+    FROM (
+        SELECT row_number() OVER () as row_num, *
+        FROM {{view_name}}
+    ) as t_numbered
+    {{#affected_view_name}}
+    WHERE coalesce(uri, '') IN (SELECT coalesce(uri, '') FROM {{affected_view_name}})
+    {{/affected_view_name}}
 )
 WHERE coalesce(start_event_uri, '') == coalesce(end_event_uri, '')
 LIMIT 1 ;
@@ -0,0 +1,6 @@
+{{#children}}
+SELECT uri, regexp_split_to_table(parent_uri, '[|]') as parent_uri
+FROM {{view_name}}
+WHERE uri IS NOT NULL AND parent_uri IS NOT NULL
+{{^last}}UNION ALL{{/last}}
+{{/children}} ;
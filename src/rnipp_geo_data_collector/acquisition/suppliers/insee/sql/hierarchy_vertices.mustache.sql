@@ -0,0 +1,10 @@
+{{#entities}}
+SELECT
+    uri,
+    {{entity_index}} as entity_index,
+    coalesce((start_date - DATE '1970-01-01')::INTEGER, -2147483648) as start_day,
+    coalesce((end_date - DATE '1970-01-01')::INTEGER, 2147483647) as end_day
+FROM {{view_name}}
+WHERE uri IS NOT NULL
+{{^last}}UNION ALL{{/last}}
+{{/entities}} ;
@@ -1,7 +1,13 @@
 SELECT row_num, uri, insee_code
 FROM (
-    SELECT row_number() OVER () as row_num, uri, coalesce(insee_code, '') as insee_code
-    FROM {{view_name}}
+    SELECT row_num, uri, coalesce(insee_code, '') as insee_code
+    FROM (
+        SELECT row_number() OVER () as row_num, *
+        FROM {{view_name}}
+    ) as t_numbered
+    {{#affected_view_name}}
+    WHERE coalesce(uri, '') IN (SELECT coalesce(uri, '') FROM {{affected_view_name}})
+    {{/affected_view_name}}
 )
 WHERE not(regexp_matches(coalesce(insee_code, ''), '{{pattern}}'))
 LIMIT 1 ;
@@ -1,17 +1,31 @@
+WITH periods AS MATERIALIZED (
+    SELECT
+        uri,
+        insee_code,
+        start_date,
+        end_date,
+        row_number() OVER sweep as sweep_rank,
+        max(end_date) OVER (sweep ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING) as max_previous_end_date
+    FROM (
+        SELECT uri, insee_code, start_date, coalesce(end_date, date_add(today(), INTERVAL 1 DAY)) as end_date
+        FROM {{view_name}}
+        WHERE start_date IS NOT NULL
+    )
+    WINDOW sweep AS (PARTITION BY insee_code ORDER BY start_date, end_date, uri)
+)
 SELECT
-    a.insee_code as insee_code,
+    b.insee_code as insee_code,
     a.uri as uri_a,
     b.uri as uri_b
 FROM (
-    SELECT uri, insee_code, start_date, coalesce(end_date, date_add(today(), INTERVAL 1 DAY)) as end_date
-    FROM {{view_name}}
-) as a
-JOIN (
-    SELECT uri, insee_code, start_date, coalesce(end_date, date_add(today(), INTERVAL 1 DAY)) as end_date
-    FROM {{view_name}}
+    SELECT insee_code, uri, start_date, end_date, sweep_rank
+    FROM periods
+    WHERE max_previous_end_date > start_date
 ) as b
+JOIN periods as a
     ON a.insee_code = b.insee_code
+    AND a.sweep_rank < b.sweep_rank
     AND a.uri <> b.uri
-    AND a.start_date < b.end_date
     AND b.start_date < a.end_date
-LIMIT 1 ;
+    AND a.start_date < b.end_date
+ORDER BY b.insee_code, a.sweep_rank, b.sweep_rank ;
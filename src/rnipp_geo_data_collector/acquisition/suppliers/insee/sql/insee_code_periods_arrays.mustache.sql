@@ -0,0 +1,9 @@
+SELECT
+    hash(insee_code) as insee_code_hash,
+    hash(uri) as uri_hash,
+    (start_date - DATE '1970-01-01')::INTEGER as start_day,
+    (coalesce(end_date, date_add(today(), INTERVAL 1 DAY)::DATE) - DATE '1970-01-01')::INTEGER as end_day{{#with_labels}},
+    insee_code,
+    uri{{/with_labels}}
+FROM {{view_name}}
+WHERE start_date IS NOT NULL AND insee_code IS NOT NULL AND uri IS NOT NULL ;
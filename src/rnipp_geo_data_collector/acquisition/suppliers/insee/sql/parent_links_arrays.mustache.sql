@@ -0,0 +1,18 @@
+SELECT
+    rowid as link_id,
+    row_num::BIGINT as row_num{{#with_labels}},
+    uri,
+    parent_uri{{/with_labels}}{{^with_labels}},
+    coalesce(parent_row_num, 0)::BIGINT as parent_row_num,
+    parent_exist,
+    start_date IS NOT NULL as has_start,
+    coalesce((start_date - DATE '1970-01-01')::INTEGER, 0) as start_day,
+    end_date IS NOT NULL as has_end,
+    coalesce((end_date - DATE '1970-01-01')::INTEGER, 0) as end_day,
+    parent_start_date IS NOT NULL as has_parent_start,
+    coalesce((parent_start_date - DATE '1970-01-01')::INTEGER, 0) as parent_start_day,
+    coalesce((parent_end_date - DATE '1970-01-01')::INTEGER, 0) as parent_end_day,
+    parent_is_current IS NOT false as parent_is_open,
+    (today() - DATE '1970-01-01')::INTEGER as today_day{{/with_labels}}
+FROM {{links_table_name}}
+WHERE uri IS NOT NULL AND parent_uri IS NOT NULL ;
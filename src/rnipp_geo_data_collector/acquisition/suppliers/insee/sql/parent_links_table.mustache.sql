@@ -0,0 +1,34 @@
+CREATE OR REPLACE TABLE {{table_name}} AS
+SELECT
+    t_child.row_num as row_num,
+    t_child.uri as uri,
+    t_child.parent_uri as parent_uri,
+    t_child.start_date as start_date,
+    t_child.end_date as end_date,
+    coalesce(t_parent.parent_exist, false) as parent_exist,
+    t_parent.parent_start_date as parent_start_date,
+    t_parent.parent_end_date as parent_end_date,
+    t_parent.parent_is_current as parent_is_current,
+    t_parent.parent_row_num as parent_row_num
+FROM (
+    SELECT row_num, uri, regexp_split_to_table(parent_uri, '[|]') as parent_uri, start_date, end_date
+    FROM (
+        SELECT row_number() OVER () as row_num, uri, parent_uri, start_date, end_date
+        FROM {{view_name_child}}
+    ) as t1
+    {{#affected_children_view_name}}
+    WHERE uri IN (SELECT uri FROM {{affected_children_view_name}})
+    {{/affected_children_view_name}}
+) as t_child
+LEFT JOIN (
+    SELECT
+        parent_uri,
+        true as parent_exist,
+        start_date as parent_start_date,
+        coalesce(end_date, date_add(today(), INTERVAL 1 DAY)::DATE) as parent_end_date,
+        end_date IS NULL as parent_is_current,
+        row_number() OVER () as parent_row_num
+    FROM (
+        {{sql_import_parent}}
+    ) as t2
+) as t_parent ON t_child.parent_uri = t_parent.parent_uri ;
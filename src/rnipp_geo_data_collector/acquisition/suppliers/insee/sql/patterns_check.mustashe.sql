@@ -0,0 +1,26 @@
+SELECT row_num, uri, failure.colname, failure.col
+FROM (
+    SELECT row_num, uri, unnest(failures) as failure
+    FROM (
+        SELECT
+            row_num,
+            coalesce(uri, '') as uri,
+            list_filter(
+                [
+                    {{#patterns}}
+                    {'colname': '{{colname}}', 'col': coalesce({{colname}}, ''), 'valid': regexp_matches(coalesce({{colname}}, ''), ${{parameter}})}{{^last}},{{/last}}
+                    {{/patterns}}
+                ],
+                pattern_check -> not(pattern_check.valid)
+            ) as failures
+        FROM (
+            SELECT row_number() OVER () as row_num, *
+            FROM {{view_name}}
+        ) as t_numbered
+        {{#affected_view_name}}
+        WHERE coalesce(uri, '') IN (SELECT coalesce(uri, '') FROM {{affected_view_name}})
+        {{/affected_view_name}}
+    )
+    WHERE len(failures) > 0
+)
+ORDER BY row_num ;
@@ -1,4 +1,4 @@
-COPY (
+{{#output_path}}COPY ({{/output_path}}{{#output_table}}CREATE OR REPLACE TABLE {{output_table}} AS ({{/output_table}}
     SELECT 
         CASE WHEN t_add_or_replace.is_present_add_or_replace is not null THEN t_add_or_replace.uri ELSE t_raw.uri END AS uri,
         CASE WHEN t_add_or_replace.is_present_add_or_replace is not null THEN t_add_or_replace.insee_code ELSE t_raw.insee_code END AS insee_code,
@@ -50,38 +50,15 @@ COPY (
             start_date_count,
             end_date_count,
             true as is_present_add_or_replace
-        FROM read_csv(
-            '{{path_add_or_replace}}',
-            delim = ',',
-            header = true,
-            columns = {
-                'uri': 'VARCHAR',
-                'insee_code': 'VARCHAR',
-                'label': 'VARCHAR',
-                'article_code': 'VARCHAR',
-                'long_label': 'VARCHAR',
-                'iso3166alpha2_code': 'VARCHAR',
-                'iso3166alpha3_code': 'VARCHAR',
-                'iso3166num_code': 'VARCHAR',
-                'start_event_uri': 'VARCHAR',
-                'end_event_uri': 'VARCHAR',
-                'start_date': 'DATE',
-                'end_date': 'DATE',
-                'start_date_count': 'INTEGER',
-                'end_date_count': 'INTEGER'
-            }
-        )
+        FROM {{exceptions_table_name}}
+        WHERE entity = '{{entity}}' AND action = 'add_or_replace'
     ) as t_add_or_replace USING(uri)
     FULL JOIN (
         SELECT
             uri,
             true as is_remove
-        FROM read_csv(
-            '{{path_remove}}',
-            delim = ',',
-            header = true,
-            columns = {'uri': 'VARCHAR'}
-        )
+        FROM {{exceptions_table_name}}
+        WHERE entity = '{{entity}}' AND action = 'remove'
     ) as t_remove USING(uri)
     WHERE t_remove.is_remove is NULL OR  (t_remove.is_remove is NOT NULL AND t_add_or_replace.is_present_add_or_replace is NOT NULL)
-) TO '{{output_path}}' (FORMAT CSV, HEADER TRUE) ;
+){{#output_path}} TO '{{output_path}}' ({{copy_options}}){{/output_path}} ;
@@ -14,7 +14,7 @@ CREATE OR REPLACE VIEW {{view_name}} AS (
         end_date,
         start_date_count,
         end_date_count
-    FROM read_csv(
+    FROM {{#parquet}}read_parquet('{{path}}'){{/parquet}}{{#csv}}read_csv(
         '{{path}}',
         delim = ',',
         header = true,
@@ -34,5 +34,5 @@ CREATE OR REPLACE VIEW {{view_name}} AS (
             'start_date_count': 'INTEGER',
             'end_date_count': 'INTEGER'
         }
-    )
+    ){{/csv}}
 ) ;
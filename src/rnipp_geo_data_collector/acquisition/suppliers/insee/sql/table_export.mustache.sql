@@ -0,0 +1 @@
+COPY {{table_name}} TO '{{output_path}}' ({{copy_options}}) ;
@@ -2,56 +2,68 @@ from __future__ import annotations
 
 from pathlib import Path
 import logging
-import pystache
 from duckdb import DuckDBPyConnection
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Union
 
+from ....sql_templates import SQL_TEMPLATES
 from .abstract import DataValidationAndConsistencyLaPosteHexasmal
 
 
 if TYPE_CHECKING:
     from ..requests import RequestLaPosteHexasmal
 
-class CheckPatternAfterDownloadLaPosteHexasmal(DataValidationAndConsistencyLaPosteHexasmal):
+class CheckPatternsAfterDownloadLaPosteHexasmal(DataValidationAndConsistencyLaPosteHexasmal):
+    """
+    Check the values of several columns against their pattern in a single scan of the data, reporting all the
+    invalid values (the first `max_reported_failures` of them in the logs, and the first one of each column in the error)
+    """
     def __init__(
             self,
-            colname: str,
-            pattern: str
+            patterns: dict[str, str],
+            max_reported_failures: int = 100
         ):
         super().__init__()
-        self.colname = colname
-        self.pattern = pattern
+        self.patterns = patterns
+        self.max_reported_failures = max_reported_failures
+
 
-    
     def run(self, request: RequestLaPosteHexasmal, duckdb_conn: DuckDBPyConnection) -> bool:
-        """Check if the content of the file is valid according to a pattern"""
-        template_path = Path(__file__).parent.parent / "sql" / "pattern_check.mustashe.sql"
-        renderer = pystache.Renderer(escape=lambda s: s) 
-        context: dict[str, str] = {
+        """Check if the content of the file is valid according to the pattern of each column"""
+        template_path = Path(__file__).parent.parent / "sql" / "patterns_check.mustashe.sql"
+        colnames = list(self.patterns.keys())
+        context: dict[str, Union[str, list[dict[str, Union[str, bool]]]]] = {
             "view_name": request.view_name,
-            "colname": self.colname,
-            "pattern": self.pattern
+            "patterns": [
+                {"colname": colname, "parameter": f"pattern_{index}", "last": index == len(colnames) - 1}
+                for index, colname in enumerate(colnames)
+            ]
         }
-        
-        try:
-            with open(template_path, 'r', encoding='utf-8') as template_file:
-                template_content = template_file.read()
-        except Exception as e:
-            raise RuntimeError(f"Failed to load template file {template_path}") from e
-        
-        try:
-            rendered_str = renderer.render(template_content, context)
-        except Exception as e:
-            raise RuntimeError(f"Failed to render template file {template_path}") from e
-        
+        # The patterns are bound as parameters, the statement only depends on the columns
+        parameters: dict[str, str] = {f"pattern_{index}": self.patterns[colname] for index, colname in enumerate(colnames)}
+
+        rendered_str = SQL_TEMPLATES.render(template_path, context)
+
         try:
-            data_bug = duckdb_conn.sql(rendered_str).fetchall()
-            if len(data_bug) > 0:
-                row_number_bug = data_bug[0][0]
-                colname_bug = data_bug[0][1]
-                raise RuntimeError(f"Failed to load La Poste Hexasmal data after downloading. The file may be corrupted or not in the expected format. Value '{colname_bug}' for colname {self.colname} is not valid at row {row_number_bug}")
+            data_bug = duckdb_conn.execute(rendered_str, parameters).fetchall()
         except Exception as e:
-            raise RuntimeError(f"Unexpected error while checking '{self.colname} of La Poste Hexasmal data after downloading") from e
-                  
-        logging.info(f"Successfully checked pattern for colname '{self.colname}' of La Poste Hexasmal data after downloading")
+            raise RuntimeError(f"Unexpected error while checking colnames {', '.join(colnames)} of La Poste Hexasmal data after downloading") from e
+
+        if len(data_bug) > 0:
+            first_bugs: dict[str, tuple[int, str]] = {}
+            nb_bugs: dict[str, int] = {}
+            for index, (row_number_bug, colname, colname_bug) in enumerate(data_bug):
+                first_bugs.setdefault(colname, (row_number_bug, colname_bug))
+                nb_bugs[colname] = nb_bugs.get(colname, 0) + 1
+                if index < self.max_reported_failures:
+                    logging.error(f"Invalid value '{colname_bug}' for colname {colname} of La Poste Hexasmal data at row {row_number_bug}")
+            if len(data_bug) > self.max_reported_failures:
+                logging.error(f"... and {len(data_bug) - self.max_reported_failures} other invalid value(s) in La Poste Hexasmal data")
+
+            messages = [
+                f"Value '{first_bugs[colname][1]}' for colname {colname} is not valid at row {first_bugs[colname][0]} ({nb_bugs[colname]} invalid value(s))"
+                for colname in colnames if colname in first_bugs
+            ]
+            raise RuntimeError("Failed to load La Poste Hexasmal data after downloading. The file may be corrupted or not in the expected format. " + " ; ".join(messages))
+
+        logging.info(f"Successfully checked patterns for colnames {', '.join(colnames)} of La Poste Hexasmal data after downloading")
         return True
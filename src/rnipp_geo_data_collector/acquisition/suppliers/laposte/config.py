@@ -1,12 +1,34 @@
+from pathlib import Path
 from pydantic import BaseModel
-from typing import Dict, List, Optional
+from typing import Dict, List, Literal, Optional
 
-class LaPosteSupplierConfig(BaseModel):
+from ....utils.http_client import HttpSupplierConfig
+from ....utils.response_cache import get_default_cache_directory
+
+class LaPosteSupplierConfig(HttpSupplierConfig):
     endpoint_url: str = "https://datanova.laposte.fr/data-fair/api/v1/datasets/laposte-hexasmal/raw"
     backoff_factor: float = 0.5
     max_retries: int = 5
     connect_timeout: float = 3
     read_timeout: float = 15
+    max_concurrent_requests: int = 1
+    # Directory of the raw base and of its validators revalidated by the next runs, outside the working directory
+    # (which is replaced by each run): the "laposte" directory of the user cache when not set
+    cache_directory: Optional[str] = None
+    max_resume_attempts: int = 3
+    # The base is asked uncompressed: a compressed body cannot be resumed with a Range request after a dropped connection
+    accept_encoding: str = "identity"
+    # "table" loads the cleaned base once into a DuckDB table read by all the checks,
+    # "view" reads the cleaned CSV file again for each check, for low-memory runs
+    storage_mode: Literal["table", "view"] = "table"
+    # Format of the cleaned base and of the intermediate files, the raw download is kept as received
+    output_format: Literal["csv", "parquet"] = "parquet"
+
+    def get_cache_directory(self) -> Path:
+        """Return the directory keeping the raw base between runs"""
+        if self.cache_directory is None:
+            return get_default_cache_directory() / "laposte"
+        return Path(self.cache_directory)
 
 class LaPosteEntity(BaseModel):
     name: str
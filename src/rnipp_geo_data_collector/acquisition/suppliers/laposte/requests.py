@@ -1,17 +1,20 @@
 from pathlib import Path
-from typing import Union
+from typing import Any, Optional, Union
 import requests
-from urllib3.util.retry import Retry
-from requests.adapters import HTTPAdapter
 from duckdb import DuckDBPyConnection
 import logging
-import pystache
-import csv
+import hashlib
+import shutil
 
+from ....utils.duckdb import get_output_format_context
+from ....utils.http_client import HttpValidators
+from ...sql_templates import SQL_TEMPLATES
+from ...check_executor import run_controls
+from ...exceptions_table import EXCEPTIONS_TABLE_NAME
+from ...run_database import RunDatabase, get_check_key, get_code_fingerprint, get_inputs_fingerprint
 from .config import LaPosteExceptionsToIgnoreOrCorrect, LaPosteSupplierConfig
-from .checks.abstract import DataValidationAndConsistencyLaPosteHexasmal
 from .checks.parsing import CheckParsingAfterDownloadLaPosteHexasmal
-from .checks.pattern import CheckPatternAfterDownloadLaPosteHexasmal
+from .checks.pattern import CheckPatternsAfterDownloadLaPosteHexasmal
 
 class TemplatesSQLRequestLaPosteHexasmal:
     def __init__(
@@ -37,22 +40,12 @@ class OutputPathsRequestLaPosteHexasmal:
     def __init__(
             self,
             raw_entities: Union[str, Path],
-            add_entities: Union[str, Path],
-            remove_entities: Union[str, Path],
             cleaned_entities: Union[str, Path]
         ):
         if isinstance(raw_entities, str):
             self.raw_entities = Path(raw_entities)
         else:
             self.raw_entities = raw_entities
-        if isinstance(add_entities, str):
-            self.add_entities = Path(add_entities)
-        else:
-            self.add_entities = add_entities
-        if isinstance(remove_entities, str):
-            self.remove_entities = Path(remove_entities)
-        else:
-            self.remove_entities = remove_entities
         if isinstance(cleaned_entities, str):
             self.cleaned_entities = Path(cleaned_entities)
         else:
@@ -64,10 +57,12 @@ class RequestLaPosteHexasmal:
             self,
             output_paths: OutputPathsRequestLaPosteHexasmal,
             exceptions_handler_config: LaPosteExceptionsToIgnoreOrCorrect,
-            acquisition_config: LaPosteSupplierConfig = LaPosteSupplierConfig()
+            acquisition_config: LaPosteSupplierConfig = LaPosteSupplierConfig(),
+            run_database: Optional[RunDatabase] = None
         ):
         self.output_paths = output_paths
         self.view_name = "laposte_hexasmal"
+        self.cleaned_table_name = f"{self.view_name}_cleaned"
         self.exceptions_handler_config = exceptions_handler_config
         self.sql_templates = TemplatesSQLRequestLaPosteHexasmal(
             copy=Path(__file__).parent / "sql" / "laposte_hexasmal_copy.mustache.sql",
@@ -75,41 +70,67 @@ class RequestLaPosteHexasmal:
             update=Path(__file__).parent / "sql" / "laposte_hexasmal_correct.mustache.sql"
         )
         self.acquisition_config = acquisition_config
+        self.run_database = run_database
         self.extra_controls = [
-            CheckPatternAfterDownloadLaPosteHexasmal(colname="insee_code", pattern=r"^((0[1-9]|[1-8][0-9]|9[0-8]|2[AB])[0-9]{3}|99138)$"),
-            CheckPatternAfterDownloadLaPosteHexasmal(colname="postal_code", pattern=r"^[0-9]{5}$")
+            CheckPatternsAfterDownloadLaPosteHexasmal(patterns={
+                "insee_code": r"^((0[1-9]|[1-8][0-9]|9[0-8]|2[AB])[0-9]{3}|99138)$",
+                "postal_code": r"^[0-9]{5}$"
+            })
         ]
+        cached_raw_entities = acquisition_config.get_cache_directory() / output_paths.raw_entities.name
+        self.cached_raw_entities = cached_raw_entities
+        self.cached_parsed_entities = cached_raw_entities.with_suffix(".parsed" + output_paths.cleaned_entities.suffix)
+        self.parsed_fingerprint_path = cached_raw_entities.with_suffix(".parsed.fingerprint")
+        self.validators_path = cached_raw_entities.with_suffix(cached_raw_entities.suffix + ".validators.json")
+        self.raw_unchanged = False
+        self.checks_fingerprint: Optional[str] = None
+
+    def send(self, duckdb_conn: Optional[DuckDBPyConnection] = None) -> None:
+        """
+        Download the hexasmal base, revalidating the cached copy with a conditional GET when one is available.
+        The base is always written to a file (to be revalidated and resumed), `duckdb_conn` is not used.
+        """
+        self.raw_unchanged = False
+        self.checks_fingerprint = None
+        validators = HttpValidators.from_file(self.validators_path)
+        if validators is not None and not validators.is_valid_for(self.cached_raw_entities):
+            validators = None
+        headers = validators.to_request_headers() if validators is not None else {}
 
-    def send(self) -> None:
         try:
-            retry_strategy = Retry(
-                total=self.acquisition_config.max_retries,
-                backoff_factor=self.acquisition_config.backoff_factor,
-                status_forcelist=[408, 429, 500, 502, 503, 504],
-                redirect=0
-            )
-            adapter = HTTPAdapter(max_retries=retry_strategy)
-            session = requests.Session()
-            session.mount("https://", adapter)
-            session.mount("http://", adapter)
-            with session.get(
+            http_client = self.acquisition_config.get_http_client()
+            with self.acquisition_config.get_request_slots(), http_client.session.get(
                 url=self.acquisition_config.endpoint_url,
                 data=None,
-                timeout=(self.acquisition_config.read_timeout, self.acquisition_config.connect_timeout)
+                headers=headers,
+                timeout=(self.acquisition_config.read_timeout, self.acquisition_config.connect_timeout),
+                stream=True
             ) as response:
+                if response.status_code == 304 and validators is not None:
+                    logging.info(f"La Poste Hexasmal data not modified since last download, reusing {self.cached_raw_entities}")
+                    self.raw_unchanged = True
+                    self.restore_cached_raw_entities()
+                    return
+
                 if response.status_code != 200:
                     raise requests.exceptions.HTTPError(f"HTTP error while querying La Poste: {response.status_code}")
                 
-                if not self.output_paths.raw_entities.parent.exists():
-                    self.output_paths.raw_entities.parent.mkdir(parents=True, exist_ok=True)
-                if self.output_paths.raw_entities.exists():
-                   self.output_paths.raw_entities.unlink()
-
-                with open(self.output_paths.raw_entities, "wb") as foutput:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            foutput.write(chunk)
+                content_length, content_hash = http_client.download_to_file(
+                    response=response,
+                    output_path=self.output_paths.raw_entities,
+                    description="La Poste Hexasmal data",
+                    timeout=(self.acquisition_config.read_timeout, self.acquisition_config.connect_timeout),
+                    max_resume_attempts=self.acquisition_config.max_resume_attempts,
+                    content_hash=hashlib.sha256()
+                )
 
+                new_validators = HttpValidators.from_response(response=response, content_length=content_length, sha256=content_hash.hexdigest())
+                self.raw_unchanged = validators is not None and validators.sha256 == new_validators.sha256
+                if self.raw_unchanged:
+                    logging.info(f"La Poste Hexasmal data downloaded again but unchanged since last download")
+                elif self.cached_parsed_entities.exists():
+                    self.cached_parsed_entities.unlink()
+                self.store_cached_raw_entities(validators=new_validators)
 
         except requests.exceptions.Timeout as e:
             raise TimeoutError(f"Timeout occurred while querying La Poste") from e
@@ -122,84 +143,137 @@ class RequestLaPosteHexasmal:
         except Exception as e:
             raise RuntimeError(f"Unexpected error while querying La Poste") from e
         
+    def restore_cached_raw_entities(self) -> None:
+        """Copy the cached raw file to the output path"""
+        if self.cached_raw_entities == self.output_paths.raw_entities:
+            return
+        if not self.output_paths.raw_entities.parent.exists():
+            self.output_paths.raw_entities.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(self.cached_raw_entities, self.output_paths.raw_entities)
+
+    def store_cached_raw_entities(self, validators: HttpValidators) -> None:
+        """Keep the downloaded raw file and its validators for the revalidation of the next runs"""
+        if self.cached_raw_entities != self.output_paths.raw_entities:
+            if not self.cached_raw_entities.parent.exists():
+                self.cached_raw_entities.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(self.output_paths.raw_entities, self.cached_raw_entities)
+        validators.to_file(self.validators_path)
+
+    def is_cached_parsed_entities_valid(self) -> bool:
+        """Whether the cached parsed file comes from the same raw file, parsed by the same code (copy template included)"""
+        if not self.raw_unchanged or not self.cached_parsed_entities.exists() or not self.parsed_fingerprint_path.exists():
+            return False
+        return self.parsed_fingerprint_path.read_text(encoding="utf-8") == get_code_fingerprint()
+
+    def store_cached_parsed_entities(self) -> None:
+        """Keep the parsed file and the fingerprint of the code that parsed it for the next runs"""
+        shutil.copyfile(self.output_paths.cleaned_entities, self.cached_parsed_entities)
+        self.parsed_fingerprint_path.write_text(get_code_fingerprint(), encoding="utf-8")
+
+    def get_inputs_fingerprint(self) -> Optional[str]:
+        """Fingerprint of what the cleaned table is loaded from, or None when there is no table to reuse in a persistent database"""
+        if not self.is_materialized():
+            return None
+        checks_fingerprint = self.get_checks_fingerprint()
+        if checks_fingerprint is None:
+            return None
+        # The cleaned table also depends on the code loading and cleaning it, the exceptions table template included
+        return get_check_key(self.cleaned_table_name, [checks_fingerprint])
+
+    def get_checks_fingerprint(self) -> Optional[str]:
+        """Fingerprint of the data read by the checks (raw base, SQL templates, exceptions), computed once per download, or None without a persistent database"""
+        if self.run_database is None:
+            return None
+        if self.checks_fingerprint is None:
+            self.checks_fingerprint = get_inputs_fingerprint(
+                paths=[self.output_paths.raw_entities, self.sql_templates.copy, self.sql_templates.create_view, self.sql_templates.update],
+                settings=[self.exceptions_handler_config.model_dump_json()]
+            )
+        return self.checks_fingerprint
+
+    def get_exceptions_rows(self) -> list[dict[str, Any]]:
+        """Rows of the exceptions table: the INSEE codes whose entries are replaced, and their new entries"""
+        rows: list[dict[str, Any]] = []
+        for key, list_add in self.exceptions_handler_config.root.items():
+            rows.append({"action": "remove", "insee_code": key})
+            for el in list_add:
+                rows.append(
+                    {
+                        "action": "add_or_replace",
+                        "insee_code": key,
+                        "name": el.name,
+                        "postal_code": el.postal_code,
+                        "delivery_label": el.delivery_label,
+                        "associated_name": el.associated_name
+                    }
+                )
+        return rows
+
     def apply_updates(self, duckdb_conn: DuckDBPyConnection):
         """Apply updates before checks"""
-        if not self.output_paths.add_entities.parent.exists():
-            self.output_paths.add_entities.parent.mkdir(parents=True, exist_ok=True)
-        if self.output_paths.add_entities.exists():
-            self.output_paths.add_entities.unlink()
-        
-        with open(self.output_paths.add_entities, mode="w", newline="", encoding="utf-8") as f_add:
-            fieldnames_add = ['insee_code', 'label', 'postal_code', 'delivery_label', 'associated_name']
-            writer_add = csv.DictWriter(f_add, fieldnames=fieldnames_add)
-            writer_add.writeheader()
-            for key, list_add in self.exceptions_handler_config.root.items():
-                for el in list_add:
-                    writer_add.writerow(
-                        {
-                            "insee_code": key,
-                            "label": el.name,
-                            "postal_code": el.postal_code,
-                            "delivery_label": el.delivery_label,
-                            "associated_name": el.associated_name
-                        }
-                    )
-       
-        if not self.output_paths.remove_entities.parent.exists():
-            self.output_paths.remove_entities.parent.mkdir(parents=True, exist_ok=True)
-        if self.output_paths.remove_entities.exists():
-            self.output_paths.remove_entities.unlink()
-
-        with open(self.output_paths.remove_entities, mode="w", newline="", encoding="utf-8") as f_remove:
-            fieldnames_remove = ['insee_code']
-            writer_remove = csv.DictWriter(f_remove, fieldnames=fieldnames_remove)
-            writer_remove.writeheader()
-            for key in self.exceptions_handler_config.root.keys():
-                writer_remove.writerow({'insee_code': key})
-        
         output_path_tmp =  self.output_paths.cleaned_entities.with_suffix(".tmp")
-        if not self.output_paths.cleaned_entities.parent.exists():
-            self.output_paths.cleaned_entities.parent.mkdir(parents=True, exist_ok=True)
-        if output_path_tmp.exists():
-            output_path_tmp.unlink()
-
-        context_apply_updates: dict[str, str] = {
+        context_apply_updates: dict[str, Union[str, bool]] = {
             "view_name": self.view_name,
-            "path_add": str(self.output_paths.add_entities.resolve()),
-            "path_remove": str(self.output_paths.remove_entities.resolve()),
-            "output_path": str(output_path_tmp.resolve())
+            "entity": self.view_name,
+            "exceptions_table_name": EXCEPTIONS_TABLE_NAME,
+            **get_output_format_context(self.acquisition_config.output_format)
         }
+        if self.is_materialized():
+            context_apply_updates["output_table"] = self.cleaned_table_name
+        else:
+            if not self.output_paths.cleaned_entities.parent.exists():
+                self.output_paths.cleaned_entities.parent.mkdir(parents=True, exist_ok=True)
+            if output_path_tmp.exists():
+                output_path_tmp.unlink()
+            context_apply_updates["output_path"] = str(output_path_tmp.resolve())
 
-        renderer_apply_updates = pystache.Renderer(escape=lambda s: s)
-        try:
-            with open(self.sql_templates.update, 'r', encoding='utf-8') as template_apply_updates_path:
-                template_apply_updates_content = template_apply_updates_path.read()
-        except Exception as e:
-            raise RuntimeError(f"Failed to load template file {self.sql_templates.update}") from e
-        
-        try:
-            renderer_apply_updates_str = renderer_apply_updates.render(template_apply_updates_content, context_apply_updates)
-        except Exception as e:
-            raise RuntimeError(f"Failed to render template file {self.sql_templates.update}") from e
+        renderer_apply_updates_str = SQL_TEMPLATES.render(self.sql_templates.update, context_apply_updates)
         
         try:
             duckdb_conn.execute(renderer_apply_updates_str)
-            if self.output_paths.cleaned_entities.exists():
-                self.output_paths.cleaned_entities.unlink()
-            output_path_tmp.replace(self.output_paths.cleaned_entities)
+            if not self.is_materialized():
+                if self.output_paths.cleaned_entities.exists():
+                    self.output_paths.cleaned_entities.unlink()
+                output_path_tmp.replace(self.output_paths.cleaned_entities)
         except Exception as e:
             raise RuntimeError(f"Failed to execute SQL script {self.sql_templates.update}") from e 
-               
-        
-    def check_content(self, duckdb_conn : DuckDBPyConnection) -> None:
-        """Check if the content of the file is valid"""
+
+        if self.is_materialized():
+            self.export_cleaned_entities(duckdb_conn=duckdb_conn)
+
+    def is_materialized(self) -> bool:
+        """Whether the cleaned base is loaded into `cleaned_table_name` rather than read from the cleaned file"""
+        return self.acquisition_config.storage_mode == "table"
+
+    def export_cleaned_entities(self, duckdb_conn: DuckDBPyConnection) -> None:
+        """Write the cleaned table to the cleaned entities file"""
+        if not self.output_paths.cleaned_entities.parent.exists():
+            self.output_paths.cleaned_entities.parent.mkdir(parents=True, exist_ok=True)
+        template_export_path = Path(__file__).parent / "sql" / "table_export.mustache.sql"
+        context_export: dict[str, Union[str, bool]] = {
+            "table_name": self.cleaned_table_name,
+            "output_path": str(self.output_paths.cleaned_entities.resolve()),
+            **get_output_format_context(self.acquisition_config.output_format)
+        }
+
+        rendered_export_str = SQL_TEMPLATES.render(template_export_path, context_export)
+
+        try:
+            duckdb_conn.execute(rendered_export_str)
+        except Exception as e:
+            raise RuntimeError(f"Failed to export La Poste Hexasmal data to {self.output_paths.cleaned_entities}") from e
+
+
+    def check_content(self, duckdb_conn : DuckDBPyConnection, threads: int = 1) -> None:
+        """Check if the content of the file is valid, the checks following the parsing running on up to `threads` threads"""
         logging.info(f"Checking content of La Poste Hexasmal data after downloading")
-        controls: list[DataValidationAndConsistencyLaPosteHexasmal] = [CheckParsingAfterDownloadLaPosteHexasmal()]
-        controls.extend(self.extra_controls)
-        nb_controls = len(controls)
-        if nb_controls == 0:
-            logging.info(f"No control to run for La Poste Hexasmal data after downloading")
-        for current_step, control in enumerate(controls):
-            logging.info(f"Running check {current_step+1}/{nb_controls}: {type(control).__name__}")
-            control.run(request=self, duckdb_conn=duckdb_conn)
+        run_controls(
+            request=self,
+            prerequisites=[CheckParsingAfterDownloadLaPosteHexasmal()],
+            controls=self.extra_controls,
+            duckdb_conn=duckdb_conn,
+            threads=threads,
+            run_database=self.run_database,
+            inputs_fingerprint=self.get_checks_fingerprint()
+        )
         logging.info(f"All checks passed for La Poste Hexasmal data after downloading")
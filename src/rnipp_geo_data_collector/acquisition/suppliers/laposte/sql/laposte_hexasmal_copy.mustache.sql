@@ -18,4 +18,4 @@ COPY (
             'associated_name': 'VARCHAR'
         }
     )
-) TO '{{output_path}}' (FORMAT CSV, HEADER TRUE) ;
+) TO '{{output_path}}' ({{copy_options}}) ;
@@ -1,4 +1,4 @@
-COPY (
+{{#output_path}}COPY ({{/output_path}}{{#output_table}}CREATE OR REPLACE TABLE {{output_table}} AS ({{/output_table}}
     SELECT 
         CASE WHEN t_add.is_present_add is not null THEN t_add.insee_code ELSE t_raw.insee_code END AS insee_code,
         CASE WHEN t_add.is_present_add is not null THEN t_add.name ELSE t_raw.name END AS name,
@@ -23,29 +23,15 @@ COPY (
             delivery_label,
             associated_name,
             true as is_present_add
-        FROM read_csv(
-            '{{path_add}}',
-            delim = ',',
-            header = true,
-            columns = {
-                'insee_code': 'VARCHAR',
-                'name': 'VARCHAR',
-                'postal_code': 'VARCHAR',
-                'delivery_label': 'VARCHAR',
-                'associated_name': 'VARCHAR'
-            }
-        )
+        FROM {{exceptions_table_name}}
+        WHERE entity = '{{entity}}' AND action = 'add_or_replace'
     ) as t_add USING(insee_code)
     FULL JOIN (
         SELECT
             insee_code,
             true as is_remove
-        FROM read_csv(
-            '{{path_remove}}',
-            delim = ',',
-            header = true,
-            columns = {'insee_code': 'VARCHAR'}
-        )
+        FROM {{exceptions_table_name}}
+        WHERE entity = '{{entity}}' AND action = 'remove'
     ) as t_remove USING(insee_code)
     WHERE t_remove.is_remove is NULL OR  (t_remove.is_remove is NOT NULL AND t_add.is_present_add is NOT NULL)
-) TO '{{output_path}}' (FORMAT CSV, HEADER TRUE) ;
+){{#output_path}} TO '{{output_path}}' ({{copy_options}}){{/output_path}} ;
@@ -5,7 +5,7 @@ CREATE OR REPLACE VIEW {{view_name}} AS (
         postal_code,
         delivery_label,
         associated_name
-    FROM read_csv(
+    FROM {{#parquet}}read_parquet('{{path}}'){{/parquet}}{{#csv}}read_csv(
         '{{path}}',
         delim = ',',
         header = true,
@@ -16,5 +16,5 @@ CREATE OR REPLACE VIEW {{view_name}} AS (
             'delivery_label': 'VARCHAR',
             'associated_name': 'VARCHAR'
         }
-    )
+    ){{/csv}}
 ) ;
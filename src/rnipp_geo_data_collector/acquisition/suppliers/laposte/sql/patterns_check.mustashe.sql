@@ -0,0 +1,19 @@
+SELECT row_num, failure.colname, failure.col
+FROM (
+    SELECT row_num, unnest(failures) as failure
+    FROM (
+        SELECT
+            row_number() OVER () as row_num,
+            list_filter(
+                [
+                    {{#patterns}}
+                    {'colname': '{{colname}}', 'col': coalesce({{colname}}, ''), 'valid': regexp_matches(coalesce({{colname}}, ''), ${{parameter}})}{{^last}},{{/last}}
+                    {{/patterns}}
+                ],
+                pattern_check -> not(pattern_check.valid)
+            ) as failures
+        FROM {{view_name}}
+    )
+    WHERE len(failures) > 0
+)
+ORDER BY row_num ;
@@ -0,0 +1,4 @@
+CREATE OR REPLACE VIEW {{view_name}} AS (
+    SELECT *
+    FROM {{table_name}}
+) ;
@@ -0,0 +1,19 @@
+from typing import Literal, Optional
+
+from ....utils.http_client import HttpSupplierConfig
+
+class WikidataSupplierConfig(HttpSupplierConfig):
+    endpoint_url: str = "https://query.wikidata.org/sparql"
+    backoff_factor: float = 0.5
+    max_retries: int = 5
+    # SPARQL queries are sent with POST but only read data
+    retry_post: bool = True
+    connect_timeout: float = 3
+    read_timeout: float = 15
+    max_concurrent_requests: int = 2
+    pool_maxsize: int = 2
+    enrich_communes: bool = False
+    batch_size: int = 200
+    cache_directory: Optional[str] = None
+    cache_max_age: Optional[float] = 30 * 24 * 3600
+    output_format: Literal["csv", "parquet"] = "parquet"
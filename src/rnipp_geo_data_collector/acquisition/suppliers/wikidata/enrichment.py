@@ -0,0 +1,209 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Optional, Union
+from duckdb import DuckDBPyConnection
+import csv
+import logging
+import pystache
+import requests
+
+from ....utils.duckdb import get_output_format_context
+from ....utils.response_cache import KeyedResultCache, ResponseCache
+from ...sql_templates import SQL_TEMPLATES
+from .config import WikidataSupplierConfig
+from .requests import RequestWikidata
+
+
+class OutputPathsEnrichmentWikidata:
+    def __init__(
+            self,
+            batches_directory: Union[str, Path],
+            raw_entities: Union[str, Path],
+            enriched_entities: Union[str, Path]
+        ):
+        if isinstance(batches_directory, str):
+            self.batches_directory = Path(batches_directory)
+        else:
+            self.batches_directory = batches_directory
+        if isinstance(raw_entities, str):
+            self.raw_entities = Path(raw_entities)
+        else:
+            self.raw_entities = raw_entities
+        if isinstance(enriched_entities, str):
+            self.enriched_entities = Path(enriched_entities)
+        else:
+            self.enriched_entities = enriched_entities
+
+
+class EnrichmentWikidataCommunes:
+    """
+    Match the current communes of the COG with their Wikidata item (property P374, INSEE municipality code).
+
+    The INSEE codes are read from the communes view and sent in batches of `batch_size` codes in a `VALUES` block.
+    Batches run in parallel, at most `max_concurrent_requests` at a time, and all wait when Wikidata asks to retry
+    later. The results are cached by INSEE code, so the codes already matched in a previous run are not queried again
+    until their entry expires.
+    """
+    fieldnames = ["insee_code", "wikidata_uri", "wikidata_label"]
+
+    def __init__(
+            self,
+            communes_view_name: str,
+            output_paths: OutputPathsEnrichmentWikidata,
+            acquisition_config: WikidataSupplierConfig = WikidataSupplierConfig()
+        ):
+        self.communes_view_name = communes_view_name
+        self.output_paths = output_paths
+        self.acquisition_config = acquisition_config
+        self.table_name = "wikidata_communes"
+        self.request = Path(__file__).parent / "requests" / "communes.rq"
+        self.sql_template_insee_codes = Path(__file__).parent / "sql" / "communes_insee_codes.mustache.sql"
+        self.sql_template_enrichment = Path(__file__).parent / "sql" / "communes_enrichment.mustache.sql"
+
+    def read_request(self) -> str:
+        try:
+            with open(self.request, 'r', encoding='utf-8') as file:
+                return file.read()
+        except Exception as e:
+            raise RuntimeError(f"Failed to read file {self.request}") from e
+
+    def get_result_cache(self, request_template: str) -> Optional[KeyedResultCache]:
+        """Return the cache of results by INSEE code, or None if no cache directory is configured"""
+        if self.acquisition_config.cache_directory is None:
+            return None
+        # A new endpoint or a new query gives a new cache file, results of the previous query being no longer valid
+        key = ResponseCache.make_key(self.acquisition_config.endpoint_url, request_template)
+        return KeyedResultCache(
+            path=Path(self.acquisition_config.cache_directory) / f"communes-{key[:16]}.json",
+            max_age=self.acquisition_config.cache_max_age
+        )
+
+    def render_sql(self, template_path: Path, context: dict[str, Union[str, bool]]) -> str:
+        return SQL_TEMPLATES.render(template_path, context)
+
+    def get_insee_codes(self, duckdb_conn: DuckDBPyConnection) -> list[str]:
+        request_str = self.render_sql(self.sql_template_insee_codes, {"communes_view_name": self.communes_view_name})
+        try:
+            return [row[0] for row in duckdb_conn.execute(request_str).fetchall()]
+        except Exception as e:
+            raise RuntimeError(f"Failed to execute SQL script {self.sql_template_insee_codes}") from e
+
+    def render_request(self, request_template: str, insee_codes: list[str]) -> str:
+        values = " ".join(f'"{insee_code}"' for insee_code in insee_codes)
+        try:
+            return pystache.Renderer(escape=lambda s: s).render(request_template, {"values": values})
+        except Exception as e:
+            raise RuntimeError(f"Failed to render request {self.request}") from e
+
+    def send_batch(self, index: int, request_template: str, insee_codes: list[str]) -> dict[str, list[dict[str, str]]]:
+        """Query one batch of INSEE codes and return the results by INSEE code, codes without match included"""
+        output_path = self.output_paths.batches_directory / f"communes_batch{index}.csv"
+        request = RequestWikidata(
+            output_path=output_path,
+            request=self.render_request(request_template, insee_codes),
+            endpoint_url=self.acquisition_config.endpoint_url,
+            backoff_factor=self.acquisition_config.backoff_factor,
+            max_retries=self.acquisition_config.max_retries,
+            timeout=(self.acquisition_config.read_timeout, self.acquisition_config.connect_timeout),
+            http_client=self.acquisition_config.get_http_client()
+        )
+        try:
+            with self.acquisition_config.get_request_slots():
+                request.http_client.throttle.wait()
+                request.send()
+
+            results: dict[str, list[dict[str, str]]] = {insee_code: [] for insee_code in insee_codes}
+            try:
+                with open(output_path, 'r', newline='', encoding='utf-8') as file:
+                    for row in csv.DictReader(file):
+                        if row.get("insee_code") in results:
+                            results[row["insee_code"]].append({fieldname: row.get(fieldname, "") for fieldname in self.fieldnames})
+            except Exception as e:
+                raise RuntimeError(f"Failed to parse Wikidata results {output_path}") from e
+            return results
+        finally:
+            output_path.unlink(missing_ok=True)
+
+    def send(self, duckdb_conn: DuckDBPyConnection) -> None:
+        """Query the INSEE codes missing from the cache, then write the raw results and the enriched communes"""
+        request_template = self.read_request()
+        insee_codes = self.get_insee_codes(duckdb_conn)
+        result_cache = self.get_result_cache(request_template)
+        if result_cache is not None:
+            result_cache.load()
+
+        results: dict[str, list[dict[str, str]]] = {}
+        missing_insee_codes: list[str] = []
+        for insee_code in insee_codes:
+            cached_rows = result_cache.get(insee_code) if result_cache is not None else None
+            if cached_rows is None:
+                missing_insee_codes.append(insee_code)
+            else:
+                results[insee_code] = cached_rows
+
+        batch_size = max(self.acquisition_config.batch_size, 1)
+        batches = [missing_insee_codes[start:start + batch_size] for start in range(0, len(missing_insee_codes), batch_size)]
+        logging.info(f"Wikidata enrichment of {len(insee_codes)} communes: {len(insee_codes) - len(missing_insee_codes)} cached, {len(missing_insee_codes)} to query in {len(batches)} batch(es)")
+
+        self.output_paths.batches_directory.mkdir(parents=True, exist_ok=True)
+        errors: list[Exception] = []
+        with ThreadPoolExecutor(max_workers=max(self.acquisition_config.max_concurrent_requests, 1), thread_name_prefix="wikidata") as executor:
+            futures = {
+                executor.submit(self.send_batch, index, request_template, batch): index
+                for index, batch in enumerate(batches)
+            }
+            for future in as_completed(futures):
+                try:
+                    batch_results = future.result()
+                except (requests.exceptions.RequestException, TimeoutError, ConnectionError, RuntimeError) as e:
+                    logging.error(f"Wikidata batch {futures[future] + 1}/{len(batches)} failed: {e}")
+                    errors.append(e)
+                    continue
+                results.update(batch_results)
+                if result_cache is not None:
+                    for insee_code, rows in batch_results.items():
+                        result_cache.put(insee_code, rows)
+
+        # Results of the successful batches are kept even if another batch failed, the next run only queries the rest
+        if result_cache is not None:
+            try:
+                result_cache.save()
+            except Exception as e:
+                logging.warning(f"Failed to save the Wikidata result cache {result_cache.path}: {e}")
+        if len(errors) > 0:
+            raise RuntimeError(f"Failed to query Wikidata for {len(errors)} batch(es) out of {len(batches)}") from errors[0]
+
+        self.write_raw_entities(results)
+        self.create_enriched_table(duckdb_conn)
+
+    def write_raw_entities(self, results: dict[str, list[dict[str, str]]]) -> None:
+        if not self.output_paths.raw_entities.parent.exists():
+            self.output_paths.raw_entities.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            with open(self.output_paths.raw_entities, mode="w", newline="", encoding="utf-8") as file:
+                writer = csv.DictWriter(file, fieldnames=self.fieldnames)
+                writer.writeheader()
+                for insee_code in sorted(results.keys()):
+                    writer.writerows(results[insee_code])
+        except Exception as e:
+            raise RuntimeError(f"Failed to write Wikidata results {self.output_paths.raw_entities}") from e
+
+    def create_enriched_table(self, duckdb_conn: DuckDBPyConnection) -> None:
+        if not self.output_paths.enriched_entities.parent.exists():
+            self.output_paths.enriched_entities.parent.mkdir(parents=True, exist_ok=True)
+        request_str = self.render_sql(
+            self.sql_template_enrichment,
+            {
+                "table_name": self.table_name,
+                "communes_view_name": self.communes_view_name,
+                "path": str(self.output_paths.raw_entities.resolve()),
+                "output_path": str(self.output_paths.enriched_entities.resolve()),
+                **get_output_format_context(self.acquisition_config.output_format)
+            }
+        )
+        try:
+            duckdb_conn.execute(request_str)
+        except Exception as e:
+            raise RuntimeError(f"Failed to execute SQL script {self.sql_template_enrichment}") from e
+        nb_matched = duckdb_conn.execute(f"SELECT COUNT(DISTINCT insee_code) FROM {self.table_name} WHERE wikidata_uri IS NOT NULL").fetchone()[0]
+        logging.info(f"Wikidata enrichment done: {nb_matched} commune(s) matched, written to {self.output_paths.enriched_entities}")
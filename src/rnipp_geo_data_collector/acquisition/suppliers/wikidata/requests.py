@@ -2,21 +2,14 @@ from pathlib import Path
 from typing import Union, Optional
 from urllib.parse import quote_plus
 import requests
-from urllib3.util.retry import Retry
-from requests.adapters import HTTPAdapter
-from pydantic import BaseModel
 
+from ....utils.http_client import HttpClient
 
-class WikidataSupplierConfig(BaseModel):
-    endpoint_url: str = "https://query.wikidata.org/sparql"
-    backoff_factor: float = 0.5
-    max_retries: int = 5
-    connect_timeout: float = 3
-    read_timeout: float = 15
 
 class RequestWikidata:
     """
     A class to send a SPARQL request to Wikidata and save the result to a file.
+    `request` is either the path of a file holding the query or the query itself.
     """
     headers = {
         "Content-type": "application/x-www-form-urlencoded",
@@ -30,7 +23,8 @@ class RequestWikidata:
             endpoint_url: str = "https://query.wikidata.org/sparql",
             backoff_factor: float = 0.5,
             max_retries: int = 5,
-            timeout: tuple[float, float] = (3, 15)
+            timeout: tuple[float, float] = (3, 15),
+            http_client: Optional[HttpClient] = None
         ):
         self.output_path = output_path
         self.request = request
@@ -38,49 +32,51 @@ class RequestWikidata:
         self.backoff_factor = backoff_factor
         self.max_retries = max_retries
         self.timeout = timeout
+        if http_client is None:
+            self.http_client = HttpClient(
+                name=endpoint_url,
+                max_retries=max_retries,
+                backoff_factor=backoff_factor,
+                retry_post=True
+            )
+        else:
+            self.http_client = http_client
 
     def get_endpoint_url(self) -> str:
         return self.endpoint_url
 
+    @staticmethod
+    def is_query_file(request: str) -> bool:
+        try:
+            return Path(request).is_file()
+        except OSError:
+            # A query too long to be a file name
+            return False
+
     def send(self):
         request_str : Optional[str] = None
 
-        if isinstance(self.request, Path) or isinstance(self.request, str):
+        if isinstance(self.request, Path) or self.is_query_file(self.request):
             try:
                 with open(self.request, 'r', encoding='utf-8') as file:
                     request_str = file.read()
             except Exception as e:
                 raise RuntimeError(f"Failed to read file {self.request}") from e
         else:
-            if Path(self.request).exists():
-                try:
-                    with open(self.request, 'r', encoding='utf-8') as file:
-                        request_str = file.read()
-                except Exception as e:
-                    raise RuntimeError(f"Failed to read file {self.request}") from e
-            else:
-                request_str = self.request
+            request_str = self.request
 
         try:
-            retry_strategy = Retry(
-                total=self.max_retries,
-                backoff_factor=self.backoff_factor,
-                status_forcelist=[408, 429, 500, 502, 503, 504],
-                redirect=0
-            )
-            adapter = HTTPAdapter(max_retries=retry_strategy)
-            session = requests.Session()
-            session.mount("https://", adapter)
-            session.mount("http://", adapter)
-            with session.post(
+            with self.http_client.session.post(
                 url=self.get_endpoint_url(),
                 data="format=text/csv&query="+quote_plus(request_str),
                 headers=RequestWikidata.headers,
-                timeout=self.timeout
+                timeout=self.timeout,
+                stream=True
             ) as response:
                 if response.status_code != 200:
-                    raise requests.exceptions.HTTPError(f"HTTP error while querying Wikidata: {response.status_code}") from e
+                    raise requests.exceptions.HTTPError(f"HTTP error while querying Wikidata: {response.status_code}", response=response)
                 
+                output_path = self.output_path
                 if isinstance(output_path, str):
                     output_path = Path(output_path)
                 if not output_path.parent.exists():
@@ -88,10 +84,7 @@ class RequestWikidata:
                 if output_path.exists():
                     output_path.unlink()
 
-                with open(output_path, "wb") as foutput:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            foutput.write(chunk)
+                self.http_client.stream_to_file(response=response, output_path=output_path, description="Wikidata data")
 
         except requests.exceptions.Timeout as e:
             raise TimeoutError(f"Timeout occurred while querying Wikidata") from e
@@ -0,0 +1,22 @@
+CREATE OR REPLACE TABLE {{table_name}} AS (
+    SELECT
+        c.uri,
+        c.insee_code,
+        c.label,
+        w.wikidata_uri,
+        w.wikidata_label
+    FROM {{communes_view_name}} AS c
+    LEFT JOIN read_csv(
+        '{{path}}',
+        delim = ',',
+        header = true,
+        columns = {
+            'insee_code': 'VARCHAR',
+            'wikidata_uri': 'VARCHAR',
+            'wikidata_label': 'VARCHAR'
+        }
+    ) AS w ON c.insee_code = w.insee_code
+    WHERE c.end_date IS NULL
+    ORDER BY c.insee_code, w.wikidata_uri
+) ;
+COPY {{table_name}} TO '{{output_path}}' ({{copy_options}}) ;
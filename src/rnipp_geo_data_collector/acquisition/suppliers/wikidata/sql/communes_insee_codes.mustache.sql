@@ -0,0 +1,4 @@
+SELECT DISTINCT insee_code
+FROM {{communes_view_name}}
+WHERE end_date IS NULL AND insee_code IS NOT NULL
+ORDER BY insee_code ;
@@ -0,0 +1,99 @@
+from typing import Optional
+import logging
+import time
+import typer
+
+from .harness import get_default_scenarios, run_benchmark
+from .intervals import compare_interval_engines, time_interval_engines
+from .recordings import generate_synthetic_recordings, record_responses
+from .server import StandInServer, StandInServerConfig
+
+app = typer.Typer(help="Stand-in supplier server and acquisition benchmarks")
+
+@app.command("generate")
+def cmd_generate(
+    recordings_directory: str = typer.Option(..., help="Directory to write the synthetic recordings to"),
+    nb_communes_per_departement: int = typer.Option(100, help="Number of communes generated for each departement"),
+    seed: int = typer.Option(0, help="Seed of the generator"),
+    loglevel: str = typer.Option("INFO", help="Logging level")
+    ):
+    logging.basicConfig(level=loglevel.upper())
+    generate_synthetic_recordings(recordings_directory, nb_communes_per_departement=nb_communes_per_departement, seed=seed)
+
+@app.command("record")
+def cmd_record(
+    working_directory: str = typer.Option(..., help="Working directory of a previous run against the real suppliers"),
+    recordings_directory: str = typer.Option(..., help="Directory to copy the raw responses to"),
+    loglevel: str = typer.Option("INFO", help="Logging level")
+    ):
+    logging.basicConfig(level=loglevel.upper())
+    record_responses(working_directory, recordings_directory)
+
+@app.command("serve")
+def cmd_serve(
+    recordings_directory: str = typer.Option(..., help="Directory of the recorded responses"),
+    port: int = typer.Option(8765, help="Port to listen on"),
+    latency: float = typer.Option(0.0, help="Delay in seconds before each response"),
+    bandwidth: Optional[int] = typer.Option(None, help="Maximum bytes per second of each response"),
+    error_rate: float = typer.Option(0.0, help="Probability that a request starts a burst of errors"),
+    error_burst_length: int = typer.Option(1, help="Number of consecutive requests failing in a burst"),
+    error_status: int = typer.Option(503, help="HTTP status of the injected errors (e.g. 429 or 503)"),
+    retry_after: Optional[int] = typer.Option(None, help="Retry-After header of the injected errors, in seconds"),
+    drop_rate: float = typer.Option(0.0, help="Probability of closing the connection in the middle of a response"),
+    loglevel: str = typer.Option("INFO", help="Logging level")
+    ):
+    logging.basicConfig(level=loglevel.upper())
+    config = StandInServerConfig(
+        latency=latency,
+        bandwidth=bandwidth,
+        error_rate=error_rate,
+        error_burst_length=error_burst_length,
+        error_status=error_status,
+        retry_after=retry_after,
+        drop_rate=drop_rate
+    )
+    with StandInServer(recordings_directory=recordings_directory, config=config, port=port) as server:
+        logging.info(f"INSEE endpoint: {server.get_endpoint_url(StandInServer.insee_path)}")
+        logging.info(f"La Poste endpoint: {server.get_endpoint_url(StandInServer.laposte_path)}")
+        logging.info(f"Wikidata endpoint: {server.get_endpoint_url(StandInServer.wikidata_path)}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+@app.command("run")
+def cmd_run(
+    recordings_directory: str = typer.Option(..., help="Directory of the recorded responses"),
+    working_directory: str = typer.Option(..., help="Directory for the outputs of the benchmark runs"),
+    latency: float = typer.Option(0.2, help="Delay in seconds before each response"),
+    repeat: int = typer.Option(1, help="Number of runs of each scenario, the best one being kept"),
+    threads: int = typer.Option(1, help="Number of threads to use"),
+    loglevel: str = typer.Option("WARNING", help="Logging level")
+    ):
+    logging.basicConfig(level=loglevel.upper())
+    run_benchmark(
+        recordings_directory=recordings_directory,
+        working_directory=working_directory,
+        scenarios=get_default_scenarios(latency=latency),
+        repeat=repeat,
+        threads=threads
+    )
+
+@app.command("intervals")
+def cmd_intervals(
+    nb_datasets: int = typer.Option(200, help="Number of random datasets on which the results of both engines are compared"),
+    nb_insee_codes: int = typer.Option(40000, help="Number of INSEE codes of the dataset on which both engines are timed"),
+    nb_children: int = typer.Option(40000, help="Number of children of the dataset on which both engines are timed"),
+    disorder: float = typer.Option(0.0, help="Probability of an error in the periods of the timed dataset"),
+    repeat: int = typer.Option(3, help="Number of runs of each check, the best one being kept"),
+    threads: int = typer.Option(1, help="Number of threads to use"),
+    seed: int = typer.Option(0, help="Seed of the generator"),
+    loglevel: str = typer.Option("INFO", help="Logging level")
+    ):
+    logging.basicConfig(level=loglevel.upper())
+    compare_interval_engines(nb_datasets=nb_datasets, seed=seed)
+    time_interval_engines(nb_insee_codes=nb_insee_codes, nb_children=nb_children, disorder=disorder, repeat=repeat, threads=threads, seed=seed)
+
+if __name__ == "__main__":
+    app()
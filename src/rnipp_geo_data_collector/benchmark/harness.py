@@ -0,0 +1,158 @@
+from pathlib import Path
+from typing import Any, Optional, Union
+import logging
+import shutil
+import time
+from pydantic import BaseModel
+
+from ..acquisition.config import AcquisitionConfig
+from ..main import collect_geo_data
+from .server import StandInServer, StandInServerConfig
+
+
+class BenchmarkScenario(BaseModel):
+    """Faults injected by the stand-in server and client settings of one benchmark run"""
+    name: str
+    server: StandInServerConfig = StandInServerConfig()
+    insee_max_concurrent_requests: int = 2
+    communes_shards: int = 1
+    max_retries: int = 5
+    backoff_factor: float = 0.5
+    wikidata_enrichment: bool = False
+
+
+def get_default_scenarios(latency: float = 0.2) -> list[BenchmarkScenario]:
+    """Baseline, concurrency scaling, retry and backoff cost, and degraded network scenarios"""
+    scenarios = [BenchmarkScenario(name="baseline", server=StandInServerConfig(latency=latency, seed=0))]
+    for nb_concurrent_requests in [1, 4, 8]:
+        scenarios.append(BenchmarkScenario(
+            name=f"concurrency-{nb_concurrent_requests}",
+            server=StandInServerConfig(latency=latency, seed=0),
+            insee_max_concurrent_requests=nb_concurrent_requests
+        ))
+    scenarios.append(BenchmarkScenario(
+        name="sharded-communes",
+        server=StandInServerConfig(latency=latency, seed=0),
+        insee_max_concurrent_requests=4,
+        communes_shards=4
+    ))
+    scenarios.append(BenchmarkScenario(
+        name="503-bursts",
+        server=StandInServerConfig(latency=latency, error_rate=0.3, error_burst_length=2, error_status=503, seed=1)
+    ))
+    scenarios.append(BenchmarkScenario(
+        name="429-retry-after",
+        server=StandInServerConfig(latency=latency, error_rate=0.3, error_status=429, retry_after=1, seed=1)
+    ))
+    scenarios.append(BenchmarkScenario(
+        name="dropped-connections",
+        server=StandInServerConfig(latency=latency, drop_rate=0.2, seed=1),
+        insee_max_concurrent_requests=4,
+        communes_shards=4
+    ))
+    scenarios.append(BenchmarkScenario(
+        name="bandwidth-1MiB",
+        server=StandInServerConfig(latency=latency, bandwidth=1024 * 1024, seed=0)
+    ))
+    scenarios.append(BenchmarkScenario(
+        name="bandwidth-1MiB-uncompressed",
+        server=StandInServerConfig(latency=latency, bandwidth=1024 * 1024, compression=False, seed=0)
+    ))
+    scenarios.append(BenchmarkScenario(
+        name="wikidata-enrichment",
+        server=StandInServerConfig(latency=latency, error_rate=0.1, error_status=429, retry_after=1, seed=1),
+        wikidata_enrichment=True
+    ))
+    return scenarios
+
+
+def get_acquisition_config(server: StandInServer, scenario: BenchmarkScenario) -> AcquisitionConfig:
+    """Acquisition configuration pointing all the suppliers to the stand-in server"""
+    acquisition_config = AcquisitionConfig()
+    for supplier_config in [acquisition_config.insee, acquisition_config.laposte, acquisition_config.wikidata]:
+        supplier_config.max_retries = scenario.max_retries
+        supplier_config.backoff_factor = scenario.backoff_factor
+    acquisition_config.insee.endpoint_url = server.get_endpoint_url(StandInServer.insee_path)
+    acquisition_config.insee.max_concurrent_requests = scenario.insee_max_concurrent_requests
+    acquisition_config.insee.pool_maxsize = scenario.insee_max_concurrent_requests
+    acquisition_config.insee.communes_shards = scenario.communes_shards
+    acquisition_config.laposte.endpoint_url = server.get_endpoint_url(StandInServer.laposte_path)
+    acquisition_config.wikidata.endpoint_url = server.get_endpoint_url(StandInServer.wikidata_path)
+    acquisition_config.wikidata.enrich_communes = scenario.wikidata_enrichment
+    return acquisition_config
+
+
+def run_scenario(
+        recordings_directory: Path,
+        scenario: BenchmarkScenario,
+        working_directory: Path,
+        threads: int = 1
+    ) -> dict[str, Any]:
+    """Run the whole acquisition against a stand-in server configured for the scenario"""
+    scenario_directory = working_directory / scenario.name
+    scenario_directory.mkdir(parents=True, exist_ok=True)
+    # Emptied before each run, the La Poste base being downloaded in full rather than revalidated
+    laposte_cache_directory = scenario_directory / "laposte-cache"
+    shutil.rmtree(laposte_cache_directory, ignore_errors=True)
+    with StandInServer(recordings_directory=recordings_directory, config=scenario.server) as server:
+        acquisition_config = get_acquisition_config(server=server, scenario=scenario)
+        acquisition_config.laposte.cache_directory = str(laposte_cache_directory)
+        acquisition_config_path = scenario_directory / "config-acquisition.json"
+        with open(acquisition_config_path, "w", encoding="utf-8") as file:
+            file.write(acquisition_config.model_dump_json(indent=2))
+
+        error: Optional[str] = None
+        start = time.perf_counter()
+        try:
+            collect_geo_data(
+                acquisition_config_file=acquisition_config_path,
+                working_directory=scenario_directory / "output",
+                overwrite_working_directory=True,
+                threads=threads,
+                loglevel=logging.getLevelName(logging.getLogger().getEffectiveLevel())
+            )
+        except Exception as e:
+            error = str(e)
+        elapsed = time.perf_counter() - start
+        statistics = dict(server.statistics)
+
+    return {"scenario": scenario.name, "elapsed": elapsed, "error": error, **statistics}
+
+
+def run_benchmark(
+        recordings_directory: Union[str, Path],
+        working_directory: Union[str, Path],
+        scenarios: Optional[list[BenchmarkScenario]] = None,
+        repeat: int = 1,
+        threads: int = 1
+    ) -> list[dict[str, Any]]:
+    """
+    Measure the end-to-end acquisition time of each scenario, keeping the best of `repeat` runs,
+    and log it next to the overhead against the first scenario (the baseline).
+    """
+    recordings_directory = Path(recordings_directory)
+    working_directory = Path(working_directory)
+    if scenarios is None:
+        scenarios = get_default_scenarios()
+    if len(scenarios) == 0:
+        raise RuntimeError("No benchmark scenario provided")
+
+    results: list[dict[str, Any]] = []
+    for scenario in scenarios:
+        runs = [run_scenario(recordings_directory, scenario, working_directory, threads=threads) for _ in range(max(repeat, 1))]
+        successful_runs = [run for run in runs if run["error"] is None]
+        best_run = min(successful_runs, key=lambda run: run["elapsed"]) if len(successful_runs) > 0 else runs[0]
+        best_run["failures"] = len(runs) - len(successful_runs)
+        results.append(best_run)
+        logging.info(f"Benchmark scenario {scenario.name}: {best_run['elapsed']:.2f}s")
+
+    baseline = results[0]["elapsed"]
+    lines = [f"{'scenario':<30} {'time (s)':>9} {'overhead':>9} {'requests':>9} {'errors':>7} {'dropped':>8} {'MiB sent':>9} {'failures':>9}"]
+    for result in results:
+        overhead = (result["elapsed"] / baseline - 1) * 100 if baseline > 0 else 0.0
+        lines.append(
+            f"{result['scenario']:<30} {result['elapsed']:>9.2f} {overhead:>8.0f}% {result['requests']:>9} {result['errors']:>7} "
+            f"{result['dropped']:>8} {result['bytes_sent'] / (1024 * 1024):>9.2f} {result['failures']:>9}"
+        )
+    print("\n".join(lines))
+    return results
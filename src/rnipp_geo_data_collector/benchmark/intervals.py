@@ -0,0 +1,176 @@
+from datetime import date, timedelta
+from typing import Any, Callable, Optional
+import logging
+import random
+import time
+import duckdb
+import pandas
+
+from ..acquisition.suppliers.insee.checks.insee_code_overlap import find_insee_code_overlaps
+from ..acquisition.suppliers.insee.checks.intervals import IntervalEngine
+from ..acquisition.suppliers.insee.checks.parent_links import ParentLinksInseeCog
+from ..acquisition.suppliers.insee.checks.parent_period_include import find_parent_periods_not_containing_child
+from ..acquisition.suppliers.insee.checks.parent_period_no_gaps import find_parent_period_gaps
+from ..acquisition.suppliers.insee.checks.parent_period_overlap import find_parent_period_overlaps
+
+
+class PeriodsView:
+    """Stand-in for a request, naming a table of generated periods of validity"""
+    def __init__(self, view_name: str, description: str):
+        self.view_name = view_name
+        self.description = description
+
+
+PARENTS = PeriodsView(view_name="interval_parents", description="generated parents")
+CHILDREN = PeriodsView(view_name="interval_children", description="generated children")
+
+
+def generate_chain(generator: random.Random, nb_periods: int, disorder: float) -> list[tuple[int, Optional[int]]]:
+    """Consecutive periods of validity (in days), the last one possibly open, some of them shifted with a probability `disorder`"""
+    periods: list[tuple[int, Optional[int]]] = []
+    start = generator.randrange(0, 3650)
+    for index in range(nb_periods):
+        if generator.random() < disorder:
+            start += generator.randrange(-30, 30)
+        length = generator.choice([0, 1, 30, 365, 3650]) if generator.random() < disorder else generator.randrange(30, 3650)
+        end: Optional[int] = start + length
+        if index == nb_periods - 1 and generator.random() < 0.5:
+            end = None
+        periods.append((start, end))
+        start = start + length
+    return periods
+
+
+def create_periods_tables(
+        duckdb_conn: duckdb.DuckDBPyConnection,
+        nb_insee_codes: int,
+        nb_children: int,
+        disorder: float,
+        seed: int = 0
+    ) -> None:
+    """
+    Create the parents and children tables: chains of periods sharing an INSEE code, each child linked to consecutive
+    parents of one chain over their period, with overlaps, gaps, empty periods and missing parents when `disorder` > 0
+    """
+    generator = random.Random(seed)
+    origin = date(1943, 1, 1)
+
+    def to_date(day: Optional[int]) -> Optional[date]:
+        return None if day is None else origin + timedelta(days=day)
+
+    parents_rows: list[dict[str, Any]] = []
+    chains: list[list[tuple[str, int, Optional[int]]]] = []
+    for code in range(nb_insee_codes):
+        chain: list[tuple[str, int, Optional[int]]] = []
+        for start, end in generate_chain(generator, generator.randrange(1, 5), disorder):
+            uri = f"parent-{len(parents_rows)}"
+            parents_rows.append({"uri": uri, "insee_code": f"{code:05d}", "start_date": to_date(start), "end_date": to_date(end)})
+            chain.append((uri, start, end))
+        chains.append(chain)
+
+    children_rows: list[dict[str, Any]] = []
+    for index in range(nb_children):
+        chain = chains[generator.randrange(len(chains))]
+        first = generator.randrange(len(chain))
+        links = chain[first:first + generator.randrange(1, 4)]
+        parent_uris = [uri for uri, _, _ in links]
+        start: Optional[int] = links[0][1]
+        end = links[-1][2]
+        if generator.random() < disorder:
+            parent_uris = [generator.choice(parents_rows)["uri"] if generator.random() < 0.5 else f"missing-{index}" for _ in parent_uris] + parent_uris
+            generator.shuffle(parent_uris)
+        if generator.random() < disorder:
+            start = None if generator.random() < 0.1 else links[0][1] + generator.randrange(-30, 30)
+            end = None if generator.random() < 0.5 else (start or links[0][1]) + generator.randrange(0, 7300)
+        children_rows.append({
+            "uri": f"child-{index}",
+            "insee_code": f"{generator.randrange(nb_insee_codes):05d}" if generator.random() < disorder else f"C{index:04d}",
+            "parent_uri": "|".join(parent_uris),
+            "start_date": to_date(start),
+            "end_date": to_date(end)
+        })
+
+    for view, rows in [(PARENTS, parents_rows), (CHILDREN, children_rows)]:
+        frame = pandas.DataFrame(rows, columns=list(rows[0].keys()) if len(rows) > 0 else ["uri", "insee_code", "parent_uri", "start_date", "end_date"])
+        duckdb_conn.register("periods_frame", frame)
+        columns = ", ".join(f"{colname}::{'DATE' if colname.endswith('_date') else 'VARCHAR'} as {colname}" for colname in frame.columns)
+        duckdb_conn.execute(f"CREATE OR REPLACE TABLE {view.view_name} AS SELECT {columns} FROM periods_frame")
+        duckdb_conn.unregister("periods_frame")
+    ParentLinksInseeCog(parents_view_name=[PARENTS.view_name]).create(request=CHILDREN, duckdb_conn=duckdb_conn)
+
+
+def get_interval_checks(links_table_name: str) -> dict[str, Callable[[duckdb.DuckDBPyConnection, IntervalEngine], list[tuple[Any, ...]]]]:
+    """All the results of each interval check on the generated tables, for a given engine"""
+    insee_codes_view_name = f"(SELECT uri, insee_code, start_date, end_date FROM {PARENTS.view_name} UNION ALL SELECT uri, insee_code, start_date, end_date FROM {CHILDREN.view_name})"
+    return {
+        "insee_code_overlap": lambda duckdb_conn, engine: find_insee_code_overlaps(insee_codes_view_name, duckdb_conn, engine=engine),
+        "parent_period_overlap": lambda duckdb_conn, engine: find_parent_period_overlaps(links_table_name, duckdb_conn, engine=engine),
+        "parent_period_no_gaps": lambda duckdb_conn, engine: find_parent_period_gaps(links_table_name, duckdb_conn, engine=engine),
+        "parent_period_include": lambda duckdb_conn, engine: find_parent_periods_not_containing_child(links_table_name, duckdb_conn, engine=engine)
+    }
+
+
+def compare_interval_engines(nb_datasets: int = 200, nb_children: int = 50, seed: int = 0) -> dict[str, int]:
+    """
+    Run the interval checks with both engines on random datasets and fail on the first difference. The pairs of the
+    INSEE code overlap are compared in order; the SQL parent checks return their rows in any order, they are compared sorted.
+    Return the number of datasets on which each check found errors.
+    """
+    links_table_name = ParentLinksInseeCog(parents_view_name=[PARENTS.view_name]).get_table_name(CHILDREN)
+    checks = get_interval_checks(links_table_name)
+    nb_failing_datasets = {name: 0 for name in checks.keys()}
+    duckdb_conn = duckdb.connect()
+    try:
+        for index in range(nb_datasets):
+            generator = random.Random(seed + index)
+            create_periods_tables(
+                duckdb_conn,
+                nb_insee_codes=generator.randrange(1, 20),
+                nb_children=generator.randrange(0, nb_children + 1),
+                disorder=generator.choice([0.0, 0.1, 0.5, 1.0]),
+                seed=seed + index
+            )
+            for name, check in checks.items():
+                sql_rows = check(duckdb_conn, "sql")
+                numpy_rows = check(duckdb_conn, "numpy")
+                if name != "insee_code_overlap":
+                    sql_rows = sorted(sql_rows)
+                    numpy_rows = sorted(numpy_rows)
+                if sql_rows != numpy_rows:
+                    raise RuntimeError(f"The engines differ on {name} for the dataset of seed {seed + index}: {len(sql_rows)} row(s) with SQL, {len(numpy_rows)} with NumPy, first difference {next((pair for pair in zip(sql_rows, numpy_rows) if pair[0] != pair[1]), None)}")
+                if len(sql_rows) > 0:
+                    nb_failing_datasets[name] += 1
+    finally:
+        duckdb_conn.close()
+    logging.info(f"Both engines gave the same results on {nb_datasets} datasets (datasets with errors per check: {nb_failing_datasets})")
+    return nb_failing_datasets
+
+
+def time_interval_engines(nb_insee_codes: int = 40000, nb_children: int = 40000, disorder: float = 0.0, repeat: int = 3, threads: int = 1, seed: int = 0) -> list[dict[str, Any]]:
+    """Time each interval check with both engines on one generated dataset, keeping the best of `repeat` runs"""
+    links_table_name = ParentLinksInseeCog(parents_view_name=[PARENTS.view_name]).get_table_name(CHILDREN)
+    duckdb_conn = duckdb.connect()
+    results: list[dict[str, Any]] = []
+    try:
+        duckdb_conn.execute(f"SET threads = {max(threads, 1)}")
+        create_periods_tables(duckdb_conn, nb_insee_codes=nb_insee_codes, nb_children=nb_children, disorder=disorder, seed=seed)
+        for name, check in get_interval_checks(links_table_name).items():
+            result: dict[str, Any] = {"check": name}
+            for engine in ["sql", "numpy"]:
+                elapsed: list[float] = []
+                for _ in range(max(repeat, 1)):
+                    start = time.perf_counter()
+                    rows = check(duckdb_conn, engine)
+                    elapsed.append(time.perf_counter() - start)
+                result[engine] = min(elapsed)
+                result["errors"] = len(rows)
+            results.append(result)
+    finally:
+        duckdb_conn.close()
+
+    lines = [f"{'check':<25} {'SQL (s)':>9} {'NumPy (s)':>10} {'speedup':>8} {'errors':>7}"]
+    for result in results:
+        speedup = result["sql"] / result["numpy"] if result["numpy"] > 0 else 0.0
+        lines.append(f"{result['check']:<25} {result['sql']:>9.3f} {result['numpy']:>10.3f} {speedup:>7.1f}x {result['errors']:>7}")
+    print("\n".join(lines))
+    return results
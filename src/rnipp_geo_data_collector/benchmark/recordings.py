@@ -0,0 +1,112 @@
+from pathlib import Path
+from typing import Union
+import csv
+import logging
+import random
+import shutil
+import uuid
+
+from .server import INSEE_RECORDINGS, LAPOSTE_RECORDING, WIKIDATA_RECORDING
+
+
+def record_responses(working_directory: Union[str, Path], recordings_directory: Union[str, Path]) -> None:
+    """Keep the raw responses downloaded by a previous run as the recordings replayed by the stand-in server"""
+    working_directory = Path(working_directory)
+    recordings_directory = Path(recordings_directory)
+    recordings_directory.mkdir(parents=True, exist_ok=True)
+    raw_paths = [working_directory / "download" / "insee" / "raw" / filename for filename in INSEE_RECORDINGS.values()]
+    raw_paths.append(working_directory / "download" / "laposte" / "raw" / LAPOSTE_RECORDING)
+    for raw_path in raw_paths:
+        if not raw_path.exists():
+            raise FileNotFoundError(f"Raw response not found: {raw_path}")
+        shutil.copyfile(raw_path, recordings_directory / raw_path.name)
+        logging.info(f"Recorded {raw_path} to {recordings_directory / raw_path.name}")
+
+
+def generate_synthetic_recordings(
+        recordings_directory: Union[str, Path],
+        nb_communes_per_departement: int = 100,
+        seed: int = 0
+    ) -> None:
+    """
+    Generate recordings shaped like the supplier responses, which pass the checks of the pipeline,
+    to run the stand-in server without any recorded response.
+    """
+    if nb_communes_per_departement < 1 or nb_communes_per_departement > 999:
+        raise ValueError("The number of communes per departement must be between 1 and 999")
+    recordings_directory = Path(recordings_directory)
+    recordings_directory.mkdir(parents=True, exist_ok=True)
+    generator = random.Random(seed)
+
+    def new_uri(kind: str) -> str:
+        return f"http://id.insee.fr/geo/{kind}/{uuid.UUID(int=generator.getrandbits(128), version=4)}"
+
+    start_date = "1943-01-01"
+    departement_codes = [f"{number:02d}" for number in range(1, 96) if number != 20] + ["2A", "2B"]
+    departement_header = ["uri", "insee_code", "label", "article_code", "start_event_uri", "end_event_uri", "start_date", "end_date", "start_date_count", "end_date_count"]
+    commune_header = ["uri", "insee_code", "label", "article_code", "parent_uri", "start_event_uri", "end_event_uri", "start_date", "end_date", "parent_uri_count", "start_date_count", "end_date_count"]
+
+    departements: dict[str, str] = {}
+    with open(recordings_directory / INSEE_RECORDINGS["Departement"], "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(departement_header)
+        for code in departement_codes:
+            departements[code] = new_uri("departement")
+            writer.writerow([departements[code], code, f"Departement {code}", "0", new_uri("evenementGeographique"), "", start_date, "", 1, 0])
+
+    communes: dict[str, str] = {}
+    for departement_code in departement_codes:
+        numbers = set(range(1, nb_communes_per_departement + 1))
+        if departement_code == "75":
+            numbers.add(56)
+        for number in sorted(numbers):
+            communes[f"{departement_code}{number:03d}"] = departement_code
+    commune_uris: dict[str, str] = {}
+    with open(recordings_directory / INSEE_RECORDINGS["Commune"], "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(commune_header)
+        for code, departement_code in communes.items():
+            commune_uris[code] = new_uri("commune")
+            writer.writerow([commune_uris[code], code, f"Commune {code}", "0", departements[departement_code], new_uri("evenementGeographique"), "", start_date, "", 1, 1, 0])
+
+    with open(recordings_directory / INSEE_RECORDINGS["ArrondissementMunicipal"], "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(commune_header)
+        for number in range(1, 21):
+            writer.writerow([new_uri("arrondissementMunicipal"), f"751{number:02d}", f"Paris {number}e", "0", commune_uris["75056"], new_uri("evenementGeographique"), "", start_date, "", 1, 1, 0])
+
+    with open(recordings_directory / INSEE_RECORDINGS["CollectiviteDOutreMer"], "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(departement_header)
+        for code in ["975", "977", "978", "986", "987", "988"]:
+            writer.writerow([new_uri("collectiviteDOutreMer"), code, f"Collectivite {code}", "0", new_uri("evenementGeographique"), "", start_date, "", 1, 0])
+
+    with open(recordings_directory / INSEE_RECORDINGS["District"], "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(departement_header)
+        for code in ["98411", "98412", "98413", "98414", "98415"]:
+            writer.writerow([new_uri("district"), code, f"District {code}", "0", new_uri("evenementGeographique"), "", start_date, "", 1, 0])
+
+    with open(recordings_directory / INSEE_RECORDINGS["Pays"], "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["uri", "insee_code", "label", "article_code", "long_label", "iso3166alpha2_code", "iso3166alpha3_code", "iso3166num_code", "start_event_uri", "end_event_uri", "start_date", "end_date", "start_date_count", "end_date_count"])
+        for index in range(1, 200):
+            letters = chr(ord("A") + index // 26) + chr(ord("A") + index % 26)
+            writer.writerow([new_uri("pays"), f"99{100 + index:03d}", f"Pays {index}", "0", f"Pays numero {index}", letters, letters + "X", f"{index:03d}", new_uri("evenementGeographique"), "", start_date, "", 1, 0])
+
+    with open(recordings_directory / LAPOSTE_RECORDING, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file, delimiter=";")
+        writer.writerow(["#Code_commune_INSEE", "Nom_de_la_commune", "Code_postal", "Libellé_d_acheminement", "Ligne_5"])
+        for code in communes.keys():
+            postal_code = code.replace("2A", "20").replace("2B", "20")
+            writer.writerow([code, f"COMMUNE {code}", postal_code, f"COMMUNE {code}", ""])
+
+    with open(recordings_directory / WIKIDATA_RECORDING, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["insee_code", "wikidata_uri", "wikidata_label"])
+        for index, code in enumerate(communes.keys()):
+            # Some communes have no Wikidata item, as in the real data
+            if generator.random() < 0.95:
+                writer.writerow([code, f"http://www.wikidata.org/entity/Q{1000000 + index}", f"Commune {code}"])
+
+    logging.info(f"Generated synthetic recordings of {len(communes)} communes in {recordings_directory}")
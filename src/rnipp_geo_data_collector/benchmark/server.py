@@ -0,0 +1,304 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Optional, Union
+from urllib.parse import parse_qs
+import csv
+import gzip
+import hashlib
+import io
+import json
+import logging
+import random
+import re
+import time
+from pydantic import BaseModel
+
+
+# Recorded response of each INSEE request, by class of the geographic entities queried (`?uri a igeo:<class>`)
+INSEE_RECORDINGS = {
+    "Commune": "communes.csv",
+    "ArrondissementMunicipal": "arrondissement_municipal.csv",
+    "Departement": "departements.csv",
+    "CollectiviteDOutreMer": "collectivites_outremer.csv",
+    "District": "districts.csv",
+    "Pays": "pays.csv"
+}
+LAPOSTE_RECORDING = "laposte_hexasmal.csv"
+WIKIDATA_RECORDING = "wikidata.csv"
+
+
+class StandInServerConfig(BaseModel):
+    """Faults and limits injected by the stand-in server"""
+    latency: float = 0.0
+    bandwidth: Optional[int] = None
+    error_rate: float = 0.0
+    error_burst_length: int = 1
+    error_status: int = 503
+    # Number of error responses sent at most, none once reached (no limit when not set)
+    max_errors: Optional[int] = None
+    retry_after: Optional[int] = None
+    drop_rate: float = 0.0
+    # Number of responses dropped at most, none once reached (no limit when not set)
+    max_dropped: Optional[int] = None
+    # Range requests answered with the whole content, as by a server ignoring them
+    ignore_ranges: bool = False
+    # Range requests answered without the last byte of the content while announcing its whole length, as by a faulty server
+    truncated_ranges: bool = False
+    compression: bool = True
+    seed: Optional[int] = None
+
+
+class StandInServer:
+    """
+    Local stand-in for the INSEE SPARQL endpoint, the La Poste hexasmal download and the Wikidata SPARQL endpoint.
+
+    Recorded CSV responses are replayed from `recordings_directory`: the INSEE query is matched on the class of the
+    geographic entities it selects (and filtered on the shard prefixes of a sharded query), La Poste always gets its
+    single recording and a Wikidata query gets the recorded rows of the INSEE codes of its `VALUES` block. The server
+    honours Accept-Encoding (gzip), If-None-Match and Range requests, and can inject latency, a bandwidth cap, bursts
+    of error statuses, dropped connections and faulty answers to Range requests.
+    """
+    insee_path = "/insee/sparql"
+    laposte_path = "/laposte/hexasmal"
+    wikidata_path = "/wikidata/sparql"
+
+    def __init__(
+            self,
+            recordings_directory: Union[str, Path],
+            config: StandInServerConfig = StandInServerConfig(),
+            host: str = "127.0.0.1",
+            port: int = 0
+        ):
+        if isinstance(recordings_directory, str):
+            self.recordings_directory = Path(recordings_directory)
+        else:
+            self.recordings_directory = recordings_directory
+        self.config = config
+        self.host = host
+        self.port = port
+        self.random = random.Random(config.seed)
+        self.lock = Lock()
+        self.remaining_errors = 0
+        self.statistics: dict[str, int] = {"requests": 0, "errors": 0, "dropped": 0, "bytes_sent": 0}
+        self.http_server: Optional[ThreadingHTTPServer] = None
+        self.thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        self.http_server = ThreadingHTTPServer((self.host, self.port), StandInRequestHandler)
+        self.http_server.daemon_threads = True
+        setattr(self.http_server, "stand_in", self)
+        self.port = self.http_server.server_address[1]
+        self.thread = Thread(target=self.http_server.serve_forever, name="stand-in-server", daemon=True)
+        self.thread.start()
+        logging.info(f"Stand-in server listening on http://{self.host}:{self.port}")
+
+    def stop(self) -> None:
+        if self.http_server is not None:
+            self.http_server.shutdown()
+            self.http_server.server_close()
+            self.http_server = None
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def __enter__(self) -> "StandInServer":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def get_endpoint_url(self, path: str) -> str:
+        return f"http://{self.host}:{self.port}{path}"
+
+    def count(self, key: str, value: int = 1) -> None:
+        with self.lock:
+            self.statistics[key] += value
+
+    def draw_error(self) -> bool:
+        """Decide whether the current request fails, a failure starting a burst of `error_burst_length` failures"""
+        with self.lock:
+            if self.config.max_errors is not None and self.statistics["errors"] >= self.config.max_errors:
+                return False
+            if self.remaining_errors == 0 and self.random.random() < self.config.error_rate:
+                self.remaining_errors = max(self.config.error_burst_length, 1)
+            if self.remaining_errors > 0:
+                self.remaining_errors -= 1
+                self.statistics["errors"] += 1
+                return True
+            return False
+
+    def draw_drop(self) -> bool:
+        with self.lock:
+            if self.config.max_dropped is not None and self.statistics["dropped"] >= self.config.max_dropped:
+                return False
+            if self.random.random() < self.config.drop_rate:
+                self.statistics["dropped"] += 1
+                return True
+            return False
+
+    def read_recording(self, filename: str) -> bytes:
+        recording_path = self.recordings_directory / filename
+        if not recording_path.exists():
+            raise FileNotFoundError(f"No recorded response {recording_path}")
+        with open(recording_path, "rb") as file:
+            return file.read()
+
+    def get_sparql_response(self, query: str) -> bytes:
+        """Return the recorded CSV response of an INSEE query, restricted to the INSEE code prefixes of its shard"""
+        match_class = re.search(r"\?uri a igeo:(\w+)", query)
+        if match_class is None or match_class.group(1) not in INSEE_RECORDINGS:
+            raise FileNotFoundError("No recorded response for this query")
+        content = self.read_recording(INSEE_RECORDINGS[match_class.group(1)])
+        match_shard = re.search(
+            r"FILTER\(\(?SUBSTR\(STR\(\?insee_code\), 1, 2\) IN \(([^)]*)\)( \|\| SUBSTR\(STR\(\?insee_code\), 1, 2\) NOT IN \(([^)]*)\))?",
+            query
+        )
+        if match_shard is None:
+            return content
+        prefixes = set(re.findall(r'"(\w+)"', match_shard.group(1)))
+        known_prefixes = set(re.findall(r'"(\w+)"', match_shard.group(3) or ""))
+        lines = content.decode("utf-8").splitlines(keepends=True)
+        header = lines[0].rstrip("\r\n").split(",")
+        index_insee_code = header.index("insee_code")
+        kept_lines = [lines[0]]
+        for line in lines[1:]:
+            prefix = line.split(",")[index_insee_code][:2]
+            if prefix in prefixes or (match_shard.group(2) is not None and prefix not in known_prefixes):
+                kept_lines.append(line)
+        return "".join(kept_lines).encode("utf-8")
+
+    def get_wikidata_response(self, query: str) -> bytes:
+        """Return the recorded Wikidata response, restricted to the INSEE codes of the `VALUES` block of the query"""
+        content = self.read_recording(WIKIDATA_RECORDING)
+        match_values = re.search(r"VALUES \?insee_code \{([^}]*)\}", query)
+        if match_values is None:
+            return content
+        insee_codes = set(re.findall(r'"(\w+)"', match_values.group(1)))
+        lines = content.decode("utf-8").splitlines(keepends=True)
+        header = lines[0].rstrip("\r\n").split(",")
+        index_insee_code = header.index("insee_code")
+        kept_lines = [lines[0]] + [line for line in lines[1:] if line.split(",")[index_insee_code] in insee_codes]
+        return "".join(kept_lines).encode("utf-8")
+
+
+def to_sparql_results_json(content: bytes) -> bytes:
+    """Convert CSV results to SPARQL JSON results, empty values being unbound"""
+    rows = list(csv.reader(io.StringIO(content.decode("utf-8"))))
+    variables = rows[0]
+    bindings = [
+        {variable: {"type": "literal", "value": value} for variable, value in zip(variables, row) if value != ""}
+        for row in rows[1:]
+    ]
+    return json.dumps({"head": {"vars": variables}, "results": {"bindings": bindings}}).encode("utf-8")
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args) -> None:
+        logging.debug(f"Stand-in server: {format % args}")
+
+    def get_stand_in(self) -> StandInServer:
+        return getattr(self.server, "stand_in")
+
+    def do_POST(self) -> None:
+        stand_in = self.get_stand_in()
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+        if self.path not in (StandInServer.insee_path, StandInServer.wikidata_path):
+            self.send_status(404)
+            return
+        try:
+            query = parse_qs(body).get("query", [""])[0]
+            if self.path == StandInServer.wikidata_path:
+                content = stand_in.get_wikidata_response(query)
+            else:
+                content = stand_in.get_sparql_response(query)
+        except FileNotFoundError:
+            self.send_status(404)
+            return
+        if parse_qs(body).get("format", ["text/csv"])[0] == "application/sparql-results+json":
+            content = to_sparql_results_json(content)
+        self.send_content(content, allow_ranges=False)
+
+    def do_GET(self) -> None:
+        stand_in = self.get_stand_in()
+        if self.path != StandInServer.laposte_path:
+            self.send_status(404)
+            return
+        try:
+            content = stand_in.read_recording(LAPOSTE_RECORDING)
+        except FileNotFoundError:
+            self.send_status(404)
+            return
+        self.send_content(content, allow_ranges=True)
+
+    def send_status(self, status: int, headers: dict[str, str] = {}) -> None:
+        self.get_stand_in().count("requests")
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def send_content(self, content: bytes, allow_ranges: bool) -> None:
+        stand_in = self.get_stand_in()
+        config = stand_in.config
+        if config.latency > 0:
+            time.sleep(config.latency)
+        if stand_in.draw_error():
+            headers = {"Retry-After": str(config.retry_after)} if config.retry_after is not None else {}
+            self.send_status(config.error_status, headers=headers)
+            return
+
+        stand_in.count("requests")
+        etag = '"' + hashlib.sha256(content).hexdigest()[:32] + '"'
+        if allow_ranges and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        status = 200
+        headers = {"Content-Type": "text/csv", "ETag": etag}
+        range_header = self.headers.get("Range")
+        match_range = re.match(r"^bytes=(\d+)-$", range_header) if range_header is not None else None
+        # Byte ranges are only served on the uncompressed body
+        if config.compression and "gzip" in self.headers.get("Accept-Encoding", ""):
+            content = gzip.compress(content)
+            headers["Content-Encoding"] = "gzip"
+        elif allow_ranges:
+            headers["Accept-Ranges"] = "bytes"
+            if match_range is not None and not config.ignore_ranges and self.headers.get("If-Range", etag) == etag and int(match_range.group(1)) < len(content):
+                start = int(match_range.group(1))
+                headers["Content-Range"] = f"bytes {start}-{len(content) - 1}/{len(content)}"
+                content = content[start:-1] if config.truncated_ranges else content[start:]
+                status = 206
+
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+
+        if stand_in.draw_drop():
+            # Send part of the body then close the connection, as a broken link would
+            self.write_throttled(content[:len(content) // 2])
+            self.close_connection = True
+            return
+        self.write_throttled(content)
+
+    def write_throttled(self, content: bytes) -> None:
+        stand_in = self.get_stand_in()
+        bandwidth = stand_in.config.bandwidth
+        if bandwidth is None or bandwidth <= 0:
+            self.wfile.write(content)
+        else:
+            slice_size = max(bandwidth // 10, 1)
+            for start in range(0, len(content), slice_size):
+                self.wfile.write(content[start:start + slice_size])
+                time.sleep(len(content[start:start + slice_size]) / bandwidth)
+        self.wfile.flush()
+        stand_in.count("bytes_sent", len(content))
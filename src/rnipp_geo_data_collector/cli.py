@@ -10,10 +10,15 @@ def cmd_collect_geo_data(
     exceptions_handler_config_file: Optional[str] = typer.Option(None, help="Path to the exceptions handler configuration file"),
     working_directory: Optional[str] = typer.Option(None, help="Working directory to store data and temporary files"),
     overwrite_working_directory: bool = typer.Option(False, help="Allow replacing the working directory if it already exists"),
+    cache_dir: Optional[str] = typer.Option(None, help="Directory to cache supplier responses between runs (kept outside the working directory)"),
+    max_cache_age: Optional[float] = typer.Option(None, help="Maximum age in seconds of a cached SPARQL response"),
     threads: int = typer.Option(1, help="Number of threads to use"),
     duckdb_extension_directory: Optional[str] = typer.Option(None, help="Directory for DuckDB extensions"),
     duckdb_memory_limit: str = typer.Option("10GB", help="Total memory limit for DuckDB"),
     duckdb_max_temp_directory_size: str = typer.Option("50GB", help="Maximum size for DuckDB temporary directory"),
+    duckdb_database_file: Optional[str] = typer.Option(None, help="Persistent DuckDB database file keeping the loaded tables, check results and run metadata between runs (kept outside the working directory)"),
+    force_checks: bool = typer.Option(False, help="Run all the checks on all the rows, even those that passed on the same inputs in a previous run recorded in the DuckDB database file"),
+    full_validation_days: Optional[int] = typer.Option(30, help="Number of days after which all the rows of an entity are checked again, rather than only the rows changed since its last validated snapshot in the DuckDB database file"),
     loglevel: str = typer.Option("INFO", help="Logging level")
     ):
     collect_geo_data(
@@ -21,10 +26,15 @@ def cmd_collect_geo_data(
         exceptions_handler_config_file=exceptions_handler_config_file,
         working_directory=working_directory,
         overwrite_working_directory=overwrite_working_directory,
+        cache_directory=cache_dir,
+        max_cache_age=max_cache_age,
         threads=threads,
         duckdb_extension_directory=duckdb_extension_directory,
         duckdb_memory_limit=duckdb_memory_limit,
         duckdb_max_temp_directory_size=duckdb_max_temp_directory_size,
+        duckdb_database_file=duckdb_database_file,
+        force_checks=force_checks,
+        full_validation_days=full_validation_days,
         loglevel=loglevel
     )
 
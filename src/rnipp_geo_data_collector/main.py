@@ -6,6 +6,7 @@ import logging
 
 from .acquisition.config import AcquisitionConfig, ErrorHandlerConfig
 from .acquisition.download import download_geo_data
+from .acquisition.run_database import RunDatabase
 from .utils.duckdb import init_duckdb_connection
 
 def collect_geo_data(
@@ -13,10 +14,15 @@ def collect_geo_data(
     exceptions_handler_config_file: Union[None, str, Path] = None,
     working_directory: Union[None, str, Path] = None,
     overwrite_working_directory: bool = False,
+    cache_directory: Union[None, str, Path] = None,
+    max_cache_age: Optional[float] = None,
     threads: int = 1,
     duckdb_extension_directory: Optional[str] = None,
     duckdb_memory_limit: str = "10GB",
     duckdb_max_temp_directory_size: str = "50GB",
+    duckdb_database_file: Union[None, str, Path] = None,
+    force_checks: bool = False,
+    full_validation_days: Optional[int] = 30,
     loglevel: str = "INFO" 
 ):
     
@@ -34,6 +40,9 @@ def collect_geo_data(
         working_directory_path = working_directory
     logging.info(f"Working directory: {working_directory_path}")
 
+    if duckdb_database_file is not None and Path(duckdb_database_file).resolve().is_relative_to(working_directory_path.resolve()):
+        raise RuntimeError(f"DuckDB database file {duckdb_database_file} must be outside the working directory {working_directory_path}, which is replaced by each run.")
+
     if working_directory_path.exists():
         if not overwrite_working_directory:
             raise RuntimeError(f"Working directory {working_directory_path} already exists.")
@@ -50,7 +59,8 @@ def collect_geo_data(
         threads=threads,
         memory_limit=duckdb_memory_limit,
         max_temp_directory_size=duckdb_max_temp_directory_size,
-        temp_directory_duckdb= working_directory_path
+        temp_directory_duckdb= working_directory_path,
+        database=duckdb_database_file
     )
 
     # Set up acquisition config
@@ -60,25 +70,59 @@ def collect_geo_data(
         logging.info(f"Loading acquisition config from {acquisition_config_file}")
         acquisition_config = AcquisitionConfig.from_file(acquisition_config_file)
 
+    if cache_directory is not None:
+        cache_directory_path = Path(cache_directory)
+        logging.info(f"Cache directory: {cache_directory_path}")
+        acquisition_config.insee.cache_directory = str(cache_directory_path / "insee")
+        acquisition_config.laposte.cache_directory = str(cache_directory_path / "laposte")
+        acquisition_config.wikidata.cache_directory = str(cache_directory_path / "wikidata")
+    if max_cache_age is not None:
+        acquisition_config.insee.cache_max_age = max_cache_age
+
     if exceptions_handler_config_file is None:
         exceptions_handler_config = ErrorHandlerConfig()
     else:
         logging.info(f"Loading exceptions handler config from {exceptions_handler_config_file}")
         exceptions_handler_config = ErrorHandlerConfig.from_file(exceptions_handler_config_file)
 
+    # Record the run in the persistent database, which keeps the loaded tables for the next runs
+    run_database: Optional[RunDatabase] = None
+    if duckdb_database_file is not None:
+        logging.info(f"DuckDB database file: {duckdb_database_file}")
+        run_database = RunDatabase(duckdb_conn=duckdb_connection, force_checks=force_checks, full_validation_days=full_validation_days)
+        try:
+            run_database.init()
+            run_database.start_run(working_directory=working_directory_path, acquisition_config=acquisition_config.model_dump_json())
+        except Exception as e:
+            duckdb_connection.close()
+            raise RuntimeError(f"Failed to record the run in DuckDB database {duckdb_database_file}") from e
+
     # Download geo data
     try:
         download_geo_data(
             acquisition_config = acquisition_config,
             exceptions_handler_config = exceptions_handler_config,
             duckdb_conn = duckdb_connection,
-            output_dir = working_directory_path / 'download'
+            output_dir = working_directory_path / 'download',
+            run_database = run_database,
+            threads = threads
         )
     except Exception as e:
+        if run_database is not None:
+            try:
+                run_database.finish_run(status="failed", error=str(e))
+            except Exception as e_finish:
+                logging.error(f"Failed to record the end of the run: {e_finish}")
         duckdb_connection.close()
         logging.error(f"Failed to download geo data: {e}")
         raise RuntimeError(f"Failed to download geo data: {e}") from e
 
+    if run_database is not None:
+        try:
+            run_database.finish_run(status="succeeded")
+        except Exception as e:
+            logging.error(f"Failed to record the end of the run: {e}")
+
     try:
         duckdb_connection.close()
     except Exception as e:
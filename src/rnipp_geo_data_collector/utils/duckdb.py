@@ -1,7 +1,11 @@
 import duckdb
 from pathlib import Path
-from typing import Optional, Union
+from typing import IO, Any, Iterator, Optional, Union
 import logging
+import pandas
+
+from .sparql_json import SparqlJsonResultsReader
+
 
 def init_duckdb_connection(
         extension_directory: Optional[Union[Path, str]] = None,
@@ -9,9 +13,11 @@ def init_duckdb_connection(
         memory_limit: str = "4GB",
         max_temp_directory_size: str = "10GB",
         temp_directory_duckdb: Union[None, Path, str] = None,
+        database: Union[None, Path, str] = None,
     ) -> duckdb.DuckDBPyConnection:
     """
     Init a DuckDB connection with the required extensions and configurations.
+    The database lives in memory unless a `database` file is given, in which case it is created or reopened.
     """
 
     config: dict[str, str] = {
@@ -31,9 +37,16 @@ def init_duckdb_connection(
             config["extension_directory"]  = extension_directory
 
 
+    if database is None:
+        database_str = ':memory:'
+    else:
+        database_path = Path(database)
+        database_path.parent.mkdir(parents=True, exist_ok=True)
+        database_str = str(database_path.resolve())
+
     try:
-        logging.info("Init a DuckDB connection")
-        con = duckdb.connect(database=':memory:', read_only=False, config=config)
+        logging.info(f"Init a DuckDB connection ({database_str})")
+        con = duckdb.connect(database=database_str, read_only=False, config=config)
     except Exception as e:
         logging.error(f"Error while initializing DuckDB connection : {e}")
         raise RuntimeError(f"Error while initializing DuckDB connection : {e}") from e
@@ -53,3 +66,102 @@ def init_duckdb_connection(
         raise RuntimeError(f"Unable to load JSON extension in DuckDB : {e}") from e
         
     return con
+
+
+OUTPUT_FORMATS = ("csv", "parquet")
+
+
+def get_output_format_context(output_format: str) -> dict[str, Union[str, bool]]:
+    """
+    Context of the SQL templates writing or reading files in `output_format`: the options of the `COPY ... TO`
+    statements and one section flag per format, to choose between `read_csv` and `read_parquet`.
+    """
+    if output_format == "parquet":
+        copy_options = "FORMAT PARQUET, COMPRESSION ZSTD"
+    elif output_format == "csv":
+        copy_options = "FORMAT CSV, HEADER TRUE"
+    else:
+        raise ValueError(f"Unsupported output format {output_format}, expected one of {', '.join(OUTPUT_FORMATS)}")
+    context: dict[str, Union[str, bool]] = {"copy_options": copy_options}
+    for name in OUTPUT_FORMATS:
+        context[name] = name == output_format
+    return context
+
+
+def load_chunks(
+        duckdb_conn: duckdb.DuckDBPyConnection,
+        chunks: Iterator[pandas.DataFrame],
+        table_name: str
+    ) -> int:
+    """Load data frames of VARCHAR columns into a new table, one chunk at a time. Return the number of rows loaded"""
+    chunk_name = f"{table_name}_chunk"
+    nb_rows = 0
+    table_created = False
+    for chunk in chunks:
+        duckdb_conn.register(chunk_name, chunk)
+        try:
+            if not table_created:
+                duckdb_conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM {chunk_name}")
+                table_created = True
+            else:
+                duckdb_conn.execute(f"INSERT INTO {table_name} SELECT * FROM {chunk_name}")
+        finally:
+            duckdb_conn.unregister(chunk_name)
+        nb_rows += len(chunk)
+    if not table_created:
+        raise RuntimeError(f"No data to load into table {table_name}")
+    return nb_rows
+
+
+def ingest_csv_stream(
+        duckdb_conn: duckdb.DuckDBPyConnection,
+        stream: IO[Any],
+        table_name: str,
+        chunk_rows: int = 50000
+    ) -> int:
+    """
+    Load a CSV stream with a header into a new table of VARCHAR columns, without writing it to disk.
+    Empty values are kept as empty strings, so that the typing of the columns is left to SQL.
+    """
+    chunks = pandas.read_csv(stream, dtype=str, keep_default_na=False, chunksize=chunk_rows)
+    return load_chunks(duckdb_conn=duckdb_conn, chunks=iter(chunks), table_name=table_name)
+
+
+def ingest_sparql_json_stream(
+        duckdb_conn: duckdb.DuckDBPyConnection,
+        stream: IO[Any],
+        table_name: str,
+        chunk_rows: int = 50000
+    ) -> int:
+    """
+    Load a SPARQL results stream (application/sparql-results+json) into a new table of VARCHAR columns, decoding the
+    bindings one at a time and loading them by chunks of `chunk_rows` rows.
+    Unbound variables are loaded as empty strings, as in the CSV results.
+    """
+    reader = SparqlJsonResultsReader(stream)
+
+    def to_frame(bindings: list[dict[str, dict[str, str]]]) -> pandas.DataFrame:
+        if reader.variables is None:
+            raise RuntimeError(f"Failed to load the SPARQL JSON results into table {table_name}: no variables in the head of the results")
+        return pandas.DataFrame(
+            {
+                variable: [binding[variable]["value"] if variable in binding else "" for binding in bindings]
+                for variable in reader.variables
+            },
+            dtype=str
+        )
+
+    def get_chunks() -> Iterator[pandas.DataFrame]:
+        bindings: list[dict[str, dict[str, str]]] = []
+        nb_chunks = 0
+        for binding in reader.iter_bindings():
+            bindings.append(binding)
+            # The bindings are kept until the variables are read, should the head come after them
+            if len(bindings) >= chunk_rows and reader.variables is not None:
+                yield to_frame(bindings)
+                nb_chunks += 1
+                bindings = []
+        if len(bindings) > 0 or nb_chunks == 0:
+            yield to_frame(bindings)
+
+    return load_chunks(duckdb_conn=duckdb_conn, chunks=get_chunks(), table_name=table_name)
@@ -0,0 +1,378 @@
+from pathlib import Path
+from threading import BoundedSemaphore, Lock
+from typing import Any, Optional
+import hashlib
+import logging
+import json
+import os
+import re
+import time
+import requests
+from urllib3.util.retry import Retry
+from requests.adapters import HTTPAdapter
+from pydantic import BaseModel, PrivateAttr
+
+
+_http_clients_lock = Lock()
+
+
+class RetryAfterThrottle:
+    """
+    Pause shared by all the requests sent to an endpoint: once the endpoint asked to wait with a Retry-After header,
+    the other requests also wait before being sent instead of hitting the endpoint in the meantime.
+    """
+    def __init__(self):
+        self.lock = Lock()
+        self.resume_at = 0.0
+
+    def pause(self, seconds: float) -> None:
+        with self.lock:
+            resume_at = time.monotonic() + seconds
+            if resume_at > self.resume_at:
+                self.resume_at = resume_at
+                logging.info(f"Endpoint asked to retry after {seconds:.1f}s, pausing the requests")
+
+    def wait(self) -> None:
+        """Sleep until the end of the current pause, if any"""
+        with self.lock:
+            delay = self.resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ThrottledRetry(Retry):
+    """Retry strategy extending the Retry-After delay received by one request to the other requests of the throttle"""
+    throttle: Optional[RetryAfterThrottle] = None
+
+    def new(self, **kw: Any) -> "ThrottledRetry":
+        retry = super().new(**kw)
+        retry.throttle = self.throttle
+        return retry
+
+    def sleep_for_retry(self, response) -> bool:
+        retry_after = self.get_retry_after(response)
+        if retry_after is not None and self.throttle is not None:
+            self.throttle.pause(retry_after)
+        return super().sleep_for_retry(response)
+
+
+class HttpClient:
+    """
+    HTTP session with a pool of keep-alive connections, shared by all the requests sent to a supplier endpoint.
+    """
+    def __init__(
+            self,
+            name: str,
+            max_retries: int = 5,
+            backoff_factor: float = 0.5,
+            pool_connections: int = 1,
+            pool_maxsize: int = 10,
+            chunk_size: int = 64 * 1024,
+            write_buffer_size: int = 1024 * 1024,
+            accept_encoding: str = "gzip, deflate",
+            retry_post: bool = False
+        ):
+        self.name = name
+        self.chunk_size = chunk_size
+        self.write_buffer_size = write_buffer_size
+        self.throttle = RetryAfterThrottle()
+        retry_strategy = ThrottledRetry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=[408, 429, 500, 502, 503, 504],
+            # POST is not idempotent in general, only the clients of endpoints where it reads data (SPARQL queries) retry it
+            allowed_methods=None if retry_post else Retry.DEFAULT_ALLOWED_METHODS,
+            redirect=0
+        )
+        retry_strategy.throttle = self.throttle
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry_strategy,
+            pool_block=True
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.session.headers["Accept-Encoding"] = accept_encoding
+
+    def stream_to_file(self, response: requests.Response, output_path: Path, description: str, content_hash: Any = None, append: bool = False) -> int:
+        """
+        Write the body of the response to `output_path`, decompressing it on the fly, and log the transfer statistics.
+        Return the number of bytes written. The written bytes are also fed to `content_hash` when one is given.
+        """
+        start = time.perf_counter()
+        nb_bytes_written = 0
+        with open(output_path, "ab" if append else "wb", buffering=self.write_buffer_size) as foutput:
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                if chunk:
+                    foutput.write(chunk)
+                    nb_bytes_written += len(chunk)
+                    if content_hash is not None:
+                        content_hash.update(chunk)
+        elapsed = time.perf_counter() - start
+        # Bytes read from the socket, before decompression
+        nb_bytes_wire = response.raw.tell()
+        content_encoding = response.headers.get("Content-Encoding", "identity")
+        throughput = nb_bytes_wire / elapsed / (1024 * 1024) if elapsed > 0 else 0.0
+        logging.info(f"Downloaded {description}: {nb_bytes_wire} byte(s) on the wire ({content_encoding}), {nb_bytes_written} byte(s) written in {elapsed:.2f}s ({throughput:.2f} MiB/s)")
+        return nb_bytes_written
+
+    def download_to_file(
+            self,
+            response: requests.Response,
+            output_path: Path,
+            description: str,
+            timeout: Any = None,
+            max_resume_attempts: int = 3,
+            content_hash: Any = None
+        ) -> tuple[int, Any]:
+        """
+        Write the body of a GET response to `output_path` through a `.part` file renamed once complete.
+
+        When the body stream breaks and the server accepts byte ranges on an uncompressed body, the download
+        is resumed from the end of the `.part` file with a Range request. The If-Range header makes the server
+        send the whole resource again if it changed in the meantime. Before the rename, the size of the `.part`
+        file is checked against the length announced by the server.
+        Return the number of bytes written and the hash of the content (a new object if the download restarted).
+        """
+        part_path = output_path.with_suffix(output_path.suffix + ".part")
+        if not part_path.parent.exists():
+            part_path.parent.mkdir(parents=True, exist_ok=True)
+
+        request_headers = {
+            key: value for key, value in response.request.headers.items()
+            if key not in ("If-None-Match", "If-Modified-Since", "Range", "If-Range")
+        }
+        expected_length, if_range, resumable = HttpClient.get_resume_information(response)
+        current_response = response
+        append = False
+        nb_bytes_written = 0
+        nb_resume_attempts = 0
+        try:
+            while True:
+                try:
+                    self.stream_to_file(response=current_response, output_path=part_path, description=description, content_hash=content_hash, append=append)
+                    nb_bytes_written = part_path.stat().st_size
+                    break
+                except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError) as e:
+                    nb_bytes_written = part_path.stat().st_size if part_path.exists() else 0
+                    if not resumable or nb_resume_attempts >= max_resume_attempts:
+                        raise
+                    nb_resume_attempts += 1
+                    logging.warning(f"Download of {description} interrupted after {nb_bytes_written} byte(s), resuming (attempt {nb_resume_attempts}/{max_resume_attempts}): {e}")
+
+                if current_response is not response:
+                    current_response.close()
+                current_response = self.session.get(
+                    url=response.request.url,
+                    headers={**request_headers, "Range": f"bytes={nb_bytes_written}-", "If-Range": if_range},
+                    timeout=timeout,
+                    stream=True
+                )
+                if current_response.status_code == 206:
+                    start, total_length = HttpClient.parse_content_range(current_response.headers.get("Content-Range"))
+                    if start != nb_bytes_written:
+                        raise requests.exceptions.HTTPError(f"Unexpected range while resuming download of {description}: {current_response.headers.get('Content-Range')}")
+                    if total_length is not None:
+                        expected_length = total_length
+                    append = True
+                elif current_response.status_code == 200:
+                    logging.warning(f"Resource changed or range ignored by the server, downloading {description} again from the start")
+                    expected_length, if_range, resumable = HttpClient.get_resume_information(current_response)
+                    if content_hash is not None:
+                        content_hash = hashlib.new(content_hash.name)
+                    append = False
+                else:
+                    raise requests.exceptions.HTTPError(f"HTTP error while resuming download of {description}: {current_response.status_code}")
+        except Exception:
+            part_path.unlink(missing_ok=True)
+            raise
+        finally:
+            if current_response is not response:
+                current_response.close()
+
+        if expected_length is not None and nb_bytes_written != expected_length:
+            part_path.unlink(missing_ok=True)
+            raise RuntimeError(f"Incomplete download of {description}: {nb_bytes_written} byte(s) written, {expected_length} expected")
+        os.replace(part_path, output_path)
+        return nb_bytes_written, content_hash
+
+    @staticmethod
+    def get_resume_information(response: requests.Response) -> tuple[Optional[int], Optional[str], bool]:
+        """Return the expected length of the body, the If-Range validator and whether the download can be resumed"""
+        is_identity = response.headers.get("Content-Encoding", "identity").lower() == "identity"
+        expected_length: Optional[int] = None
+        if is_identity and response.headers.get("Content-Length") is not None:
+            expected_length = int(response.headers["Content-Length"])
+        # A weak ETag cannot be used in If-Range
+        if_range = response.headers.get("ETag")
+        if if_range is None or if_range.startswith("W/"):
+            if_range = response.headers.get("Last-Modified")
+        resumable = is_identity and if_range is not None and response.headers.get("Accept-Ranges", "").lower() == "bytes"
+        return expected_length, if_range, resumable
+
+    @staticmethod
+    def parse_content_range(content_range: Optional[str]) -> tuple[Optional[int], Optional[int]]:
+        """Return the first byte position and the total length of a `Content-Range: bytes start-end/total` header"""
+        if content_range is None:
+            return None, None
+        match = re.match(r"^bytes (\d+)-\d+/(\d+|\*)$", content_range.strip())
+        if match is None:
+            return None, None
+        total_length = None if match.group(2) == "*" else int(match.group(2))
+        return int(match.group(1)), total_length
+
+    def get_statistics(self) -> dict[str, int]:
+        """Count the requests sent and the connections opened by the pools of the session"""
+        nb_requests = 0
+        nb_connections = 0
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            nb_requests += pool.num_requests
+            nb_connections += pool.num_connections
+        return {
+            "requests": nb_requests,
+            "connections": nb_connections,
+            "reused_connections": max(nb_requests - nb_connections, 0)
+        }
+
+    def log_statistics(self) -> None:
+        statistics = self.get_statistics()
+        logging.info(f"HTTP client {self.name}: {statistics['requests']} request(s) sent over {statistics['connections']} connection(s), {statistics['reused_connections']} connection reuse(s)")
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class HttpSupplierConfig(BaseModel):
+    """Base configuration of a supplier endpoint, holding the HTTP client shared by all its requests during a run"""
+    endpoint_url: str
+    backoff_factor: float = 0.5
+    max_retries: int = 5
+    pool_connections: int = 1
+    pool_maxsize: int = 10
+    max_concurrent_requests: int = 1
+    chunk_size: int = 64 * 1024
+    write_buffer_size: int = 1024 * 1024
+    accept_encoding: str = "gzip, deflate"
+    # Retry the POST requests like the GET ones, for the endpoints receiving read-only queries by POST
+    retry_post: bool = False
+
+    _http_client: Optional[HttpClient] = PrivateAttr(default=None)
+    _request_slots: Optional[BoundedSemaphore] = PrivateAttr(default=None)
+
+    def get_request_slots(self) -> BoundedSemaphore:
+        """Return the semaphore limiting the number of requests sent at the same time to the endpoint"""
+        with _http_clients_lock:
+            if self._request_slots is None:
+                self._request_slots = BoundedSemaphore(self.max_concurrent_requests)
+            return self._request_slots
+
+    def get_http_client(self) -> HttpClient:
+        """Return the HTTP client of the endpoint, creating it on first use"""
+        with _http_clients_lock:
+            if self._http_client is None:
+                self._http_client = HttpClient(
+                    name=self.endpoint_url,
+                    max_retries=self.max_retries,
+                    backoff_factor=self.backoff_factor,
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                    chunk_size=self.chunk_size,
+                    write_buffer_size=self.write_buffer_size,
+                    accept_encoding=self.accept_encoding,
+                    retry_post=self.retry_post
+                )
+            return self._http_client
+
+    def close_http_client(self) -> None:
+        """Log the connection statistics of the HTTP client and close it"""
+        with _http_clients_lock:
+            if self._http_client is not None:
+                self._http_client.log_statistics()
+                self._http_client.close()
+                self._http_client = None
+
+
+class HttpValidators:
+    """Cache validators of a downloaded resource, persisted in a JSON file next to the downloaded file"""
+    def __init__(
+            self,
+            etag: Optional[str] = None,
+            last_modified: Optional[str] = None,
+            content_length: Optional[int] = None,
+            sha256: Optional[str] = None
+        ):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_length = content_length
+        self.sha256 = sha256
+
+    @classmethod
+    def from_response(cls, response: requests.Response, content_length: int, sha256: str) -> "HttpValidators":
+        return HttpValidators(
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            content_length=content_length,
+            sha256=sha256
+        )
+
+    @classmethod
+    def from_file(cls, file_path: Path) -> Optional["HttpValidators"]:
+        """Load the validators, or None if the file is missing or unreadable"""
+        if not file_path.exists():
+            return None
+        try:
+            with open(file_path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            return HttpValidators(
+                etag=data.get("etag"),
+                last_modified=data.get("last_modified"),
+                content_length=data.get("content_length"),
+                sha256=data.get("sha256")
+            )
+        except Exception as e:
+            logging.warning(f"Unable to read HTTP validators from {file_path}: {e}")
+            return None
+
+    def to_file(self, file_path: Path) -> None:
+        if not file_path.parent.exists():
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump(
+                {
+                    "etag": self.etag,
+                    "last_modified": self.last_modified,
+                    "content_length": self.content_length,
+                    "sha256": self.sha256
+                },
+                file,
+                indent=2
+            )
+
+    def is_valid_for(self, file_path: Path) -> bool:
+        """Check that the validators describe the given local file: its SHA-256 hash, or only its size when no hash is stored"""
+        if not file_path.exists() or self.content_length is None or file_path.stat().st_size != self.content_length:
+            return False
+        return self.sha256 is None or HttpValidators.get_file_sha256(file_path) == self.sha256
+
+    @staticmethod
+    def get_file_sha256(file_path: Path) -> str:
+        content_hash = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                content_hash.update(chunk)
+        return content_hash.hexdigest()
+
+    def to_request_headers(self) -> dict[str, str]:
+        """Headers of a conditional GET request"""
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
@@ -0,0 +1,172 @@
+from pathlib import Path
+from typing import Any, Optional, Union
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+
+def get_default_cache_directory() -> Path:
+    """Persistent cache directory of the user (`$XDG_CACHE_HOME`, or `~/.cache`), used when no cache directory is configured"""
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "rnipp-geo-data-collector"
+
+
+class ResponseCache:
+    """
+    On-disk cache of raw HTTP responses, addressed by a hash of what identifies the request.
+
+    Entries are written to a temporary file and moved into place with an atomic rename, so several
+    processes can share the same directory: a reader sees either a complete entry or no entry.
+    Entries older than `max_age` seconds are ignored and removed. When the total size exceeds
+    `max_size` bytes, the least recently used entries are removed first.
+    """
+    suffix = ".response"
+
+    def __init__(
+            self,
+            directory: Union[str, Path],
+            max_age: Optional[float] = None,
+            max_size: Optional[int] = None
+        ):
+        if isinstance(directory, str):
+            self.directory = Path(directory)
+        else:
+            self.directory = directory
+        self.max_age = max_age
+        self.max_size = max_size
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        content_hash = hashlib.sha256()
+        for part in parts:
+            content_hash.update(part.encode("utf-8"))
+            content_hash.update(b"\0")
+        return content_hash.hexdigest()
+
+    def get_entry_path(self, key: str) -> Path:
+        return self.directory / (key + ResponseCache.suffix)
+
+    def is_expired(self, entry_path: Path, now: Optional[float] = None) -> bool:
+        if self.max_age is None:
+            return False
+        if now is None:
+            now = time.time()
+        return now - entry_path.stat().st_mtime > self.max_age
+
+    def get(self, key: str, output_path: Path) -> bool:
+        """Copy the cached response to `output_path`, return False if there is no valid entry"""
+        entry_path = self.get_entry_path(key)
+        try:
+            if self.is_expired(entry_path):
+                entry_path.unlink(missing_ok=True)
+                return False
+            if not output_path.parent.exists():
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(entry_path, output_path)
+            # The access time drives the LRU eviction, the modification time drives the expiration
+            os.utime(entry_path, (time.time(), entry_path.stat().st_mtime))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def put(self, key: str, input_path: Path) -> None:
+        """Store the content of `input_path` as the response for `key`"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as ftmp, open(input_path, "rb") as finput:
+                shutil.copyfileobj(finput, ftmp)
+            os.replace(tmp_path, self.get_entry_path(key))
+        except Exception:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove expired entries, then the least recently used ones until the cache fits in `max_size`"""
+        now = time.time()
+        entries: list[tuple[float, int, Path]] = []
+        for entry_path in self.directory.glob("*" + ResponseCache.suffix):
+            try:
+                if self.is_expired(entry_path, now=now):
+                    entry_path.unlink(missing_ok=True)
+                    continue
+                stat = entry_path.stat()
+                entries.append((stat.st_atime, stat.st_size, entry_path))
+            except FileNotFoundError:
+                continue
+
+        if self.max_size is None:
+            return
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries, key=lambda entry: entry[0]):
+            if total_size <= self.max_size:
+                break
+            logging.info(f"Evicting cached response {entry_path.name}")
+            entry_path.unlink(missing_ok=True)
+            total_size -= size
+
+
+class KeyedResultCache:
+    """
+    On-disk cache of query results by key (e.g. one INSEE code), persisted in a single JSON file.
+
+    An entry is kept with the time it was fetched and is ignored once older than `max_age` seconds, so that only
+    the missing or expired keys are queried again. Entries with no result are cached as well. The file is
+    rewritten with an atomic rename, expired entries being dropped at that time.
+    """
+    def __init__(
+            self,
+            path: Union[str, Path],
+            max_age: Optional[float] = None
+        ):
+        if isinstance(path, str):
+            self.path = Path(path)
+        else:
+            self.path = path
+        self.max_age = max_age
+        self.entries: dict[str, dict[str, Any]] = {}
+
+    def load(self) -> None:
+        if not self.path.exists():
+            self.entries = {}
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                self.entries = json.load(file)
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable result cache {self.path}: {e}")
+            self.entries = {}
+
+    def is_expired(self, entry: dict[str, Any], now: Optional[float] = None) -> bool:
+        if self.max_age is None:
+            return False
+        if now is None:
+            now = time.time()
+        return now - entry["fetched_at"] > self.max_age
+
+    def get(self, key: str) -> Optional[list[dict[str, str]]]:
+        """Return the cached rows of `key`, or None if there is no valid entry"""
+        entry = self.entries.get(key)
+        if entry is None or self.is_expired(entry):
+            return None
+        return entry["rows"]
+
+    def put(self, key: str, rows: list[dict[str, str]]) -> None:
+        self.entries[key] = {"fetched_at": time.time(), "rows": rows}
+
+    def save(self) -> None:
+        now = time.time()
+        self.entries = {key: entry for key, entry in self.entries.items() if not self.is_expired(entry, now=now)}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as ftmp:
+                json.dump(self.entries, ftmp)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
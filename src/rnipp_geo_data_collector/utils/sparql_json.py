@@ -0,0 +1,100 @@
+from typing import IO, Any, Iterator, Optional
+import codecs
+import json
+
+
+class SparqlJsonResultsReader:
+    """
+    Incremental reader of SPARQL results (application/sparql-results+json) from a binary stream: the stream is read by
+    blocks of `read_size` bytes and the bindings are decoded one at a time, so that the whole response is never held in
+    memory. The variables are known once the "head" member is read, usually before the bindings.
+    """
+    def __init__(self, stream: IO[Any], read_size: int = 64 * 1024):
+        self.stream = stream
+        self.read_size = read_size
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.position = 0
+        self.exhausted = False
+        self.variables: Optional[list[str]] = None
+
+    def read_more(self) -> bool:
+        """Append the next block of the stream to the buffer, dropping what was already decoded. False at the end of the stream"""
+        if self.exhausted:
+            return False
+        block = self.stream.read(self.read_size)
+        self.exhausted = len(block) == 0
+        self.buffer = self.buffer[self.position:] + self.text_decoder.decode(block, final=self.exhausted)
+        self.position = 0
+        return not self.exhausted
+
+    def skip_whitespace(self) -> None:
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position].isspace():
+                self.position += 1
+            if self.position < len(self.buffer) or not self.read_more():
+                return
+
+    def peek(self) -> str:
+        """Next character that is not a whitespace, without consuming it"""
+        self.skip_whitespace()
+        if self.position >= len(self.buffer):
+            raise RuntimeError("Failed to read the SPARQL JSON results: unexpected end of the response")
+        return self.buffer[self.position]
+
+    def expect(self, characters: str) -> str:
+        character = self.peek()
+        if character not in characters:
+            raise RuntimeError(f"Failed to read the SPARQL JSON results: expected one of '{characters}' at '{self.buffer[self.position:self.position + 50]}'")
+        self.position += 1
+        return character
+
+    def read_value(self) -> Any:
+        """Decode the next JSON value, reading more of the stream until it is complete"""
+        self.skip_whitespace()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+                # A number at the end of the buffer may go on in the next block
+                if end < len(self.buffer) or self.exhausted:
+                    self.position = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self.exhausted:
+                    raise RuntimeError("Failed to read the SPARQL JSON results: invalid JSON") from e
+            self.read_more()
+
+    def iter_members(self) -> Iterator[str]:
+        """Keys of the members of the next object, the caller consuming the value of each of them"""
+        self.expect("{")
+        if self.peek() == "}":
+            self.position += 1
+            return
+        while True:
+            key = self.read_value()
+            self.expect(":")
+            yield key
+            if self.expect(",}") == "}":
+                return
+
+    def iter_bindings(self) -> Iterator[dict[str, dict[str, str]]]:
+        """Bindings of the results, in order, reading the variables of the "head" member on the way"""
+        for key in self.iter_members():
+            if key == "head":
+                self.variables = self.read_value()["vars"]
+            elif key == "results":
+                for results_key in self.iter_members():
+                    if results_key != "bindings":
+                        self.read_value()
+                        continue
+                    self.expect("[")
+                    if self.peek() == "]":
+                        self.position += 1
+                        continue
+                    while True:
+                        yield self.read_value()
+                        if self.expect(",]") == "]":
+                            break
+            else:
+                self.read_value()
@@ -0,0 +1,12 @@
+from pathlib import Path
+import pytest
+
+from rnipp_geo_data_collector.benchmark.recordings import generate_synthetic_recordings
+
+
+@pytest.fixture(scope="session")
+def recordings_directory(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Small synthetic recordings replayed by the stand-in server"""
+    directory = tmp_path_factory.mktemp("recordings")
+    generate_synthetic_recordings(directory, nb_communes_per_departement=3, seed=0)
+    return directory
@@ -0,0 +1,49 @@
+import duckdb
+import pytest
+
+from rnipp_geo_data_collector.acquisition.check_executor import run_controls
+from rnipp_geo_data_collector.acquisition.run_database import RunDatabase, get_check_key
+
+
+class EntityView:
+    view_name = "entity"
+    description = "entity"
+
+
+class Control:
+    def __init__(self, error: bool = False):
+        self.error = error
+        self.nb_runs = 0
+
+    def run(self, request, duckdb_conn) -> bool:
+        self.nb_runs += 1
+        if self.error:
+            raise RuntimeError(f"Failure of control {id(self)}")
+        return True
+
+
+@pytest.mark.parametrize("threads", [1, 4])
+def test_all_the_controls_run_and_the_first_failure_is_raised(threads: int):
+    duckdb_conn = duckdb.connect()
+    run_database = RunDatabase(duckdb_conn=duckdb_conn)
+    run_database.init()
+    controls = [Control(), Control(error=True), Control(), Control(error=True)]
+
+    with pytest.raises(RuntimeError) as excinfo:
+        run_controls(
+            request=EntityView(),
+            prerequisites=[],
+            controls=controls,
+            duckdb_conn=duckdb_conn,
+            threads=threads,
+            run_database=run_database,
+            inputs_fingerprint="inputs"
+        )
+
+    assert str(excinfo.value) == f"Failure of control {id(controls[1])}"
+    assert [control.nb_runs for control in controls] == [1, 1, 1, 1]
+    passed = [
+        run_database.is_check_passed(get_check_key(f"entity/{index}/Control", ["inputs"]))
+        for index in range(len(controls))
+    ]
+    assert passed == [True, False, True, False]
@@ -0,0 +1,28 @@
+from pathlib import Path
+import duckdb
+
+from rnipp_geo_data_collector.acquisition import run_database as run_database_module
+from rnipp_geo_data_collector.acquisition.run_database import RunDatabase
+from rnipp_geo_data_collector.acquisition.suppliers.insee.requests import OutputPathsRequestCOG, RequestCOGDepartement
+
+
+def get_cleaned_table_fingerprint(tmp_path: Path) -> str:
+    run_database = RunDatabase(duckdb_conn=duckdb.connect())
+    request = RequestCOGDepartement(
+        output_paths=OutputPathsRequestCOG(raw_entities=tmp_path / "raw.csv", cleaned_entities=tmp_path / "cleaned.csv"),
+        run_database=run_database
+    )
+    fingerprint = request.get_inputs_fingerprint()
+    assert fingerprint is not None
+    return fingerprint
+
+
+def test_cleaned_table_fingerprint_changes_with_the_code(tmp_path: Path, monkeypatch):
+    (tmp_path / "raw.csv").write_text("uri\ndepartement1\n", encoding="utf-8")
+    monkeypatch.setattr(run_database_module, "get_code_fingerprint", lambda: "code1")
+    fingerprint = get_cleaned_table_fingerprint(tmp_path)
+    assert get_cleaned_table_fingerprint(tmp_path) == fingerprint
+
+    # A new cleaning SQL or exceptions table template changes the code fingerprint, the cleaned table is not reused
+    monkeypatch.setattr(run_database_module, "get_code_fingerprint", lambda: "code2")
+    assert get_cleaned_table_fingerprint(tmp_path) != fingerprint
@@ -0,0 +1,27 @@
+from pathlib import Path
+
+from rnipp_geo_data_collector.benchmark.harness import BenchmarkScenario, get_acquisition_config
+from rnipp_geo_data_collector.benchmark.server import StandInServer, StandInServerConfig
+from rnipp_geo_data_collector.main import collect_geo_data
+
+
+def test_a_wikidata_outage_does_not_fail_the_acquisition(recordings_directory: Path, tmp_path: Path):
+    scenario = BenchmarkScenario(name="wikidata-outage", server=StandInServerConfig(), wikidata_enrichment=True)
+    with StandInServer(recordings_directory, scenario.server) as server:
+        acquisition_config = get_acquisition_config(server=server, scenario=scenario)
+        acquisition_config.laposte.cache_directory = str(tmp_path / "cache" / "laposte")
+        # Every Wikidata query gets a 404
+        acquisition_config.wikidata.endpoint_url = server.get_endpoint_url("/wikidata/unavailable")
+        acquisition_config.wikidata.max_retries = 0
+        acquisition_config_path = tmp_path / "config-acquisition.json"
+        acquisition_config_path.write_text(acquisition_config.model_dump_json(), encoding="utf-8")
+
+        collect_geo_data(
+            acquisition_config_file=acquisition_config_path,
+            working_directory=tmp_path / "output",
+            overwrite_working_directory=True
+        )
+
+    download_directory = tmp_path / "output" / "download"
+    assert len(list((download_directory / "insee" / "cleaned").iterdir())) > 0
+    assert not (download_directory / "wikidata" / "cleaned").exists()
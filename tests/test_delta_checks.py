@@ -0,0 +1,47 @@
+from pathlib import Path
+import duckdb
+import pytest
+
+from rnipp_geo_data_collector.acquisition.run_database import RunDatabase
+from rnipp_geo_data_collector.acquisition.suppliers.insee.checks.start_date import CheckStartDateAfterDownloadInseeCog
+from rnipp_geo_data_collector.acquisition.suppliers.insee.checks.uri_unicity import CheckURIUnicityAfterDownloadInseeCog
+from rnipp_geo_data_collector.acquisition.suppliers.insee.requests import OutputPathsRequestCOG, RequestCOGDepartement
+
+
+@pytest.fixture
+def request_with_delta(tmp_path: Path):
+    """Departements request whose 4th and 5th rows changed since its validated snapshot"""
+    duckdb_conn = duckdb.connect()
+    run_database = RunDatabase(duckdb_conn=duckdb_conn)
+    run_database.init()
+    request = RequestCOGDepartement(
+        output_paths=OutputPathsRequestCOG(raw_entities=tmp_path / "raw.csv", cleaned_entities=tmp_path / "cleaned.csv"),
+        run_database=run_database
+    )
+    duckdb_conn.execute(
+        f"CREATE TABLE {request.view_name} AS SELECT 'departement' || i AS uri, lpad(CAST(i AS VARCHAR), 2, '0') AS insee_code, DATE '2000-01-01' AS start_date, 1 AS start_date_count FROM range(1, 7) t(i) ORDER BY i"
+    )
+    request.delta.save_snapshot(duckdb_conn)
+    duckdb_conn.execute(f"UPDATE {request.view_name} SET start_date = NULL WHERE uri = 'departement4'")
+    duckdb_conn.execute(f"UPDATE {request.view_name} SET uri = 'departement2' WHERE uri = 'departement5'")
+    request.delta.create(duckdb_conn)
+    assert request.delta.created
+    return request, duckdb_conn
+
+
+def test_row_local_check_reports_the_row_number_in_the_request(request_with_delta):
+    request, duckdb_conn = request_with_delta
+    control = CheckStartDateAfterDownloadInseeCog()
+
+    with pytest.raises(RuntimeError) as excinfo:
+        control.run(request=request.delta.get_request(control), duckdb_conn=duckdb_conn)
+    assert "The start date is empty at row 4 for the URI departement4" in str(excinfo.value.__cause__)
+
+
+def test_keyed_check_reports_the_row_numbers_in_the_request(request_with_delta):
+    request, duckdb_conn = request_with_delta
+    control = CheckURIUnicityAfterDownloadInseeCog()
+
+    with pytest.raises(RuntimeError) as excinfo:
+        control.run(request=request.delta.get_request(control), duckdb_conn=duckdb_conn)
+    assert "The URI departement2 is duplicated at rows 2, 5" in str(excinfo.value.__cause__)
@@ -0,0 +1,37 @@
+import duckdb
+import pytest
+
+from rnipp_geo_data_collector.acquisition.suppliers.insee.checks.hierarchy import CheckHierarchyInseeCog
+from rnipp_geo_data_collector.acquisition.suppliers.insee.hierarchy import InseeHierarchyGraph
+
+
+class EntitiesView:
+    """Stand-in for a request, naming a table of geographic entities"""
+    def __init__(self, view_name: str, description: str):
+        self.view_name = view_name
+        self.description = description
+
+
+def test_hierarchy_check_reports_the_number_of_each_failure():
+    duckdb_conn = duckdb.connect()
+    duckdb_conn.execute("CREATE TABLE departements AS SELECT * FROM (VALUES ('departement1', DATE '2000-01-01', NULL::DATE)) t(uri, start_date, end_date)")
+    duckdb_conn.execute("""
+        CREATE TABLE communes AS SELECT * FROM (VALUES
+            ('commune1', 'departement1', DATE '2000-01-01', NULL::DATE),
+            ('commune2', 'departement9', DATE '2000-01-01', NULL::DATE),
+            ('commune3', 'commune4', DATE '2000-01-01', NULL::DATE),
+            ('commune4', 'commune3', DATE '2000-01-01', NULL::DATE)
+        ) t(uri, parent_uri, start_date, end_date)
+    """)
+    departements = EntitiesView(view_name="departements", description='"Departements" data')
+    communes = EntitiesView(view_name="communes", description='"Communes" data')
+    hierarchy = InseeHierarchyGraph(entities=[departements, communes], children=[communes], top_level=[departements])
+    hierarchy.build(duckdb_conn)
+
+    with pytest.raises(RuntimeError) as excinfo:
+        CheckHierarchyInseeCog(hierarchy=hierarchy).run(requests=hierarchy.entities, duckdb_conn=duckdb_conn)
+    assert str(excinfo.value) == (
+        'Bug found in the hierarchy of "Departements" data, "Communes" data : '
+        "1 link(s) to an unknown parent, 1 cycle(s), 3 child(ren) reaching no top-level entity"
+    )
+    assert excinfo.value.__cause__ is None
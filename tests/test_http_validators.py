@@ -0,0 +1,47 @@
+from pathlib import Path
+import hashlib
+
+from rnipp_geo_data_collector.acquisition.suppliers.laposte.config import LaPosteSupplierConfig
+from rnipp_geo_data_collector.utils.http_client import HttpValidators
+
+
+def write_file(path: Path, content: bytes) -> HttpValidators:
+    path.write_bytes(content)
+    return HttpValidators(etag='"v1"', content_length=len(content), sha256=hashlib.sha256(content).hexdigest())
+
+
+def test_validators_accept_the_file_they_describe(tmp_path: Path):
+    file_path = tmp_path / "raw.csv"
+    validators = write_file(file_path, b"insee_code;postal_code\n01001;01400\n")
+    validators.to_file(tmp_path / "raw.csv.validators.json")
+
+    loaded = HttpValidators.from_file(tmp_path / "raw.csv.validators.json")
+    assert loaded is not None
+    assert loaded.is_valid_for(file_path)
+    assert loaded.to_request_headers() == {"If-None-Match": '"v1"'}
+
+
+def test_validators_reject_a_file_of_the_same_size_with_another_content(tmp_path: Path):
+    file_path = tmp_path / "raw.csv"
+    validators = write_file(file_path, b"insee_code;postal_code\n01001;01400\n")
+    file_path.write_bytes(b"insee_code;postal_code\n01001;01401\n")
+
+    assert not validators.is_valid_for(file_path)
+
+
+def test_validators_without_hash_check_the_size_only(tmp_path: Path):
+    file_path = tmp_path / "raw.csv"
+    validators = write_file(file_path, b"insee_code;postal_code\n01001;01400\n")
+    validators.sha256 = None
+
+    assert validators.is_valid_for(file_path)
+    file_path.write_bytes(b"insee_code;postal_code\n")
+    assert not validators.is_valid_for(file_path)
+    assert not validators.is_valid_for(tmp_path / "missing.csv")
+
+
+def test_laposte_cache_defaults_to_the_user_cache_directory(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+    assert LaPosteSupplierConfig().get_cache_directory() == tmp_path / "rnipp-geo-data-collector" / "laposte"
+    assert LaPosteSupplierConfig(cache_directory=str(tmp_path / "cache")).get_cache_directory() == tmp_path / "cache"
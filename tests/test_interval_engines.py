@@ -0,0 +1,89 @@
+from datetime import date
+from typing import Any, Optional
+import random
+import duckdb
+import pytest
+
+from rnipp_geo_data_collector.acquisition.suppliers.insee.checks.parent_links import ParentLinksInseeCog
+from rnipp_geo_data_collector.benchmark.intervals import CHILDREN, PARENTS, create_periods_tables, get_interval_checks
+
+SEED = 20
+NB_DATASETS = 40
+LINKS_TABLE_NAME = ParentLinksInseeCog(parents_view_name=[PARENTS.view_name]).get_table_name(CHILDREN)
+
+
+def run_both_engines(duckdb_conn: duckdb.DuckDBPyConnection) -> dict[str, list[tuple[Any, ...]]]:
+    """Results of each interval check, asserting that both engines find the same violations"""
+    results: dict[str, list[tuple[Any, ...]]] = {}
+    for name, check in get_interval_checks(LINKS_TABLE_NAME).items():
+        sql_rows = sorted(check(duckdb_conn, "sql"))
+        numpy_rows = sorted(check(duckdb_conn, "numpy"))
+        assert sql_rows == numpy_rows, f"The engines differ on {name}"
+        results[name] = sql_rows
+    return results
+
+
+@pytest.mark.parametrize("index", range(NB_DATASETS))
+def test_engines_agree_on_generated_datasets(index: int):
+    generator = random.Random(SEED + index)
+    duckdb_conn = duckdb.connect()
+    create_periods_tables(
+        duckdb_conn,
+        nb_insee_codes=generator.randrange(1, 20),
+        nb_children=generator.randrange(0, 51),
+        disorder=[0.0, 0.1, 0.5, 1.0][index % 4],
+        seed=SEED + index
+    )
+    run_both_engines(duckdb_conn)
+
+
+def create_tables(
+        duckdb_conn: duckdb.DuckDBPyConnection,
+        parents: list[tuple[str, str, date, Optional[date]]],
+        children: list[tuple[str, str, str, date, Optional[date]]]
+    ) -> None:
+    duckdb_conn.execute(f"CREATE TABLE {PARENTS.view_name} (uri VARCHAR, insee_code VARCHAR, start_date DATE, end_date DATE)")
+    duckdb_conn.executemany(f"INSERT INTO {PARENTS.view_name} VALUES (?, ?, ?, ?)", parents)
+    duckdb_conn.execute(f"CREATE TABLE {CHILDREN.view_name} (uri VARCHAR, insee_code VARCHAR, parent_uri VARCHAR, start_date DATE, end_date DATE)")
+    duckdb_conn.executemany(f"INSERT INTO {CHILDREN.view_name} VALUES (?, ?, ?, ?, ?)", children)
+    ParentLinksInseeCog(parents_view_name=[PARENTS.view_name]).create(request=CHILDREN, duckdb_conn=duckdb_conn)
+
+
+def test_engines_agree_on_edge_cases():
+    duckdb_conn = duckdb.connect()
+    create_tables(
+        duckdb_conn,
+        parents=[
+            # Touching periods, the last one open-ended
+            ("parent-a1", "01", date(2000, 1, 1), date(2010, 1, 1)),
+            ("parent-a2", "01", date(2010, 1, 1), None),
+            # A gap of one day
+            ("parent-b1", "02", date(2000, 1, 1), date(2005, 1, 1)),
+            ("parent-b2", "02", date(2005, 1, 2), None),
+            # Two open-ended periods
+            ("parent-c1", "03", date(2000, 1, 1), None),
+            ("parent-c2", "03", date(2004, 1, 1), None)
+        ],
+        children=[
+            ("child-a", "A1", "parent-a1|parent-a2", date(2000, 1, 1), None),
+            ("child-b", "B1", "parent-b1|parent-b2", date(2000, 1, 1), None),
+            ("child-c", "C1", "parent-c1|parent-c2", date(2004, 1, 1), None),
+            ("child-d", "D1", "parent-b1", date(1999, 1, 1), date(2005, 1, 1)),
+            # Codes shared with the parents: overlapping, then only touching
+            ("child-e", "01", "parent-c1", date(2009, 1, 1), date(2010, 1, 1)),
+            ("child-f", "02", "parent-c1", date(2005, 1, 1), date(2005, 1, 2))
+        ]
+    )
+
+    results = run_both_engines(duckdb_conn)
+
+    overlapping_uris = {frozenset(row[1:3]) for row in results["insee_code_overlap"]}
+    assert frozenset(["parent-a1", "parent-a2"]) not in overlapping_uris
+    assert frozenset(["parent-c1", "parent-c2"]) in overlapping_uris
+    assert frozenset(["parent-a1", "child-e"]) in overlapping_uris
+    assert frozenset(["parent-b1", "child-f"]) not in overlapping_uris
+    assert frozenset(["parent-b2", "child-f"]) not in overlapping_uris
+    assert {row[1] for row in results["parent_period_overlap"]} == {"child-c"}
+    assert {row[1] for row in results["parent_period_no_gaps"]} == {"child-b"}
+    assert "child-d" in {row[1] for row in results["parent_period_include"]}
+    assert "child-a" not in {row[1] for row in results["parent_period_include"]}
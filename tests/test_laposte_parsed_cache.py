@@ -0,0 +1,23 @@
+from pathlib import Path
+
+from rnipp_geo_data_collector.acquisition.suppliers.laposte import requests as laposte_requests
+from rnipp_geo_data_collector.acquisition.suppliers.laposte.config import LaPosteExceptionsToIgnoreOrCorrect, LaPosteSupplierConfig
+from rnipp_geo_data_collector.acquisition.suppliers.laposte.requests import OutputPathsRequestLaPosteHexasmal, RequestLaPosteHexasmal
+
+
+def test_parsed_cache_is_not_reused_after_a_code_change(tmp_path: Path, monkeypatch):
+    request = RequestLaPosteHexasmal(
+        output_paths=OutputPathsRequestLaPosteHexasmal(raw_entities=tmp_path / "raw.csv", cleaned_entities=tmp_path / "cleaned.csv"),
+        exceptions_handler_config=LaPosteExceptionsToIgnoreOrCorrect(),
+        acquisition_config=LaPosteSupplierConfig(cache_directory=str(tmp_path / "cache"))
+    )
+    request.cached_raw_entities.parent.mkdir(parents=True)
+    request.output_paths.cleaned_entities.write_text("insee_code,postal_code\n01001,01400\n", encoding="utf-8")
+    monkeypatch.setattr(laposte_requests, "get_code_fingerprint", lambda: "code1")
+    request.store_cached_parsed_entities()
+    request.raw_unchanged = True
+    assert request.is_cached_parsed_entities_valid()
+
+    # A new copy template changes the code fingerprint, the raw base is parsed again
+    monkeypatch.setattr(laposte_requests, "get_code_fingerprint", lambda: "code2")
+    assert not request.is_cached_parsed_entities_valid()
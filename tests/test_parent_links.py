@@ -0,0 +1,27 @@
+import duckdb
+
+from rnipp_geo_data_collector.acquisition.suppliers.insee.checks.parent_links import ParentLinksInseeCog
+
+
+class ChildRequest:
+    view_name = "insee_communes"
+    description = '"Communes" data'
+
+
+def test_links_of_the_affected_children_keep_the_row_numbers_of_the_whole_request():
+    duckdb_conn = duckdb.connect()
+    duckdb_conn.execute(
+        "CREATE TABLE insee_communes AS SELECT 'commune' || i AS uri, 'departement' AS parent_uri, DATE '2000-01-01' AS start_date, NULL::DATE AS end_date FROM range(1, 8) t(i) ORDER BY i"
+    )
+    duckdb_conn.execute("CREATE VIEW insee_departements AS SELECT 'departement' AS uri, DATE '2000-01-01' AS start_date, NULL::DATE AS end_date")
+    duckdb_conn.execute("CREATE VIEW insee_communes_delta_children AS SELECT * FROM insee_communes WHERE uri IN ('commune5', 'commune7')")
+    parent_links = ParentLinksInseeCog(parents_view_name=["insee_departements"])
+    table_name = parent_links.get_table_name(ChildRequest())
+
+    parent_links.create(request=ChildRequest(), duckdb_conn=duckdb_conn)
+    all_row_numbers = dict(duckdb_conn.execute(f"SELECT uri, row_num FROM {table_name}").fetchall())
+    parent_links.create(request=ChildRequest(), duckdb_conn=duckdb_conn, affected_children_view_name="insee_communes_delta_children")
+    affected_row_numbers = dict(duckdb_conn.execute(f"SELECT uri, row_num FROM {table_name}").fetchall())
+
+    assert len(all_row_numbers) == 7
+    assert affected_row_numbers == {uri: all_row_numbers[uri] for uri in ["commune5", "commune7"]}
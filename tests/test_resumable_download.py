@@ -0,0 +1,88 @@
+from pathlib import Path
+import hashlib
+import pytest
+import requests
+
+from rnipp_geo_data_collector.benchmark.server import LAPOSTE_RECORDING, StandInServer, StandInServerConfig
+from rnipp_geo_data_collector.utils.http_client import HttpClient
+
+
+def download(server: StandInServer, output_path: Path, max_resume_attempts: int = 3, accept_encoding: str = "identity") -> tuple[int, str]:
+    """Download the La Poste recording from the stand-in server, returning the number of bytes written and their hash"""
+    # Chunks smaller than the recording, so that part of the body is written before a drop
+    http_client = HttpClient(name="test", max_retries=0, chunk_size=1024, accept_encoding=accept_encoding)
+    try:
+        with http_client.session.get(server.get_endpoint_url(StandInServer.laposte_path), stream=True, timeout=5) as response:
+            nb_bytes_written, content_hash = http_client.download_to_file(
+                response=response,
+                output_path=output_path,
+                description="La Poste Hexasmal data",
+                timeout=5,
+                max_resume_attempts=max_resume_attempts,
+                content_hash=hashlib.sha256()
+            )
+        return nb_bytes_written, content_hash.hexdigest()
+    finally:
+        http_client.close()
+
+
+def test_download_resumes_with_a_range_request_after_a_dropped_connection(recordings_directory: Path, tmp_path: Path):
+    content = (recordings_directory / LAPOSTE_RECORDING).read_bytes()
+    output_path = tmp_path / "laposte_hexasmal.csv"
+    with StandInServer(recordings_directory, StandInServerConfig(drop_rate=1.0, max_dropped=1, seed=0)) as server:
+        nb_bytes_written, sha256 = download(server, output_path)
+        statistics = dict(server.statistics)
+
+    assert output_path.read_bytes() == content
+    assert (nb_bytes_written, sha256) == (len(content), hashlib.sha256(content).hexdigest())
+    assert not output_path.with_suffix(".csv.part").exists()
+    # The second request only sent the missing bytes, appended to those written before the drop
+    assert statistics["requests"] == 2 and statistics["dropped"] == 1
+    assert statistics["bytes_sent"] - len(content) // 2 < len(content)
+
+
+def test_download_starts_again_when_the_server_ignores_the_range(recordings_directory: Path, tmp_path: Path):
+    content = (recordings_directory / LAPOSTE_RECORDING).read_bytes()
+    output_path = tmp_path / "laposte_hexasmal.csv"
+    with StandInServer(recordings_directory, StandInServerConfig(drop_rate=1.0, max_dropped=1, ignore_ranges=True, seed=0)) as server:
+        nb_bytes_written, sha256 = download(server, output_path)
+        statistics = dict(server.statistics)
+
+    # The bytes received before the drop are replaced by the whole content, and the hash restarted
+    assert output_path.read_bytes() == content
+    assert (nb_bytes_written, sha256) == (len(content), hashlib.sha256(content).hexdigest())
+    assert statistics["bytes_sent"] == len(content) // 2 + len(content)
+
+
+def test_download_fails_when_the_resumed_content_is_shorter_than_announced(recordings_directory: Path, tmp_path: Path):
+    output_path = tmp_path / "laposte_hexasmal.csv"
+    with StandInServer(recordings_directory, StandInServerConfig(drop_rate=1.0, max_dropped=1, truncated_ranges=True, seed=0)) as server:
+        with pytest.raises(RuntimeError, match="Incomplete download"):
+            download(server, output_path)
+
+    assert not output_path.exists()
+    assert not output_path.with_suffix(".csv.part").exists()
+
+
+def test_download_fails_after_the_last_resume_attempt(recordings_directory: Path, tmp_path: Path):
+    output_path = tmp_path / "laposte_hexasmal.csv"
+    with StandInServer(recordings_directory, StandInServerConfig(drop_rate=1.0, seed=0)) as server:
+        with pytest.raises((requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError)):
+            download(server, output_path, max_resume_attempts=2)
+        statistics = dict(server.statistics)
+
+    assert statistics["dropped"] == 3
+    assert not output_path.exists()
+    assert not output_path.with_suffix(".csv.part").exists()
+
+
+def test_compressed_download_is_not_resumed(recordings_directory: Path, tmp_path: Path):
+    output_path = tmp_path / "laposte_hexasmal.csv"
+    with StandInServer(recordings_directory, StandInServerConfig(drop_rate=1.0, max_dropped=1, seed=0)) as server:
+        with pytest.raises((requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError)):
+            download(server, output_path, accept_encoding="gzip, deflate")
+        statistics = dict(server.statistics)
+
+    # The server does not serve byte ranges of the compressed body, no Range request is sent
+    assert statistics["requests"] == 1 and statistics["dropped"] == 1
+    assert not output_path.with_suffix(".csv.part").exists()
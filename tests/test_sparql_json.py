@@ -0,0 +1,77 @@
+import io
+import json
+import duckdb
+
+from rnipp_geo_data_collector.utils.duckdb import ingest_sparql_json_stream
+from rnipp_geo_data_collector.utils.sparql_json import SparqlJsonResultsReader
+
+
+def get_results(nb_rows: int) -> dict:
+    return {
+        "head": {"vars": ["uri", "label"]},
+        "results": {"bindings": [
+            {"uri": {"type": "uri", "value": f"http://id.insee.fr/geo/commune/{index}"}, "label": {"type": "literal", "value": f"Châtel-{index}"}}
+            if index % 3 != 0 else {"uri": {"type": "uri", "value": f"http://id.insee.fr/geo/commune/{index}"}}
+            for index in range(nb_rows)
+        ]}
+    }
+
+
+class CountingStream(io.BytesIO):
+    """Stream counting the bytes read from it"""
+    def __init__(self, content: bytes):
+        super().__init__(content)
+        self.nb_bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        block = super().read(size)
+        self.nb_bytes_read += len(block)
+        return block
+
+
+def test_reader_decodes_the_bindings_across_small_blocks():
+    results = get_results(20)
+    # Blocks of 7 bytes split the keys, the values and the multi-byte characters
+    reader = SparqlJsonResultsReader(io.BytesIO(json.dumps(results, ensure_ascii=False, indent=1).encode("utf-8")), read_size=7)
+
+    assert list(reader.iter_bindings()) == results["results"]["bindings"]
+    assert reader.variables == ["uri", "label"]
+
+
+def test_reader_reads_the_stream_as_the_bindings_are_consumed():
+    content = json.dumps(get_results(10000)).encode("utf-8")
+    stream = CountingStream(content)
+    bindings = SparqlJsonResultsReader(stream, read_size=1024).iter_bindings()
+
+    next(bindings)
+    assert stream.nb_bytes_read < len(content) // 10
+
+
+def test_reader_accepts_the_head_after_the_results_and_no_bindings():
+    reader = SparqlJsonResultsReader(io.BytesIO(b'{"results": {"bindings": [], "distinct": false}, "head": {"vars": ["uri"], "link": []}}'))
+
+    assert list(reader.iter_bindings()) == []
+    assert reader.variables == ["uri"]
+
+
+def test_ingest_loads_the_bindings_by_chunks():
+    results = get_results(25)
+    duckdb_conn = duckdb.connect()
+
+    nb_rows = ingest_sparql_json_stream(duckdb_conn, io.BytesIO(json.dumps(results).encode("utf-8")), "communes_raw", chunk_rows=10)
+
+    assert nb_rows == 25
+    rows = duckdb_conn.execute("SELECT uri, label FROM communes_raw").fetchall()
+    assert rows == [
+        (binding["uri"]["value"], binding["label"]["value"] if "label" in binding else "")
+        for binding in results["results"]["bindings"]
+    ]
+
+
+def test_ingest_creates_an_empty_table_without_bindings():
+    duckdb_conn = duckdb.connect()
+
+    nb_rows = ingest_sparql_json_stream(duckdb_conn, io.BytesIO(b'{"head": {"vars": ["uri", "label"]}, "results": {"bindings": []}}'), "communes_raw")
+
+    assert nb_rows == 0
+    assert [column[0] for column in duckdb_conn.execute("SELECT * FROM communes_raw").description] == ["uri", "label"]
@@ -0,0 +1,182 @@
+from pathlib import Path
+import csv
+import time
+import duckdb
+import pytest
+
+from rnipp_geo_data_collector.acquisition.suppliers.insee.config import InseeSupplierConfig
+from rnipp_geo_data_collector.acquisition.suppliers.insee.requests import OutputPathsRequestCOG, RequestCOGDepartement
+from rnipp_geo_data_collector.acquisition.suppliers.laposte.config import LaPosteExceptionsToIgnoreOrCorrect, LaPosteSupplierConfig
+from rnipp_geo_data_collector.acquisition.suppliers.laposte.requests import OutputPathsRequestLaPosteHexasmal, RequestLaPosteHexasmal
+from rnipp_geo_data_collector.acquisition.suppliers.wikidata.config import WikidataSupplierConfig
+from rnipp_geo_data_collector.acquisition.suppliers.wikidata.enrichment import EnrichmentWikidataCommunes, OutputPathsEnrichmentWikidata
+from rnipp_geo_data_collector.benchmark.server import INSEE_RECORDINGS, LAPOSTE_RECORDING, WIKIDATA_RECORDING, StandInServer, StandInServerConfig
+from rnipp_geo_data_collector.utils.http_client import HttpClient
+
+
+def read_rows(path: Path) -> list[dict[str, str]]:
+    with open(path, newline="", encoding="utf-8") as file:
+        return list(csv.DictReader(file))
+
+
+def get_departements_request(server: StandInServer, tmp_path: Path, **config) -> RequestCOGDepartement:
+    return RequestCOGDepartement(
+        output_paths=OutputPathsRequestCOG(
+            raw_entities=tmp_path / "raw" / "insee_departements.csv",
+            cleaned_entities=tmp_path / "cleaned" / "insee_departements.csv"
+        ),
+        acquisition_config=InseeSupplierConfig(endpoint_url=server.get_endpoint_url(StandInServer.insee_path), **config)
+    )
+
+
+def get_laposte_request(server: StandInServer, working_directory: Path, cache_directory: Path, **config) -> RequestLaPosteHexasmal:
+    return RequestLaPosteHexasmal(
+        output_paths=OutputPathsRequestLaPosteHexasmal(
+            raw_entities=working_directory / "raw" / "laposte_hexasmal.csv",
+            cleaned_entities=working_directory / "cleaned" / "laposte_hexasmal.csv"
+        ),
+        exceptions_handler_config=LaPosteExceptionsToIgnoreOrCorrect(),
+        acquisition_config=LaPosteSupplierConfig(
+            endpoint_url=server.get_endpoint_url(StandInServer.laposte_path),
+            cache_directory=str(cache_directory),
+            **config
+        )
+    )
+
+
+def test_cog_request_writes_the_response_to_the_raw_file(recordings_directory: Path, tmp_path: Path):
+    with StandInServer(recordings_directory) as server:
+        request = get_departements_request(server, tmp_path)
+        request.send()
+
+    assert not request.ingested
+    assert read_rows(request.output_paths.raw_entities) == read_rows(recordings_directory / INSEE_RECORDINGS["Departement"])
+
+
+@pytest.mark.parametrize("response_format", ["csv", "json"])
+def test_cog_request_ingests_the_response_into_the_raw_table(recordings_directory: Path, tmp_path: Path, response_format: str):
+    expected_rows = read_rows(recordings_directory / INSEE_RECORDINGS["Departement"])
+    duckdb_conn = duckdb.connect()
+    with StandInServer(recordings_directory) as server:
+        request = get_departements_request(server, tmp_path, ingest_mode="duckdb", response_format=response_format, ingest_chunk_rows=10)
+        request.send(duckdb_conn=duckdb_conn)
+
+    assert request.ingested
+    assert not request.output_paths.raw_entities.exists()
+    insee_codes = [row[0] for row in duckdb_conn.execute(f"SELECT insee_code FROM {request.raw_table_name} ORDER BY insee_code").fetchall()]
+    assert insee_codes == sorted(row["insee_code"] for row in expected_rows)
+
+
+def test_cog_request_is_retried_after_a_429_with_retry_after(recordings_directory: Path, tmp_path: Path):
+    config = StandInServerConfig(error_rate=1.0, error_burst_length=2, max_errors=2, error_status=429, retry_after=1)
+    with StandInServer(recordings_directory, config) as server:
+        request = get_departements_request(server, tmp_path, max_retries=3, backoff_factor=0)
+        start = time.monotonic()
+        request.send()
+        elapsed = time.monotonic() - start
+        statistics = dict(server.statistics)
+
+    assert read_rows(request.output_paths.raw_entities) == read_rows(recordings_directory / INSEE_RECORDINGS["Departement"])
+    assert statistics["requests"] == 3 and statistics["errors"] == 2
+    # Each retry waited for the delay asked by the server, not for the (null) backoff
+    assert elapsed >= 2
+
+
+def test_post_is_not_retried_without_retry_post(recordings_directory: Path):
+    config = StandInServerConfig(error_rate=1.0, max_errors=1, error_status=429, retry_after=1)
+    http_client = HttpClient(name="test", max_retries=3, backoff_factor=0)
+    try:
+        with StandInServer(recordings_directory, config) as server:
+            response = http_client.session.post(
+                server.get_endpoint_url(StandInServer.insee_path),
+                data={"format": "text/csv", "query": "SELECT ?uri WHERE { ?uri a igeo:Departement }"},
+                timeout=5
+            )
+            statistics = dict(server.statistics)
+    finally:
+        http_client.close()
+
+    assert response.status_code == 429
+    assert statistics["requests"] == 1
+
+
+def test_laposte_request_restores_the_cached_raw_file_when_not_modified(recordings_directory: Path, tmp_path: Path):
+    content = (recordings_directory / LAPOSTE_RECORDING).read_bytes()
+    cache_directory = tmp_path / "cache"
+    with StandInServer(recordings_directory) as server:
+        first_request = get_laposte_request(server, tmp_path / "run1", cache_directory)
+        first_request.send()
+        bytes_sent = server.statistics["bytes_sent"]
+
+        second_request = get_laposte_request(server, tmp_path / "run2", cache_directory)
+        second_request.send()
+        statistics = dict(server.statistics)
+
+    assert not first_request.raw_unchanged
+    assert second_request.raw_unchanged
+    assert second_request.output_paths.raw_entities.read_bytes() == content
+    # The second request was answered with a 304, without a body
+    assert statistics["requests"] == 2 and statistics["bytes_sent"] == bytes_sent
+
+
+def test_laposte_request_resumes_after_a_dropped_connection(recordings_directory: Path, tmp_path: Path):
+    content = (recordings_directory / LAPOSTE_RECORDING).read_bytes()
+    # The server compresses the bodies when asked to, the La Poste client asks for an uncompressed one to resume it
+    config = StandInServerConfig(drop_rate=1.0, max_dropped=1, compression=True)
+    with StandInServer(recordings_directory, config) as server:
+        # Chunks smaller than the recording, so that part of the body is written before the drop
+        request = get_laposte_request(server, tmp_path, tmp_path / "cache", max_resume_attempts=2, chunk_size=1024)
+        request.send()
+        statistics = dict(server.statistics)
+
+    assert request.output_paths.raw_entities.read_bytes() == content
+    assert statistics["requests"] == 2 and statistics["dropped"] == 1
+    # The resumed request only sent the bytes missing after the drop
+    assert statistics["bytes_sent"] < 2 * len(content)
+
+
+def test_laposte_request_fails_when_the_connection_keeps_dropping(recordings_directory: Path, tmp_path: Path):
+    config = StandInServerConfig(drop_rate=1.0)
+    with StandInServer(recordings_directory, config) as server:
+        request = get_laposte_request(server, tmp_path, tmp_path / "cache", max_resume_attempts=1, max_retries=0)
+        with pytest.raises((ConnectionError, RuntimeError)):
+            request.send()
+
+    assert not request.output_paths.raw_entities.exists()
+
+
+def test_wikidata_enrichment_matches_the_current_communes(recordings_directory: Path, tmp_path: Path):
+    duckdb_conn = duckdb.connect()
+    duckdb_conn.execute(
+        f"CREATE VIEW insee_communes AS SELECT * FROM read_csv('{recordings_directory / INSEE_RECORDINGS['Commune']}', header = true, all_varchar = true)"
+    )
+    expected = {row["insee_code"]: row["wikidata_uri"] for row in read_rows(recordings_directory / WIKIDATA_RECORDING)}
+    with StandInServer(recordings_directory) as server:
+        acquisition_config = WikidataSupplierConfig(
+            endpoint_url=server.get_endpoint_url(StandInServer.wikidata_path),
+            batch_size=10,
+            cache_directory=str(tmp_path / "cache"),
+            output_format="csv"
+        )
+        for run in ["run1", "run2"]:
+            enrichment = EnrichmentWikidataCommunes(
+                communes_view_name="insee_communes",
+                output_paths=OutputPathsEnrichmentWikidata(
+                    batches_directory=tmp_path / run / "batches",
+                    raw_entities=tmp_path / run / "wikidata_communes_raw.csv",
+                    enriched_entities=tmp_path / run / "wikidata_communes.csv"
+                ),
+                acquisition_config=acquisition_config
+            )
+            enrichment.send(duckdb_conn)
+            if run == "run1":
+                nb_requests = server.statistics["requests"]
+        statistics = dict(server.statistics)
+
+    insee_codes = [row[0] for row in duckdb_conn.execute(enrichment.render_sql(enrichment.sql_template_insee_codes, {"communes_view_name": "insee_communes"})).fetchall()]
+    matched = dict(duckdb_conn.execute("SELECT insee_code, wikidata_uri FROM wikidata_communes").fetchall())
+    assert set(matched.keys()) == set(insee_codes)
+    assert matched == {insee_code: expected.get(insee_code) for insee_code in insee_codes}
+    assert nb_requests == (len(insee_codes) + 9) // 10
+    # All the codes were found in the result cache by the second run
+    assert statistics["requests"] == nb_requests